@@ -1,14 +1,19 @@
 from flask import Flask
 from flask_cors import CORS
 from flask_socketio import SocketIO
+import atexit
 import os
 
 socketio = SocketIO()
 
 # Import database
 from app.database import Database
+from app.recorder import ExecutionRecorder
 db = Database()
 
+# Optional write-behind recorder for execution results
+recorder = None
+
 def create_app(test_config=None):
     app = Flask(__name__, instance_relative_config=True)
     app.config.from_mapping(
@@ -16,6 +21,10 @@ def create_app(test_config=None):
         DB_PATH=os.environ.get('CRONBAT_DB_PATH', os.path.join(app.instance_path, 'cronbat.db')),
         LOGS_PATH=os.environ.get('CRONBAT_LOGS_PATH', os.path.join(app.instance_path, 'logs')),
         MAX_EXECUTIONS_PER_JOB=int(os.environ.get('CRONBAT_MAX_EXECUTIONS', '20')),
+        RETENTION_DAYS=int(os.environ.get('CRONBAT_RETENTION_DAYS', '0')),
+        MAX_LOG_MB_PER_JOB=float(os.environ.get('CRONBAT_MAX_LOG_MB_PER_JOB', '0')),
+        WRITE_BEHIND=os.environ.get('CRONBAT_WRITE_BEHIND', 'false').lower() == 'true',
+        WRITE_BEHIND_BATCH_SIZE=int(os.environ.get('CRONBAT_WRITE_BEHIND_BATCH_SIZE', '100')),
     )
 
     if test_config is None:
@@ -29,7 +38,23 @@ def create_app(test_config=None):
         pass
 
     # Enable CORS
-    CORS(app, resources={r"/*": {"origins": "*"}})
+    CORS(app, resources={r"/*": {"origins": "*"}}, expose_headers=['X-Next-Cursor', 'Link', 'X-Log-Offset', 'X-Log-Size', 'Content-Range'])
+
+    # Initialize database with configured paths
+    # (before registering blueprints, which import the scheduler)
+    global db, recorder
+    db = Database(
+        db_path=app.config['DB_PATH'],
+        logs_path=app.config['LOGS_PATH'],
+        max_executions_per_job=app.config['MAX_EXECUTIONS_PER_JOB'],
+        retention_days=app.config['RETENTION_DAYS'],
+        max_log_mb_per_job=app.config['MAX_LOG_MB_PER_JOB']
+    )
+
+    # Start the write-behind recorder if enabled, flushing it on shutdown
+    if app.config['WRITE_BEHIND']:
+        recorder = ExecutionRecorder(db, batch_size=app.config['WRITE_BEHIND_BATCH_SIZE'])
+        atexit.register(recorder.stop)
 
     # Register blueprints
     from app.api import bp as api_bp
@@ -38,11 +63,4 @@ def create_app(test_config=None):
     # Initialize Socket.IO
     socketio.init_app(app, cors_allowed_origins="*")
 
-    # Initialize database with configured paths
-    global db
-    db = Database(
-        db_path=app.config['DB_PATH'],
-        logs_path=app.config['LOGS_PATH']
-    )
-
     return app
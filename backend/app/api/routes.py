@@ -1,15 +1,185 @@
-from flask import jsonify, request
+import csv
+import io
+import itertools
+import json
+import os
+from datetime import datetime, timedelta
+from urllib.parse import urlencode
+import yaml
+from flask import Response, current_app, jsonify, request, send_file
 from app.api import bp
 from app.scheduler import (
-    scheduler, get_jobs, get_job, add_job, update_job, remove_job, run_job,
-    get_job_logs, get_job_executions, get_all_executions, get_execution_log
+    scheduler, get_job, add_job, update_job, remove_job, run_job,
+    get_job_logs,
+    get_recorder_stats, get_executions_page, get_execution, find_execution_id, search_logs, get_live_log,
+    log_stream, job_snapshot, job_cache, execution_pool, process_monitor, leader,
+    get_schedule_forecast, check_schedule, dag_engine, dependency_graph, add_dependency, remove_dependency,
+    get_direct_dependencies, get_related_jobs, get_dependency_graph, apply_job_changes, apply_manifest, get_manifest,
+    export_executions
 )
 from app import db
+from app.database import EXPORT_COLUMNS
+from app.dag import JOIN_POLICIES
+from app.executor import PRIORITIES
+from app.logfiles import tail_offset, iter_file_range
+from app.manifest import MANIFEST_FORMATS, parse_manifest
+from app.responsecache import ResponseCache
+
+# Upper bound for the page size of paginated listings
+MAX_PAGE_SIZE = 500
+
+# Seconds per unit of durations like "15m"
+DURATION_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+# Upper bound for the random delay added to a job's scheduled runs
+MAX_JITTER_SECONDS = 3600
+
+# Formats of the execution history export, and the optional columns it can add
+EXPORT_FORMATS = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv'}
+OPTIONAL_EXPORT_COLUMNS = ('job_name', 'log_size')
+
+# Job fields that bulk requests may set
+JOB_FIELDS = (
+    'name', 'command', 'schedule', 'description', 'is_paused', 'max_executions', 'retention_days',
+    'max_log_mb', 'max_output_mb', 'priority', 'worker_label', 'jitter_seconds', 'join_policy'
+)
+
+# Per-job overrides of the retention and output limits, and those given in MB
+RETENTION_FIELDS = ('max_executions', 'retention_days', 'max_log_mb', 'max_output_mb')
+MB_FIELDS = ('max_log_mb', 'max_output_mb')
+
+# Serialized listings, reused until the data they show changes
+execution_pages = ResponseCache(max_entries=int(os.environ.get('CRONBAT_RESPONSE_CACHE_SIZE', '64')))
+dependency_listing = ResponseCache(max_entries=1)
+
+def conditional_response(etag, last_modified, build):
+    """Answer a GET for a versioned listing, with 304 if the client's copy is current
+
+    etag identifies the version of the listing. build() is only called when
+    the client's If-None-Match doesn't match, and returns the JSON body and
+    any extra headers.
+    """
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+    else:
+        body, headers = build()
+        response = Response(body, mimetype='application/json', headers=headers)
+
+    response.set_etag(etag)
+    if last_modified:
+        response.last_modified = last_modified
+    # Clients may keep the listing but must check it is current before use
+    response.cache_control.no_cache = True
+    return response
+
+def validate_job_fields(data):
+    """Check the fields of a job that are present in data
+
+    Returns a user-facing error message, or None if the fields are valid.
+    """
+    if 'name' in data and (not isinstance(data['name'], str) or not data['name'].strip()):
+        return "Job name cannot be empty"
+
+    if 'priority' in data and data['priority'] not in PRIORITIES:
+        return f"priority must be one of: {', '.join(PRIORITIES)}"
+
+    if 'join_policy' in data and data['join_policy'] not in JOIN_POLICIES:
+        return f"join_policy must be one of: {', '.join(JOIN_POLICIES)}"
+
+    if 'schedule' in data:
+        try:
+            check_schedule(data['schedule'])
+        except ValueError as e:
+            return f"Invalid schedule: {e}"
+
+    for field in RETENTION_FIELDS:
+        value = data.get(field)
+        if value is None:
+            continue
+        valid_types = (int, float) if field in MB_FIELDS else int
+        if isinstance(value, bool) or not isinstance(value, valid_types) or value < 0:
+            kind = 'number' if field in MB_FIELDS else 'integer'
+            return f"{field} must be a non-negative {kind} or null"
+
+    jitter = data.get('jitter_seconds')
+    if jitter is not None and (isinstance(jitter, bool) or not isinstance(jitter, int)
+                               or not 0 <= jitter <= MAX_JITTER_SECONDS):
+        return f"jitter_seconds must be an integer between 0 and {MAX_JITTER_SECONDS}"
+    return None
+
+def parse_execution_filters(default_limit):
+    """Parse pagination and filter query parameters for execution listings
+
+    Raises ValueError with a user-facing message if a parameter is invalid.
+    """
+    args = request.args
+    filters = {'cursor': args.get('cursor') or None}
+
+    try:
+        filters['limit'] = int(args.get('limit', default_limit))
+    except ValueError:
+        raise ValueError("limit must be an integer")
+    if not 1 <= filters['limit'] <= MAX_PAGE_SIZE:
+        raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+
+    if args.get('state'):
+        filters['states'] = [state for state in args['state'].split(',') if state]
+
+    if args.get('exit_code'):
+        try:
+            filters['exit_code'] = int(args['exit_code'])
+        except ValueError:
+            raise ValueError("exit_code must be an integer")
+
+    for key in ('since', 'until'):
+        if args.get(key):
+            try:
+                filters[key] = datetime.fromisoformat(args[key])
+            except ValueError:
+                raise ValueError(f"{key} must be an ISO 8601 timestamp")
+
+    if args.get('min_duration'):
+        try:
+            filters['min_duration'] = float(args['min_duration'])
+        except ValueError:
+            raise ValueError("min_duration must be a number")
+
+    return filters
+
+def paginated_executions_response(filters):
+    """Return a page of executions with the next page's cursor in headers
+
+    Pages carry job names, so their ETag covers the executions and the jobs.
+    """
+    executions_version, executions_modified = db.get_version('executions')
+    jobs_version, jobs_modified = db.get_version('jobs')
+    version = (executions_version, jobs_version)
+    last_modified = max(filter(None, (executions_modified, jobs_modified)), default=None)
+
+    def build():
+        executions, next_cursor = get_executions_page(**filters)
+        headers = {}
+        if next_cursor:
+            headers['X-Next-Cursor'] = next_cursor
+            args = request.args.to_dict()
+            args['cursor'] = next_cursor
+            headers['Link'] = f'<{request.path}?{urlencode(args)}>; rel="next"'
+        return current_app.json.dumps(executions), headers
+
+    try:
+        return conditional_response(
+            f'executions-{executions_version}-{jobs_version}',
+            last_modified,
+            lambda: execution_pages.get(version, request.full_path, build)
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
 @bp.route('/jobs', methods=['GET'])
 def get_all_jobs():
     """Get all scheduled jobs"""
-    return jsonify(get_jobs())
+    version, modified_at, body = job_snapshot.versioned_json()
+    return conditional_response(f'jobs-{job_snapshot.epoch}-{version}', modified_at, lambda: (body, {}))
 
 @bp.route('/jobs/<job_id>', methods=['GET'])
 def get_single_job(job_id):
@@ -27,15 +197,131 @@ def create_job():
     if not data or not all(k in data for k in ('name', 'command', 'schedule')):
         return jsonify({"error": "Missing required fields"}), 400
 
+    error = validate_job_fields(data)
+    if error:
+        return jsonify({"error": error}), 400
+
     job_id = add_job(
         name=data['name'],
         command=data['command'],
         schedule=data['schedule'],
-        description=data.get('description', '')
+        description=data.get('description', ''),
+        max_executions=data.get('max_executions'),
+        retention_days=data.get('retention_days'),
+        max_log_mb=data.get('max_log_mb'),
+        max_output_mb=data.get('max_output_mb'),
+        priority=data.get('priority', 'normal'),
+        worker_label=data.get('worker_label') or None,
+        jitter_seconds=data.get('jitter_seconds') or None,
+        join_policy=data.get('join_policy', 'all')
     )
+    if job_id is None:
+        return jsonify({"error": "A job with this name already exists"}), 400
 
     return jsonify({"job_id": job_id}), 201
 
+@bp.route('/jobs/bulk', methods=['POST'])
+def bulk_jobs():
+    """Create, update, pause, resume and delete many jobs in one transaction
+
+    The body may hold a list of new jobs in create, a list of changed jobs
+    with their id in update, and lists of job ids in pause, resume and
+    delete. Either every change is made or none is.
+    """
+    data = request.get_json()
+    if not isinstance(data, dict):
+        return jsonify({"error": "No data provided"}), 400
+
+    lists = {}
+    for key in ('create', 'update', 'pause', 'resume', 'delete'):
+        lists[key] = data.get(key) or []
+        if not isinstance(lists[key], list):
+            return jsonify({"error": f"{key} must be a list"}), 400
+
+    create = []
+    for index, job in enumerate(lists['create']):
+        if not isinstance(job, dict) or not all(job.get(k) for k in ('name', 'command', 'schedule')):
+            return jsonify({"error": f"create[{index}]: Missing required fields"}), 400
+        error = validate_job_fields(job)
+        if error:
+            return jsonify({"error": f"create[{index}]: {error}"}), 400
+        fields = {field: job[field] for field in JOB_FIELDS if field in job}
+        fields.setdefault('description', '')
+        fields['worker_label'] = fields.get('worker_label') or None
+        fields['jitter_seconds'] = fields.get('jitter_seconds') or None
+        create.append(fields)
+
+    update = {}
+    for index, job in enumerate(lists['update']):
+        if not isinstance(job, dict) or not job.get('id'):
+            return jsonify({"error": f"update[{index}]: Missing job id"}), 400
+        error = validate_job_fields(job)
+        if error:
+            return jsonify({"error": f"update[{index}]: {error}"}), 400
+        fields = {field: job[field] for field in JOB_FIELDS if field in job}
+        for field in ('worker_label', 'jitter_seconds'):
+            if field in fields:
+                fields[field] = fields[field] or None
+        update.setdefault(job['id'], {}).update(fields)
+
+    for key, is_paused in (('pause', True), ('resume', False)):
+        for job_id in lists[key]:
+            update.setdefault(job_id, {})['is_paused'] = is_paused
+
+    try:
+        created = apply_job_changes(create=create, update=update, delete=lists['delete'])
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    return jsonify({
+        "created": created,
+        "updated": len(lists['update']),
+        "paused": len(lists['pause']),
+        "resumed": len(lists['resume']),
+        "deleted": len(lists['delete'])
+    }), 200
+
+@bp.route('/manifest', methods=['GET'])
+def export_jobs_manifest():
+    """Export all jobs and dependencies as a JSON or YAML (?format=yaml) manifest"""
+    format = request.args.get('format', 'json')
+    if format not in MANIFEST_FORMATS:
+        return jsonify({"error": f"format must be one of: {', '.join(MANIFEST_FORMATS)}"}), 400
+
+    manifest = get_manifest()
+    if format == 'yaml':
+        return Response(yaml.safe_dump(manifest, sort_keys=False), mimetype='application/yaml')
+    return jsonify(manifest)
+
+@bp.route('/manifest', methods=['POST'])
+def apply_jobs_manifest():
+    """Make the jobs match a JSON or YAML manifest, changing only what differs
+
+    YAML is read when the content type or ?format= says so. With
+    ?prune=true jobs missing from the manifest are deleted, and with
+    ?dry_run=true the changes are only reported.
+    """
+    format = request.args.get('format') or ('yaml' if 'yaml' in request.mimetype else 'json')
+    if format not in MANIFEST_FORMATS:
+        return jsonify({"error": f"format must be one of: {', '.join(MANIFEST_FORMATS)}"}), 400
+    prune = request.args.get('prune', 'false').lower() == 'true'
+    dry_run = request.args.get('dry_run', 'false').lower() == 'true'
+
+    try:
+        manifest = parse_manifest(request.get_data(as_text=True), format)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    for job in manifest['jobs']:
+        error = validate_job_fields(job)
+        if error:
+            return jsonify({"error": f"Job {job['name']}: {error}"}), 400
+
+    try:
+        return jsonify(apply_manifest(manifest, prune=prune, dry_run=dry_run)), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
 @bp.route('/jobs/<job_id>', methods=['DELETE'])
 def delete_job(job_id):
     """Delete a scheduled job"""
@@ -56,17 +342,23 @@ def update_job_route(job_id):
     if not job:
         return jsonify({"error": "Job not found"}), 404
 
-    # Validate name if it's being updated
+    error = validate_job_fields(data)
+    if error:
+        return jsonify({"error": error}), 400
+
+    # Check if name is already taken by another job
     if 'name' in data and data['name'] != job['name']:
-        # Check if name is empty
-        if not data['name'].strip():
-            return jsonify({"error": "Job name cannot be empty"}), 400
+        existing_job_id = db.get_job_id_by_name(data['name'])
+        if existing_job_id and existing_job_id != job_id:
+            return jsonify({"error": "A job with this name already exists"}), 400
 
-        # Check if name is already taken by another job
-        all_jobs = get_jobs()
-        for existing_job in all_jobs:
-            if existing_job['id'] != job_id and existing_job['name'] == data['name']:
-                return jsonify({"error": "A job with this name already exists"}), 400
+    # An empty worker label runs the job in the scheduler process
+    if 'worker_label' in data:
+        data['worker_label'] = data['worker_label'] or None
+
+    # No jitter is stored as NULL, like an empty worker label
+    if 'jitter_seconds' in data:
+        data['jitter_seconds'] = data['jitter_seconds'] or None
 
     success = update_job(job_id, data)
     if success:
@@ -105,42 +397,319 @@ def job_logs(job_id):
         return jsonify(logs)
     return jsonify({"error": "Job not found"}), 404
 
+@bp.route('/jobs/<job_id>/live_log', methods=['GET'])
+def job_live_log(job_id):
+    """Get the live log lines of a job's current run after the `since` seq"""
+    try:
+        since = int(request.args.get('since', 0))
+    except ValueError:
+        return jsonify({"error": "since must be an integer"}), 400
+    return jsonify(get_live_log(job_id, since))
+
 @bp.route('/jobs/<job_id>/executions', methods=['GET'])
 def job_executions(job_id):
-    """Get execution history for a specific job"""
-    executions = get_job_executions(job_id)
-    return jsonify(executions)
+    """Get execution history for a specific job
+
+    Supports cursor pagination (limit, cursor) and the state, exit_code,
+    since, until and min_duration filters. The cursor for the next page is
+    returned in the X-Next-Cursor header.
+    """
+    try:
+        filters = parse_execution_filters(default_limit=10)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    return paginated_executions_response(dict(filters, job_id=job_id))
 
 @bp.route('/executions', methods=['GET'])
 def all_executions():
-    """Get execution history for all jobs"""
-    executions = get_all_executions()
-    return jsonify(executions)
+    """Get execution history for all jobs
+
+    Accepts the same parameters as the per-job listing, plus job_id.
+    """
+    try:
+        filters = parse_execution_filters(default_limit=50)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    return paginated_executions_response(dict(
+        filters,
+        job_id=request.args.get('job_id') or None,
+        include_job=True
+    ))
+
+@bp.route('/executions/export', methods=['GET'])
+def export_execution_history():
+    """Stream every retained execution, oldest first, as NDJSON or CSV
+
+    Takes format (ndjson or csv), since (ISO 8601), job_id, and include, a
+    comma separated list of the optional job_name and log_size columns.
+    """
+    args = request.args
+    export_format = args.get('format', 'ndjson')
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({"error": f"format must be one of: {', '.join(EXPORT_FORMATS)}"}), 400
+
+    since = None
+    if args.get('since'):
+        try:
+            since = datetime.fromisoformat(args['since'])
+        except ValueError:
+            return jsonify({"error": "since must be an ISO 8601 timestamp"}), 400
+
+    include = [column for column in args.get('include', '').split(',') if column]
+    unknown = set(include) - set(OPTIONAL_EXPORT_COLUMNS)
+    if unknown:
+        return jsonify({"error": f"include can only list: {', '.join(OPTIONAL_EXPORT_COLUMNS)}"}), 400
+
+    batches = export_executions(
+        since=since,
+        job_id=args.get('job_id') or None,
+        include_job='job_name' in include,
+        include_log_size='log_size' in include
+    )
+
+    def generate_ndjson():
+        for batch in batches:
+            yield ''.join(json.dumps(execution) + '\n' for execution in batch)
+
+    def generate_csv():
+        buffer = io.StringIO()
+        columns = list(EXPORT_COLUMNS) + [column for column in OPTIONAL_EXPORT_COLUMNS if column in include]
+        writer = csv.DictWriter(buffer, fieldnames=columns)
+        writer.writeheader()
+        # The empty first batch sends the header before any rows are read
+        for batch in itertools.chain([[]], batches):
+            writer.writerows(batch)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    return Response(
+        generate_csv() if export_format == 'csv' else generate_ndjson(),
+        mimetype=EXPORT_FORMATS[export_format],
+        headers={'Content-Disposition': f'attachment; filename=executions.{export_format}'}
+    )
+
+@bp.route('/executions/<int:execution_id>', methods=['GET'])
+def single_execution(execution_id):
+    """Get a specific execution by ID"""
+    execution = get_execution(execution_id)
+    if execution:
+        return jsonify(execution)
+    return jsonify({"error": "Execution not found"}), 404
 
 @bp.route('/jobs/<job_id>/executions/<timestamp>/log', methods=['GET'])
 def execution_log(job_id, timestamp):
-    """Get log for a specific execution"""
-    log = get_execution_log(job_id, timestamp)
-    if log is not None:
-        return jsonify(log)
-    return jsonify({"error": "Execution log not found"}), 404
+    """Get the log of a job's execution by its ISO start time
+
+    Kept for clients of the timestamp-addressed URL; the log is served as
+    by /executions/<id>/log.
+    """
+    try:
+        execution_id = find_execution_id(job_id, datetime.fromisoformat(timestamp))
+    except ValueError:
+        execution_id = None
+    if execution_id is None:
+        return jsonify({"error": "Execution log not found"}), 404
+    return execution_log_by_id(execution_id)
+
+@bp.route('/executions/<int:execution_id>/log', methods=['GET'])
+def execution_log_by_id(execution_id):
+    """Stream the log of a specific execution from disk
+
+    Supports `tail=N` for the last N lines, `offset`/`limit` byte ranges and
+    HTTP Range requests. Partial responses report the start offset and the
+    total log size in the X-Log-Offset and X-Log-Size headers.
+    """
+    execution = get_execution(execution_id)
+    if not execution or not execution['log_file'] or not os.path.exists(execution['log_file']):
+        return jsonify({"error": "Execution log not found"}), 404
+
+    log_file = execution['log_file']
+    size = os.path.getsize(log_file)
+
+    try:
+        if 'tail' in request.args:
+            lines = int(request.args['tail'])
+            if lines < 0:
+                raise ValueError
+            start = tail_offset(log_file, lines)
+            length = size - start
+        elif 'offset' in request.args or 'limit' in request.args:
+            start = min(int(request.args.get('offset', 0)), size)
+            length = min(int(request.args.get('limit', size - start)), size - start)
+            if start < 0 or length < 0:
+                raise ValueError
+        else:
+            # Whole file, with Range / conditional request handling
+            response = send_file(log_file, mimetype='text/plain', conditional=True)
+            response.headers['X-Log-Size'] = str(size)
+            return response
+    except ValueError:
+        return jsonify({"error": "tail, offset and limit must be non-negative integers"}), 400
+
+    return Response(
+        iter_file_range(log_file, start, length),
+        mimetype='text/plain',
+        headers={
+            'Content-Length': str(length),
+            'X-Log-Offset': str(start),
+            'X-Log-Size': str(size)
+        }
+    )
+
+@bp.route('/search/logs', methods=['GET'])
+def search_execution_logs():
+    """Search execution logs for a phrase
+
+    Returns matching executions, newest first, with their job names and the
+    log lines that contain the phrase. Accepts optional job_id and limit.
+    """
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({"error": "Missing search query"}), 400
+
+    try:
+        limit = int(request.args.get('limit', 50))
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        return jsonify({"error": f"limit must be between 1 and {MAX_PAGE_SIZE}"}), 400
+
+    results = search_logs(query, request.args.get('job_id') or None, limit)
+    if results is None:
+        return jsonify({"error": "Log search is not available"}), 501
+    return jsonify(results)
+
+@bp.route('/schedule/forecast', methods=['GET'])
+def schedule_forecast():
+    """Forecast scheduled runs and expected load per time bucket
+
+    Takes from and to as ISO 8601 timestamps (default: the next 24 hours)
+    and bucket as seconds or a duration like 15m (default: 5m).
+    """
+    try:
+        start = datetime.fromisoformat(request.args['from']) if request.args.get('from') else datetime.now()
+        end = datetime.fromisoformat(request.args['to']) if request.args.get('to') else start + timedelta(days=1)
+    except ValueError:
+        return jsonify({"error": "from and to must be ISO 8601 timestamps"}), 400
+
+    bucket = request.args.get('bucket', '5m')
+    try:
+        if bucket[-1:] in DURATION_UNITS:
+            bucket_seconds = int(bucket[:-1]) * DURATION_UNITS[bucket[-1]]
+        else:
+            bucket_seconds = int(bucket)
+    except ValueError:
+        return jsonify({"error": "bucket must be a number of seconds or a duration like 15m"}), 400
+
+    try:
+        return jsonify(get_schedule_forecast(start, end, bucket_seconds))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+@bp.route('/recorder', methods=['GET'])
+def recorder_stats():
+    """Get write-behind recorder statistics"""
+    return jsonify(get_recorder_stats())
+
+@bp.route('/queue', methods=['GET'])
+def queue_stats():
+    """Get execution pool usage, queue depths and worker queue depths"""
+    return jsonify(dict(
+        execution_pool.stats(),
+        processes=process_monitor.stats(),
+        workers=db.get_worker_queue_stats()
+    ))
+
+@bp.route('/job_cache', methods=['GET'])
+def job_cache_stats():
+    """Get job cache hit/miss counters, the size of the dependency graph index and listing cache counters"""
+    return jsonify(dict(
+        job_cache.stats(),
+        dependency_graph=dependency_graph.stats(),
+        execution_pages=execution_pages.stats()
+    ))
+
+@bp.route('/log_stream', methods=['GET'])
+def log_stream_stats():
+    """Get per-client job log queue statistics"""
+    return jsonify(log_stream.stats())
+
+@bp.route('/leader', methods=['GET'])
+def leader_stats():
+    """Get whether this process is the scheduler leader, and which process is"""
+    return jsonify(leader.stats())
+
+@bp.route('/dag_runs', methods=['GET'])
+def dag_runs():
+    """Get the dependency chain runs in progress and the latest finished ones"""
+    return jsonify(dag_engine.stats())
+
+@bp.route('/dag_runs/<run_id>', methods=['GET'])
+def get_dag_run(run_id):
+    """Get a dependency chain run with the state of each of its jobs"""
+    run = dag_engine.get_run(run_id)
+    if run:
+        return jsonify(run)
+    return jsonify({"error": "Run not found"}), 404
 
 # Job Dependencies API
 
 @bp.route('/dependencies', methods=['GET'])
 def get_all_dependencies():
     """Get all job dependencies"""
-    dependencies = db.get_all_dependencies()
-    return jsonify(dependencies)
+    version, modified_at = dependency_graph.version()
+
+    def build():
+        return current_app.json.dumps(dependency_graph.edges()), {}
+
+    return conditional_response(
+        f'dependencies-{dependency_graph.epoch}-{version}',
+        modified_at,
+        lambda: dependency_listing.get(version, 'dependencies', build)
+    )
 
 @bp.route('/jobs/<job_id>/dependencies', methods=['GET'])
 def get_job_dependencies(job_id):
     """Get dependencies for a specific job"""
-    dependencies = db.get_job_dependencies(job_id)
+    dependencies = get_direct_dependencies(job_id)
     if dependencies is not None:
         return jsonify(dependencies)
     return jsonify({"error": "Job not found"}), 404
 
+@bp.route('/jobs/<job_id>/ancestors', methods=['GET'])
+def get_job_ancestors(job_id):
+    """Get the jobs a job depends on, directly or not, up to ?depth= levels up"""
+    return related_jobs_response(job_id, 'ancestors')
+
+@bp.route('/jobs/<job_id>/descendants', methods=['GET'])
+def get_job_descendants(job_id):
+    """Get the jobs that depend on a job, directly or not, up to ?depth= levels down"""
+    return related_jobs_response(job_id, 'descendants')
+
+def related_jobs_response(job_id, direction):
+    """Respond with a job's ancestors or descendants, limited by the depth parameter"""
+    depth = request.args.get('depth')
+    if depth is not None:
+        try:
+            depth = int(depth)
+        except ValueError:
+            return jsonify({"error": "depth must be an integer"}), 400
+        if depth < 1:
+            return jsonify({"error": "depth must be at least 1"}), 400
+
+    jobs = get_related_jobs(job_id, direction, depth)
+    if jobs is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify({'job_id': job_id, 'depth': depth, direction: jobs})
+
+@bp.route('/graph', methods=['GET'])
+def get_graph():
+    """Get all jobs and dependencies in one response"""
+    return jsonify(get_dependency_graph())
+
 @bp.route('/dependencies', methods=['POST'])
 def create_dependency():
     """Create a new dependency between jobs"""
@@ -153,8 +722,11 @@ def create_dependency():
     if data['parent_job_id'] == data['child_job_id']:
         return jsonify({"error": "Cannot create dependency to itself"}), 400
 
-    # Add the dependency
-    success = db.add_job_dependency(data['parent_job_id'], data['child_job_id'])
+    # Add the dependency; longer cycles are rejected by the database
+    try:
+        success = add_dependency(data['parent_job_id'], data['child_job_id'])
+    except ValueError as e:
+        return jsonify({"error": f"Dependency would create a cycle: {e}"}), 400
 
     if success:
         return jsonify({"message": "Dependency created"}), 201
@@ -163,7 +735,7 @@ def create_dependency():
 @bp.route('/dependencies/<parent_job_id>/<child_job_id>', methods=['DELETE'])
 def delete_dependency(parent_job_id, child_job_id):
     """Delete a dependency between jobs"""
-    success = db.remove_job_dependency(parent_job_id, child_job_id)
+    success = remove_dependency(parent_job_id, child_job_id)
 
     if success:
         return jsonify({"message": "Dependency removed"}), 200
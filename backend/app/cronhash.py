@@ -0,0 +1,71 @@
+import hashlib
+import re
+
+# Values a crontab field accepts, and the values a bare H picks from. Hashed
+# days of the month stop at 28 so that they exist in every month.
+FIELD_RANGES = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 6))
+HASH_RANGES = ((0, 59), (0, 23), (1, 28), (1, 12), (0, 6))
+
+# H, H(low-high), H/step or H(low-high)/step
+HASH_PATTERN = re.compile(r'^H(?:\((\d+)-(\d+)\))?(?:/(\d+))?$')
+# How a part of a field that is meant as a hash expression starts; anything
+# else, including names like THU, is passed through as is
+HASH_START = re.compile(r'^H(?:\(|/|$)')
+
+
+def resolve_schedule(schedule, seed):
+    """Replace the H fields of a crontab expression with values derived from seed
+
+    H stands for one value of the field picked by hashing the seed, H(a-b)
+    for one value between a and b, and H/n or H(a-b)/n for every n-th value
+    starting at a hashed offset. A seed always gets the same values, while
+    different seeds are spread evenly, so many jobs scheduled "H * * * *"
+    run at different minutes of the hour. Raises ValueError if the schedule
+    isn't a string or an H field is malformed.
+    """
+    if not isinstance(schedule, str):
+        raise ValueError("Schedule must be a string")
+    if 'H' not in schedule:
+        return schedule
+
+    fields = schedule.split()
+    if len(fields) != 5:
+        raise ValueError(f"Wrong number of fields; got {len(fields)}, expected 5")
+
+    return ' '.join(
+        ','.join(_resolve_part(part, index, seed) for part in field.split(','))
+        for index, field in enumerate(fields)
+    )
+
+
+def _resolve_part(part, index, seed):
+    """Resolve one comma-separated part of a crontab field"""
+    if not HASH_START.match(part):
+        return part
+
+    match = HASH_PATTERN.match(part)
+    if not match:
+        raise ValueError(f"Invalid hash expression: {part}")
+
+    low, high = HASH_RANGES[index]
+    if match.group(1) is not None:
+        low, high = int(match.group(1)), int(match.group(2))
+        field_low, field_high = FIELD_RANGES[index]
+        if not field_low <= low <= high <= field_high:
+            raise ValueError(f"Invalid hash range in {part}; values must be between {field_low} and {field_high}")
+
+    value = _hash(seed, index)
+    if match.group(3) is not None:
+        step = int(match.group(3))
+        if step < 1:
+            raise ValueError(f"Invalid step in {part}")
+        start = low + value % min(step, high - low + 1)
+        return ','.join(str(number) for number in range(start, high + 1, step))
+
+    return str(low + value % (high - low + 1))
+
+
+def _hash(seed, index):
+    """Derive a number for a field from a seed that, unlike hash(), is the same in every process"""
+    digest = hashlib.sha1(f'{seed}:{index}'.encode()).digest()
+    return int.from_bytes(digest[:8], 'big')
@@ -0,0 +1,252 @@
+import collections
+import threading
+import uuid
+from datetime import datetime
+
+# How a job joins the runs of the jobs it depends on: after all of them
+# succeeded, or after any one did
+JOIN_POLICIES = ('all', 'any')
+DEFAULT_JOIN_POLICY = 'all'
+
+# States a job ends a chain run in; a deferred job still waits for a parent
+# outside the run, whose own chain run picks it up
+DONE_STATES = ('success', 'failed', 'skipped', 'deferred')
+
+
+class DagRun:
+    """One run of a job and of the jobs downstream of it"""
+
+    def __init__(self, root_job_id, order, parents, policies, all_parents):
+        self.id = str(uuid.uuid4())
+        self.root_job_id = root_job_id
+        self.started_at = datetime.now()
+        self.finished_at = None
+        self.state = 'running'
+
+        # Job ids in topological order, the parents of each job within the
+        # run and all its unpaused parents, and the join policy of each job
+        # but the root
+        self.order = order
+        self.parents = parents
+        self.all_parents = all_parents
+        self.policies = policies
+
+        self.states = {job_id: 'waiting' for job_id in order}
+        self.states[root_job_id] = 'success'
+        # job id -> the parent whose result made the job ready
+        self.triggered_by = {}
+        self.running = 0
+
+    def to_dict(self, nodes=False):
+        """Summarize the run, with the state of each of its jobs if requested"""
+        result = {
+            'id': self.id,
+            'root_job_id': self.root_job_id,
+            'state': self.state,
+            'started_at': self.started_at.isoformat(),
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'jobs': len(self.order),
+            'counts': dict(collections.Counter(self.states.values()))
+        }
+        if nodes:
+            result['nodes'] = [{
+                'job_id': job_id,
+                'state': self.states[job_id],
+                'join_policy': self.policies.get(job_id),
+                'parents': self.parents[job_id],
+                'triggered_by': self.triggered_by.get(job_id)
+            } for job_id in self.order]
+        return result
+
+
+class DagEngine:
+    """Run jobs once the jobs they depend on have finished
+
+    Every job keeps the latest result of each of its parents since its own
+    last run. It is due once all of those parents have succeeded since
+    then, or any one of them with the 'any' join policy. A job whose
+    parents run on their own schedules therefore runs once, after the last
+    of them, rather than once per parent.
+
+    When a job that other jobs depend on succeeds outside of a chain run, a
+    run with a new id is started that covers the job and every unpaused job
+    downstream of it. A job of the run is settled once its parents in the
+    run allow it: it becomes ready if it is due, is skipped once a parent in
+    the run failed or was skipped, and is otherwise deferred to the run of
+    the parent outside this run it still waits for. Ready jobs are handed
+    out in topological order, at most max_running per run at a time, and
+    report their result with the id of their run.
+
+    get_children(job_id) returns the unpaused jobs that depend on a job as
+    dictionaries with 'id' and 'join_policy', and get_parents(job_id) the
+    ids of the unpaused jobs a job depends on.
+    """
+
+    def __init__(self, get_children, get_parents, max_running=4, history=100):
+        self.get_children = get_children
+        self.get_parents = get_parents
+        self.max_running = max_running
+        self.started = 0
+        self.completed = 0
+
+        # run id -> runs in progress, and the latest finished runs
+        self._runs = {}
+        self._finished = collections.deque(maxlen=history)
+        # job id -> {parent id: whether the parent's latest run succeeded},
+        # for the parents that ran since the job's own last run
+        self._parent_results = {}
+        self._lock = threading.Lock()
+
+    def job_finished(self, job_id, success, dag_run_ids=()):
+        """Record the end of a run of a job; returns the jobs to start now
+
+        dag_run_ids are the chain runs the run was started for. Any other run
+        of a job counts as the job's own: it resets what the job waits for,
+        and if successful starts a chain run of the jobs downstream of it.
+        Returns a (job_id, run_id, parent_id) tuple for each job to start,
+        parent_id being the job whose result made it ready.
+        """
+        children = self.get_children(job_id)
+        with self._lock:
+            for child in children:
+                self._parent_results.setdefault(child['id'], {})[job_id] = success
+
+            runs = [self._runs[run_id] for run_id in dag_run_ids
+                    if run_id in self._runs and self._runs[run_id].states.get(job_id) == 'running']
+            if runs:
+                started = []
+                for run in runs:
+                    run.states[job_id] = 'success' if success else 'failed'
+                    run.running -= 1
+                    started.extend(self._advance(run, job_id))
+                return started
+
+            self._parent_results.pop(job_id, None)
+
+        if not success or not children:
+            return []
+        run = self._plan(job_id)
+        if run is None:
+            return []
+
+        with self._lock:
+            self._runs[run.id] = run
+            self.started += 1
+            return self._advance(run, job_id)
+
+    def get_run(self, run_id):
+        """Get a chain run in progress or recently finished, with its jobs"""
+        with self._lock:
+            run = self._runs.get(run_id)
+            if run is None:
+                run = next((run for run in self._finished if run.id == run_id), None)
+            return run.to_dict(nodes=True) if run else None
+
+    def stats(self):
+        """Get the chain runs in progress and the latest finished ones"""
+        with self._lock:
+            return {
+                'max_running': self.max_running,
+                'started': self.started,
+                'completed': self.completed,
+                'waiting_jobs': len(self._parent_results),
+                'active': [run.to_dict() for run in self._runs.values()],
+                'finished': [run.to_dict() for run in reversed(self._finished)]
+            }
+
+    def _plan(self, root_job_id):
+        """Build a run of a job and the jobs downstream of it, or None if there are none"""
+        parents = {root_job_id: []}
+        policies = {}
+        children = {}
+        queue = collections.deque([root_job_id])
+        while queue:
+            job_id = queue.popleft()
+            children[job_id] = []
+            for child in self.get_children(job_id):
+                child_id = child['id']
+                # Edges back to the root could only come from a cycle
+                if child_id == root_job_id:
+                    continue
+                children[job_id].append(child_id)
+                if child_id not in parents:
+                    parents[child_id] = []
+                    policies[child_id] = child.get('join_policy') or DEFAULT_JOIN_POLICY
+                    queue.append(child_id)
+                parents[child_id].append(job_id)
+
+        if len(parents) == 1:
+            return None
+
+        # Kahn's algorithm; jobs on a cycle, which only databases from before
+        # cycles were rejected can contain, never become ready and are left out
+        indegree = {job_id: len(job_parents) for job_id, job_parents in parents.items()}
+        order = []
+        queue = collections.deque([root_job_id])
+        while queue:
+            job_id = queue.popleft()
+            order.append(job_id)
+            for child_id in children[job_id]:
+                indegree[child_id] -= 1
+                if indegree[child_id] == 0:
+                    queue.append(child_id)
+
+        if len(order) < len(parents):
+            print(f"Leaving {len(parents) - len(order)} jobs on dependency cycles out of the run of job {root_job_id}")
+            included = set(order)
+            parents = {job_id: [parent for parent in parents[job_id] if parent in included] for job_id in order}
+
+        all_parents = {job_id: self.get_parents(job_id) for job_id in order[1:]}
+        return DagRun(root_job_id, order, parents, policies, all_parents)
+
+    def _is_due(self, job_id, policy, parents):
+        """Tell whether a job's parents succeeded since its last run as its policy requires; the caller holds the lock"""
+        results = self._parent_results.get(job_id, {})
+        if policy == 'any':
+            return any(results.get(parent) for parent in parents)
+        return all(results.get(parent) for parent in parents)
+
+    def _advance(self, run, finished_job_id):
+        """Settle the jobs whose parents are done and hand out ready jobs; the caller holds the lock"""
+        for job_id in run.order:
+            if run.states[job_id] != 'waiting':
+                continue
+
+            parent_states = [run.states[parent] for parent in run.parents[job_id]]
+            settled = all(state in DONE_STATES for state in parent_states)
+            failed = sum(1 for state in parent_states if state in ('failed', 'skipped'))
+            policy = run.policies[job_id]
+
+            if policy != 'any' and failed:
+                run.states[job_id] = 'skipped'
+            elif (policy == 'any' or settled) and self._is_due(job_id, policy, run.all_parents[job_id]):
+                run.states[job_id] = 'ready'
+                run.triggered_by[job_id] = finished_job_id
+            elif settled:
+                run.states[job_id] = 'skipped' if failed == len(parent_states) else 'deferred'
+
+        started = []
+        for job_id in run.order:
+            if run.running >= self.max_running:
+                break
+            if run.states[job_id] == 'ready':
+                run.states[job_id] = 'running'
+                run.running += 1
+                # This run of the job uses up the results of its parents
+                self._parent_results.pop(job_id, None)
+                started.append((job_id, run.id, run.triggered_by[job_id]))
+
+        if all(state in DONE_STATES for state in run.states.values()):
+            run.finished_at = datetime.now()
+            states = set(run.states.values())
+            if states & {'failed', 'skipped'}:
+                run.state = 'failed'
+            elif 'deferred' in states:
+                run.state = 'deferred'
+            else:
+                run.state = 'success'
+            del self._runs[run.id]
+            self._finished.append(run)
+            self.completed += 1
+
+        return started
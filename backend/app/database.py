@@ -1,9 +1,12 @@
 import os
 import json
-from datetime import datetime
-from sqlalchemy import create_engine, Column, String, Integer, Float, Boolean, Text, ForeignKey, DateTime
+import base64
+import threading
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import event, create_engine, Column, String, Integer, Float, Boolean, Text, ForeignKey, DateTime, Index, func, text, tuple_
+from sqlalchemy.exc import IntegrityError, OperationalError
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, relationship
+from sqlalchemy.orm import sessionmaker, relationship, aliased
 
 Base = declarative_base()
 
@@ -14,6 +17,11 @@ class JobDependency(Base):
     parent_job_id = Column(String, ForeignKey('jobs.id', ondelete='CASCADE'), nullable=False)
     child_job_id = Column(String, ForeignKey('jobs.id', ondelete='CASCADE'), nullable=False)
 
+    __table_args__ = (
+        Index('ix_job_dependencies_parent_job_id', 'parent_job_id'),
+        Index('ix_job_dependencies_child_job_id', 'child_job_id'),
+    )
+
 class Job(Base):
     __tablename__ = 'jobs'
 
@@ -27,6 +35,31 @@ class Job(Base):
     is_paused = Column(Boolean, default=False)
     trigger_type = Column(String, default='schedule')  # 'schedule' or 'dependency'
 
+    # Per-job retention overrides (None uses the global default, 0 disables)
+    max_executions = Column(Integer, nullable=True)
+    retention_days = Column(Integer, nullable=True)
+    max_log_mb = Column(Float, nullable=True)
+
+    # Per-run log size limit in MB (None uses the global default, 0 disables)
+    max_output_mb = Column(Float, nullable=True)
+
+    # Priority class of the job's runs in the execution queue
+    priority = Column(String, default='normal')
+
+    # Runs of jobs with a worker label are queued for workers with that label
+    # instead of running in the scheduler process
+    worker_label = Column(String, nullable=True)
+
+    # Upper bound in seconds of a random delay added to each scheduled run
+    jitter_seconds = Column(Integer, nullable=True)
+
+    # Whether the job runs after all of its parents succeeded, or any of them
+    join_policy = Column(String, default='all')
+
+    __table_args__ = (
+        Index('uq_jobs_name', 'name', unique=True),
+    )
+
     executions = relationship("Execution", back_populates="job", cascade="all, delete-orphan")
 
     # Define relationships for dependencies
@@ -52,16 +85,146 @@ class Execution(Base):
     exit_code = Column(Integer, nullable=True)
     duration = Column(Float, nullable=True)
     log_file = Column(String, nullable=True)
+    log_size = Column(Integer, nullable=True)
+
+    # Worker queue: the label a run is routed by, the worker holding its
+    # lease, when the lease runs out, and how many times it was claimed
+    worker_label = Column(String, nullable=True)
+    worker_id = Column(String, nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True)
+    attempts = Column(Integer, default=0)
+
+    # Id of the dependency chain run the execution is part of, if any
+    dag_run_id = Column(String, nullable=True)
 
     job = relationship("Job", back_populates="executions")
 
+    __table_args__ = (
+        Index('ix_executions_job_id_timestamp', 'job_id', 'timestamp'),
+        Index('ix_executions_timestamp', 'timestamp'),
+        Index('ix_executions_state_worker_label', 'state', 'worker_label'),
+    )
+
+class ChangeVersion(Base):
+    __tablename__ = 'change_versions'
+
+    # Counter bumped by every write to a collection (e.g. 'jobs'), so that
+    # other processes sharing the database can tell their copies are stale
+    name = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+class RunRequest(Base):
+    __tablename__ = 'run_requests'
+
+    # Manual runs requested through a process that doesn't run jobs; the
+    # scheduler leader takes them over on its next sync
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    job_id = Column(String, ForeignKey('jobs.id', ondelete='CASCADE'), nullable=False)
+    requested_at = Column(DateTime, default=datetime.now)
+
+# Executions that fall outside their job's retention policy. Rows are ranked
+# newest first per job; a row is expired when it is beyond the job's
+# execution count, older than its retention period, or pushes the job's
+# cumulative log size over the limit (the newest run is always kept).
+# Per-job settings override the defaults, and 0 disables a policy. Runs that
+# are still in progress or waiting for a worker are never expired.
+EXPIRED_EXECUTIONS_SQL = """
+    SELECT id FROM (
+        SELECT
+            e.id AS id,
+            e.timestamp AS timestamp,
+            ROW_NUMBER() OVER (
+                PARTITION BY e.job_id ORDER BY e.timestamp DESC, e.id DESC
+            ) AS position,
+            SUM(COALESCE(e.log_size, 0)) OVER (
+                PARTITION BY e.job_id ORDER BY e.timestamp DESC, e.id DESC
+                ROWS UNBOUNDED PRECEDING
+            ) AS cumulative_log_size,
+            COALESCE(j.max_executions, :max_executions) AS max_executions,
+            COALESCE(j.retention_days, :retention_days) AS retention_days,
+            COALESCE(j.max_log_mb, :max_log_mb) AS max_log_mb
+        FROM executions e
+        JOIN jobs j ON j.id = e.job_id
+        WHERE e.state NOT IN ('running', 'pending') {job_filter}
+    )
+    WHERE (max_executions > 0 AND position > max_executions)
+       OR (retention_days > 0 AND julianday(timestamp) < julianday(:now) - retention_days)
+       OR (max_log_mb > 0 AND position > 1 AND cumulative_log_size > max_log_mb * 1048576)
+"""
+
+# Full-text index of execution logs (SQLite FTS5). Rows use the execution id
+# as rowid and are removed by a trigger whenever the execution is deleted.
+LOG_SEARCH_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS log_search USING fts5(output)",
+    """
+    CREATE TRIGGER IF NOT EXISTS executions_log_search_delete AFTER DELETE ON executions
+    BEGIN
+        DELETE FROM log_search WHERE rowid = old.id;
+    END
+    """,
+]
+
+# Markers used to find the matching lines in FTS5 snippets
+SNIPPET_START = '\x01'
+SNIPPET_END = '\x02'
+
+def encode_cursor(timestamp, execution_id):
+    """Encode an execution's (timestamp, id) position as an opaque cursor"""
+    position = f"{timestamp.isoformat()}|{execution_id}"
+    return base64.urlsafe_b64encode(position.encode()).decode()
+
+def decode_cursor(cursor):
+    """Decode a cursor into (timestamp, id), raising ValueError if invalid"""
+    try:
+        timestamp, execution_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        return datetime.fromisoformat(timestamp), int(execution_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+# Execution columns included in exports of the execution history
+EXPORT_COLUMNS = (
+    'id', 'job_id', 'timestamp', 'state', 'exit_code', 'duration', 'worker_label', 'worker_id', 'attempts',
+    'dag_run_id'
+)
+
+def _has_cycle(edges):
+    """Tell whether (parent, child) edges contain a cycle, using Kahn's algorithm"""
+    children = {}
+    indegree = {}
+    for parent_id, child_id in edges:
+        children.setdefault(parent_id, []).append(child_id)
+        indegree[child_id] = indegree.get(child_id, 0) + 1
+        indegree.setdefault(parent_id, 0)
+
+    ready = [job_id for job_id, count in indegree.items() if count == 0]
+    visited = 0
+    while ready:
+        job_id = ready.pop()
+        visited += 1
+        for child_id in children.get(job_id, ()):
+            indegree[child_id] -= 1
+            if indegree[child_id] == 0:
+                ready.append(child_id)
+    return visited < len(indegree)
+
 class Database:
-    def __init__(self, db_path=None, logs_path=None, max_executions_per_job=None):
+    def __init__(self, db_path=None, logs_path=None, max_executions_per_job=None,
+                 retention_days=None, max_log_mb_per_job=None):
         # Default paths if not provided
         self.db_path = db_path or os.environ.get('CRONBAT_DB_PATH', 'instance/cronbat.db')
         self.logs_path = logs_path or os.environ.get('CRONBAT_LOGS_PATH', 'instance/logs')
         self.max_executions_per_job = max_executions_per_job or int(os.environ.get('CRONBAT_MAX_EXECUTIONS', '20'))
 
+        # Default retention policies (0 disables the policy)
+        self.retention_days = retention_days if retention_days is not None else int(os.environ.get('CRONBAT_RETENTION_DAYS', '0'))
+        self.max_log_mb_per_job = max_log_mb_per_job if max_log_mb_per_job is not None else float(os.environ.get('CRONBAT_MAX_LOG_MB_PER_JOB', '0'))
+
+        # Default per-run log size limit (0 disables truncation)
+        self.max_output_mb = float(os.environ.get('CRONBAT_MAX_OUTPUT_MB', '0'))
+
+        # Only the end of very large logs is indexed for search (in characters)
+        self.log_search_max_chars = int(os.environ.get('CRONBAT_LOG_SEARCH_MAX_KB', '1024')) * 1024
+
         # Ensure directories exist
         os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
         os.makedirs(self.logs_path, exist_ok=True)
@@ -73,12 +236,38 @@ class Database:
         # Create session factory
         self.Session = sessionmaker(bind=self.engine)
 
+        # Latest known change counter of each collection and when it last
+        # moved, updated by this process's commits and by refresh_versions()
+        self.versions = {}
+        self.versions_modified = {}
+        # Counters moved by this process's commits, until taken by
+        # take_own_versions()
+        self._own_versions = {}
+        self._versions_lock = threading.Lock()
+        event.listen(self.Session, 'after_commit', self._publish_versions)
+        event.listen(self.Session, 'after_rollback', lambda session: session.info.pop('versions', None))
+
+        # Create the log search index if this SQLite build supports FTS5
+        self.log_search_enabled = self._init_log_search()
+
     def get_jobs(self):
         """Get all jobs from the database"""
         session = self.Session()
         try:
             jobs = session.query(Job).all()
-            return [self._job_to_dict(job) for job in jobs]
+            return self._jobs_to_dicts(session, jobs, all_jobs=True)
+        finally:
+            session.close()
+
+    def get_job_schedules(self):
+        """Get (id, schedule, is_paused, jitter_seconds) of every job
+
+        Only the columns needed to schedule jobs are loaded, which is much
+        cheaper than get_jobs() for large job sets.
+        """
+        session = self.Session()
+        try:
+            return [tuple(row) for row in session.query(Job.id, Job.schedule, Job.is_paused, Job.jitter_seconds)]
         finally:
             session.close()
 
@@ -88,13 +277,27 @@ class Database:
         try:
             job = session.query(Job).filter_by(id=job_id).first()
             if job:
-                return self._job_to_dict(job)
+                return self._job_to_dict(session, job)
             return None
         finally:
             session.close()
 
-    def add_job(self, job_id, name, command, schedule, description=''):
-        """Add a new job to the database"""
+    def get_job_id_by_name(self, name):
+        """Get the ID of the job with the given name, if any"""
+        session = self.Session()
+        try:
+            row = session.query(Job.id).filter_by(name=name).first()
+            return row[0] if row else None
+        finally:
+            session.close()
+
+    def add_job(self, job_id, name, command, schedule, description='', max_executions=None,
+                retention_days=None, max_log_mb=None, max_output_mb=None, priority='normal',
+                worker_label=None, jitter_seconds=None, join_policy='all'):
+        """Add a new job to the database
+
+        Returns None if a job with the same name already exists.
+        """
         session = self.Session()
         try:
             job = Job(
@@ -103,11 +306,23 @@ class Database:
                 command=command,
                 schedule=schedule,
                 description=description,
-                created_at=datetime.now()
+                created_at=datetime.now(),
+                max_executions=max_executions,
+                retention_days=retention_days,
+                max_log_mb=max_log_mb,
+                max_output_mb=max_output_mb,
+                priority=priority,
+                worker_label=worker_label,
+                jitter_seconds=jitter_seconds,
+                join_policy=join_policy
             )
             session.add(job)
+            self._bump_version(session, 'jobs')
             session.commit()
             return job_id
+        except IntegrityError:
+            session.rollback()
+            return None
         finally:
             session.close()
 
@@ -138,8 +353,12 @@ class Database:
                 if hasattr(job, key):
                     setattr(job, key, value)
 
+            self._bump_version(session, 'jobs')
             session.commit()
             return True
+        except IntegrityError:
+            session.rollback()
+            return False
         finally:
             session.close()
 
@@ -152,16 +371,171 @@ class Database:
                 return False
 
             session.delete(job)
+            self._bump_version(session, 'jobs')
+            self._bump_version(session, 'executions')
+            session.commit()
+            return True
+        finally:
+            session.close()
+
+    def apply_job_changes(self, create=(), update=None, delete=(), add_dependencies=(), remove_dependencies=()):
+        """Create, update and delete many jobs and dependencies in one transaction
+
+        create holds the column values of new jobs, ids included, and update
+        maps job ids to the values to change. Deleted jobs lose their
+        executions, log files and dependencies. Dependencies are (parent id,
+        child id) pairs, and the trigger type of the children follows them.
+        The jobs' change counter is bumped once. Raises ValueError, writing
+        nothing, if a job doesn't exist, a name is taken twice or the
+        dependencies would contain a cycle.
+        """
+        update = update or {}
+        delete = list(delete)
+        created_ids = {job['id'] for job in create}
+        session = self.Session()
+        try:
+            referenced = set(update) | set(delete)
+            for parent_id, child_id in list(add_dependencies) + list(remove_dependencies):
+                referenced.update((parent_id, child_id))
+            referenced -= created_ids
+            found = {row[0] for row in session.query(Job.id).filter(Job.id.in_(referenced))} if referenced else set()
+            if referenced - found:
+                raise ValueError(f"Jobs not found: {', '.join(sorted(referenced - found))}")
+
+            now = datetime.now()
+            if create:
+                session.bulk_insert_mappings(Job, [dict(job, created_at=now) for job in create])
+
+            if update:
+                for job in session.query(Job).filter(Job.id.in_(list(update))):
+                    for key, value in update[job.id].items():
+                        if key != 'id' and hasattr(job, key):
+                            setattr(job, key, value)
+
+            log_files = []
+            if delete:
+                log_files = [row[0] for row in session.query(Execution.log_file).filter(Execution.job_id.in_(delete))]
+                session.query(Execution).filter(Execution.job_id.in_(delete)).delete(synchronize_session=False)
+                session.query(RunRequest).filter(RunRequest.job_id.in_(delete)).delete(synchronize_session=False)
+                session.query(JobDependency).filter(
+                    JobDependency.parent_job_id.in_(delete) | JobDependency.child_job_id.in_(delete)
+                ).delete(synchronize_session=False)
+                session.query(Job).filter(Job.id.in_(delete)).delete(synchronize_session=False)
+                self._bump_version(session, 'executions')
+
+            edges = set(session.query(JobDependency.parent_job_id, JobDependency.child_job_id))
+            for parent_id, child_id in remove_dependencies:
+                if (parent_id, child_id) in edges:
+                    session.query(JobDependency).filter_by(
+                        parent_job_id=parent_id, child_job_id=child_id
+                    ).delete(synchronize_session=False)
+                    edges.discard((parent_id, child_id))
+            for parent_id, child_id in add_dependencies:
+                if parent_id == child_id:
+                    raise ValueError("A job cannot depend on itself")
+                if (parent_id, child_id) not in edges:
+                    session.add(JobDependency(parent_job_id=parent_id, child_job_id=child_id))
+                    edges.add((parent_id, child_id))
+            if add_dependencies and _has_cycle(edges):
+                raise ValueError("The dependencies would contain a cycle")
+
+            # Children that gained their first parent or lost their last one
+            children = {child_id for _, child_id in list(add_dependencies) + list(remove_dependencies)}
+            children -= set(delete)
+            if children:
+                with_parents = {child_id for _, child_id in edges}
+                for job in session.query(Job).filter(Job.id.in_(children)):
+                    job.trigger_type = 'dependency' if job.id in with_parents else 'schedule'
+
+            self._bump_version(session, 'jobs')
+            session.commit()
+        except IntegrityError:
+            session.rollback()
+            raise ValueError("Job names must be unique")
+        except ValueError:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+        self._remove_log_files(log_files)
+        return True
+
+    def refresh_versions(self):
+        """Read the change counter of every collection that has been written
+
+        Picks up the writes of other processes sharing the database; the
+        counters are also returned.
+        """
+        session = self.Session()
+        try:
+            versions = dict(session.query(ChangeVersion.name, ChangeVersion.version).all())
+        finally:
+            session.close()
+
+        self._update_versions(versions)
+        return versions
+
+    def get_version(self, name):
+        """Get the latest known change counter of a collection and when it last moved
+
+        Answered from memory: writes by other processes are only seen after
+        the next refresh_versions().
+        """
+        with self._versions_lock:
+            return self.versions.get(name, 0), self.versions_modified.get(name)
+
+    def take_own_versions(self, name, up_to):
+        """Get and forget the counter values up to up_to that this process's commits moved a collection to
+
+        Tells a process's own writes apart from those of other processes.
+        """
+        with self._versions_lock:
+            own = self._own_versions.get(name, set())
+            taken = {version for version in own if version <= up_to}
+            own -= taken
+            return taken
+
+    def request_run(self, job_id):
+        """Ask the scheduler leader to run a job; returns False if the job doesn't exist"""
+        session = self.Session()
+        try:
+            if not session.query(Job.id).filter_by(id=job_id).first():
+                return False
+            session.add(RunRequest(job_id=job_id, requested_at=datetime.now()))
             session.commit()
             return True
         finally:
             session.close()
 
-    def add_execution(self, job_id, state, exit_code=None, duration=None, log_content=None):
-        """Add a new execution record and save log to file"""
+    def take_run_requests(self):
+        """Remove and return the ids of the jobs with requested runs, oldest first"""
+        session = self.Session()
+        try:
+            requests = session.query(RunRequest.id, RunRequest.job_id).order_by(RunRequest.id).all()
+            if not requests:
+                return []
+            session.query(RunRequest).filter(
+                RunRequest.id.in_([request_id for request_id, _ in requests])
+            ).delete(synchronize_session=False)
+            session.commit()
+            return [job_id for _, job_id in requests]
+        except OperationalError as e:
+            print(f"Error taking run requests: {e}")
+            session.rollback()
+            return []
+        finally:
+            session.close()
+
+    def start_execution(self, job_id, dag_run_id=None):
+        """Create the record of a run that is starting
+
+        The execution is stored in the 'running' state with its log file path,
+        so output streamed to that file survives a crash mid-run. Returns None
+        if the job no longer exists.
+        """
         session = self.Session()
         try:
-            # Update job's last_run timestamp
             job = session.query(Job).filter_by(id=job_id).first()
             if not job:
                 return None
@@ -169,96 +543,503 @@ class Database:
             timestamp = datetime.now()
             job.last_run = timestamp
 
-            # Create log file if content is provided
-            log_file = None
-            if log_content is not None:
-                # Generate a unique filename based on job_id and timestamp
-                filename = f"{job_id}_{timestamp.strftime('%Y%m%d%H%M%S')}.txt"
-                log_file = os.path.join(self.logs_path, filename)
+            execution = Execution(
+                job_id=job_id,
+                timestamp=timestamp,
+                state='running',
+                log_file=self._log_file_path(job_id, timestamp),
+                dag_run_id=dag_run_id
+            )
+
+            session.add(execution)
+            self._bump_version(session, 'executions')
+            session.commit()
 
-                # Write log content to file
-                with open(log_file, 'w') as f:
-                    f.write(log_content)
+            return self._execution_to_dict(execution)
+        finally:
+            session.close()
+
+    def finish_execution(self, execution_id, state, exit_code=None, duration=None, log_size=None,
+                         worker_id=None):
+        """Record the result of a run created with start_execution
+
+        Workers pass their worker_id; the result is then only recorded if
+        the worker still holds the run's lease.
+        """
+        return self.finish_executions([{
+            'execution_id': execution_id,
+            'state': state,
+            'exit_code': exit_code,
+            'duration': duration,
+            'log_size': log_size,
+            'worker_id': worker_id
+        }])
+
+    def finish_executions(self, results):
+        """Record the results of a batch of runs in a single transaction
+
+        Each item is a dict with execution_id, state, exit_code, duration and
+        log_size. Finished logs are added to the search index in the same
+        commit.
+        """
+        session = self.Session()
+        try:
+            log_files = dict(session.query(Execution.id, Execution.log_file).filter(
+                Execution.id.in_([result['execution_id'] for result in results])
+            ).all())
+
+            finished = False
+            for result in results:
+                execution_id = result['execution_id']
+                if execution_id not in log_files:
+                    continue
+
+                query = session.query(Execution).filter_by(id=execution_id)
+                if result.get('worker_id'):
+                    query = query.filter_by(worker_id=result['worker_id'], state='running')
+                updated = query.update({
+                    'state': result['state'],
+                    'exit_code': result.get('exit_code'),
+                    'duration': result.get('duration'),
+                    'log_size': result.get('log_size'),
+                    'lease_expires_at': None
+                })
+                if not updated:
+                    continue
+                self._index_log(session, execution_id, self._read_log_tail(log_files[execution_id]))
+                finished = True
+
+            if finished:
+                self._bump_version(session, 'executions')
+            session.commit()
+            return True
+        except Exception as e:
+            print(f"Error finishing executions: {e}")
+            session.rollback()
+            return False
+        finally:
+            session.close()
+
+    def mark_interrupted_executions(self):
+        """Mark runs left in the 'running' state by a previous process as interrupted
+
+        Their partial logs are kept and indexed. Runs on workers are left to
+        their leases. Returns the number of executions updated.
+        """
+        session = self.Session()
+        try:
+            executions = session.query(Execution).filter(
+                Execution.state == 'running',
+                Execution.worker_label.is_(None)
+            ).all()
+            for execution in executions:
+                execution.state = 'interrupted'
+                if execution.log_file and os.path.exists(execution.log_file):
+                    execution.log_size = os.path.getsize(execution.log_file)
+                    self._index_log(session, execution.id, self._read_log_tail(execution.log_file))
+
+            if executions:
+                self._bump_version(session, 'executions')
+            session.commit()
+            return len(executions)
+        finally:
+            session.close()
+
+    def enqueue_execution(self, job_id, worker_label, dag_run_id=None):
+        """Queue a run of a job for a worker with the given label
+
+        The execution is stored in the 'pending' state until a worker claims
+        it. Returns None if the job no longer exists or already has a
+        pending run.
+        """
+        session = self.Session()
+        try:
+            job = session.query(Job).filter_by(id=job_id).first()
+            if not job:
+                return None
+            if session.query(Execution.id).filter_by(job_id=job_id, state='pending').first():
+                return None
+
+            timestamp = datetime.now()
+            job.last_run = timestamp
 
-            # Create execution record
             execution = Execution(
                 job_id=job_id,
                 timestamp=timestamp,
-                state=state,
-                exit_code=exit_code,
-                duration=duration,
-                log_file=log_file
+                state='pending',
+                log_file=self._log_file_path(job_id, timestamp),
+                worker_label=worker_label,
+                attempts=0,
+                dag_run_id=dag_run_id
             )
 
             session.add(execution)
+            self._bump_version(session, 'executions')
             session.commit()
 
-            return {
-                'id': execution.id,
-                'job_id': execution.job_id,
-                'timestamp': execution.timestamp.isoformat(),
-                'state': execution.state,
-                'exit_code': execution.exit_code,
-                'duration': execution.duration,
-                'log_file': execution.log_file
-            }
+            return self._execution_to_dict(execution)
         finally:
             session.close()
 
-    def get_job_executions(self, job_id, limit=10):
-        """Get execution history for a specific job"""
+    def get_pending_execution_id(self, job_id):
+        """Get the id of a job's run waiting for a worker, if it has one"""
+        session = self.Session()
+        try:
+            row = session.query(Execution.id).filter_by(job_id=job_id, state='pending').first()
+            return row[0] if row else None
+        finally:
+            session.close()
+
+    def claim_execution(self, worker_id, labels, lease_seconds):
+        """Claim the oldest pending run with one of a worker's labels
+
+        The run is moved to the 'running' state with a lease that the worker
+        must renew before it expires. A conditional update makes sure only
+        one worker wins a run. Returns the execution, or None if there is
+        nothing to do.
+        """
+        session = self.Session()
+        try:
+            while True:
+                candidate = session.query(Execution.id).filter(
+                    Execution.state == 'pending',
+                    Execution.worker_label.in_(labels)
+                ).order_by(Execution.id).first()
+                if not candidate:
+                    return None
+
+                claimed = session.query(Execution).filter_by(id=candidate.id, state='pending').update({
+                    'state': 'running',
+                    'worker_id': worker_id,
+                    'lease_expires_at': datetime.now() + timedelta(seconds=lease_seconds),
+                    'attempts': func.coalesce(Execution.attempts, 0) + 1
+                }, synchronize_session=False)
+                if claimed:
+                    self._bump_version(session, 'executions')
+                session.commit()
+
+                # Another worker got there first; try the next run
+                if claimed:
+                    return self._execution_to_dict(session.get(Execution, candidate.id))
+        except OperationalError as e:
+            print(f"Error claiming execution: {e}")
+            session.rollback()
+            return None
+        finally:
+            session.close()
+
+    def renew_leases(self, worker_id, execution_ids, lease_seconds):
+        """Extend a worker's leases; returns the ids of the runs it still holds"""
+        session = self.Session()
+        try:
+            held = session.query(Execution).filter(
+                Execution.id.in_(execution_ids),
+                Execution.worker_id == worker_id,
+                Execution.state == 'running'
+            )
+            held.update({
+                'lease_expires_at': datetime.now() + timedelta(seconds=lease_seconds)
+            }, synchronize_session=False)
+            session.commit()
+            return [execution_id for execution_id, in held.with_entities(Execution.id).all()]
+        except OperationalError as e:
+            # Keep running; the lease is renewed on the next heartbeat
+            print(f"Error renewing leases: {e}")
+            session.rollback()
+            return list(execution_ids)
+        finally:
+            session.close()
+
+    def expire_leases(self, max_attempts):
+        """Requeue runs whose worker stopped renewing their lease
+
+        Runs that have been claimed max_attempts times are marked as
+        interrupted instead. Returns the number of executions updated.
+        """
         session = self.Session()
         try:
-            executions = session.query(Execution).filter_by(job_id=job_id).order_by(Execution.timestamp.desc()).limit(limit).all()
+            executions = session.query(Execution).filter(
+                Execution.state == 'running',
+                Execution.lease_expires_at < datetime.now()
+            ).all()
+            for execution in executions:
+                execution.worker_id = None
+                execution.lease_expires_at = None
+                if (execution.attempts or 0) < max_attempts:
+                    execution.state = 'pending'
+                else:
+                    execution.state = 'interrupted'
+                    if execution.log_file and os.path.exists(execution.log_file):
+                        execution.log_size = os.path.getsize(execution.log_file)
+                        self._index_log(session, execution.id, self._read_log_tail(execution.log_file))
+
+            if executions:
+                self._bump_version(session, 'executions')
+            session.commit()
+            return len(executions)
+        except OperationalError as e:
+            print(f"Error expiring leases: {e}")
+            session.rollback()
+            return 0
+        finally:
+            session.close()
+
+    def get_active_executions(self, execution_ids=(), after_id=None, workers_only=False):
+        """Get runs that are queued or running, plus the given runs and any added after an id
+
+        With workers_only, only runs queued for or running on workers are
+        included, besides the given runs.
+        """
+        session = self.Session()
+        try:
+            condition = Execution.state.in_(['pending', 'running'])
+            if workers_only:
+                condition = condition & Execution.worker_label.isnot(None)
+            if execution_ids:
+                condition = condition | Execution.id.in_(execution_ids)
+            if after_id is not None:
+                condition = condition | (Execution.id > after_id)
+            executions = session.query(Execution).filter(condition).order_by(Execution.id).all()
             return [self._execution_to_dict(execution) for execution in executions]
         finally:
             session.close()
 
+    def get_last_execution_id(self):
+        """Get the id of the newest execution, or 0 if there are none"""
+        session = self.Session()
+        try:
+            return session.query(func.max(Execution.id)).scalar() or 0
+        finally:
+            session.close()
+
+    def get_worker_queue_stats(self):
+        """Count runs waiting for and running on workers, per label"""
+        session = self.Session()
+        try:
+            counts = session.query(
+                Execution.worker_label, Execution.state, func.count(Execution.id)
+            ).filter(
+                Execution.state.in_(['pending', 'running']),
+                Execution.worker_label.isnot(None)
+            ).group_by(Execution.worker_label, Execution.state).all()
+
+            stats = {}
+            for label, state, count in counts:
+                stats.setdefault(label, {'pending': 0, 'running': 0})[state] = count
+            return stats
+        finally:
+            session.close()
+
+    def get_job_executions(self, job_id, limit=10):
+        """Get execution history for a specific job"""
+        return self.get_executions_page(job_id=job_id, limit=limit)[0]
+
     def get_all_executions(self, limit=50):
         """Get execution history for all jobs"""
+        return self.get_executions_page(limit=limit, include_job=True)[0]
+
+    def iter_execution_batches(self, since=None, job_id=None, include_job=False, include_log_size=False,
+                               batch_size=1000):
+        """Iterate over execution history, oldest first, in lists of up to batch_size dictionaries
+
+        Each dictionary has the EXPORT_COLUMNS, plus job_name and log_size if
+        requested.
+
+        Batches are keyset-paginated on (timestamp, id), each read in its own
+        short transaction, so memory use doesn't grow with the history and a
+        slow consumer never holds the database lock. The job name comes from
+        a join, and the log size from the stored column. Executions added
+        meanwhile are included if they sort after the rows already read.
+        """
+        columns = [getattr(Execution, name) for name in EXPORT_COLUMNS]
+        if include_log_size:
+            columns.append(Execution.log_size)
+        if include_job:
+            columns.append(Job.name.label('job_name'))
+        keys = [column.key for column in columns]
+
+        last = None
+        while True:
+            session = self.Session()
+            try:
+                query = session.query(*columns)
+                if include_job:
+                    query = query.outerjoin(Job, Job.id == Execution.job_id)
+                if job_id:
+                    query = query.filter(Execution.job_id == job_id)
+                if since:
+                    query = query.filter(Execution.timestamp >= since)
+                if last:
+                    query = query.filter(tuple_(Execution.timestamp, Execution.id) > tuple_(*last))
+                rows = query.order_by(Execution.timestamp, Execution.id).limit(batch_size).all()
+            finally:
+                session.close()
+
+            if not rows:
+                return
+            batch = []
+            for row in rows:
+                execution = dict(zip(keys, row))
+                execution['timestamp'] = row.timestamp.isoformat()
+                batch.append(execution)
+            yield batch
+
+            if len(rows) < batch_size:
+                return
+            last = (rows[-1].timestamp, rows[-1].id)
+
+    def get_executions_page(self, job_id=None, limit=50, cursor=None, states=None, exit_code=None,
+                            since=None, until=None, min_duration=None, include_job=False):
+        """Get a page of execution history, newest first
+
+        Pages are keyset-paginated on (timestamp, id) so each page is an index
+        range scan regardless of how deep it is. cursor is the value returned
+        for the previous page. Returns (executions, next_cursor), where
+        next_cursor is None on the last page.
+        """
         session = self.Session()
         try:
-            executions = session.query(Execution).join(Job).order_by(Execution.timestamp.desc()).limit(limit).all()
-            return [self._execution_to_dict(execution, include_job=True) for execution in executions]
+            if include_job:
+                query = session.query(Execution, Job.name).join(Job, Job.id == Execution.job_id)
+            else:
+                query = session.query(Execution)
+
+            if job_id:
+                query = query.filter(Execution.job_id == job_id)
+            if states:
+                query = query.filter(Execution.state.in_(states))
+            if exit_code is not None:
+                query = query.filter(Execution.exit_code == exit_code)
+            if since:
+                query = query.filter(Execution.timestamp >= since)
+            if until:
+                query = query.filter(Execution.timestamp < until)
+            if min_duration is not None:
+                query = query.filter(Execution.duration >= min_duration)
+            if cursor:
+                query = query.filter(tuple_(Execution.timestamp, Execution.id) < tuple_(*decode_cursor(cursor)))
+
+            # Fetch one extra row to find out whether there is a next page
+            rows = query.order_by(Execution.timestamp.desc(), Execution.id.desc()).limit(limit + 1).all()
+
+            executions = []
+            for row in rows[:limit]:
+                if include_job:
+                    execution, job_name = row
+                    execution_dict = self._execution_to_dict(execution)
+                    execution_dict['job_name'] = job_name
+                else:
+                    execution_dict = self._execution_to_dict(row)
+                executions.append(execution_dict)
+
+            next_cursor = None
+            if len(rows) > limit:
+                last = rows[limit - 1][0] if include_job else rows[limit - 1]
+                next_cursor = encode_cursor(last.timestamp, last.id)
+
+            return executions, next_cursor
         finally:
             session.close()
 
-    def get_execution_log(self, job_id, timestamp):
-        """Get log for a specific execution"""
+    def get_average_durations(self):
+        """Get the average duration of each job's finished runs, keyed by job id"""
         session = self.Session()
         try:
-            execution = session.query(Execution).filter_by(
-                job_id=job_id
-            ).filter(
-                Execution.timestamp == datetime.fromisoformat(timestamp)
+            rows = session.query(Execution.job_id, func.avg(Execution.duration)).filter(
+                Execution.state.in_(['success', 'failed']),
+                Execution.duration.isnot(None)
+            ).group_by(Execution.job_id).all()
+            return dict(rows)
+        finally:
+            session.close()
+
+    def find_execution_id(self, job_id, timestamp):
+        """Get the id of a job's execution that started at a datetime, if any"""
+        session = self.Session()
+        try:
+            row = session.query(Execution.id).filter(
+                Execution.job_id == job_id,
+                Execution.timestamp == timestamp
             ).first()
+            return row[0] if row else None
+        finally:
+            session.close()
 
-            if not execution or not execution.log_file:
+    def get_execution(self, execution_id):
+        """Get a specific execution by ID"""
+        session = self.Session()
+        try:
+            row = session.query(Execution, Job.name).join(
+                Job, Job.id == Execution.job_id
+            ).filter(Execution.id == execution_id).first()
+            if not row:
                 return None
 
-            # Read log file content
-            try:
-                with open(execution.log_file, 'r') as f:
-                    log_content = f.read()
-
-                return {
-                    'timestamp': execution.timestamp.isoformat(),
-                    'output': log_content,
-                    'exit_code': execution.exit_code,
-                    'duration': execution.duration
-                }
-            except FileNotFoundError:
-                return {
-                    'timestamp': execution.timestamp.isoformat(),
-                    'output': 'Log file not found',
-                    'exit_code': execution.exit_code,
-                    'duration': execution.duration
-                }
+            execution, job_name = row
+            result = self._execution_to_dict(execution)
+            result['job_name'] = job_name
+            return result
+        finally:
+            session.close()
+
+    def search_logs(self, query, job_id=None, limit=50):
+        """Find executions whose log contains a phrase, newest first
+
+        Returns None if log search is not available. Each result includes the
+        job name and the matching log lines.
+        """
+        if not self.log_search_enabled:
+            return None
+
+        # Match the query as a literal phrase rather than FTS5 syntax
+        phrase = '"' + query.replace('"', '""') + '"'
+        params = {'phrase': phrase, 'start': SNIPPET_START, 'end': SNIPPET_END, 'limit': limit}
+        job_filter = ''
+        if job_id:
+            job_filter = 'AND e.job_id = :job_id'
+            params['job_id'] = job_id
+
+        session = self.Session()
+        try:
+            rows = session.execute(text(f"""
+                SELECT e.id, e.job_id, j.name, e.timestamp, e.state, e.exit_code,
+                       snippet(log_search, 0, :start, :end, '', 64)
+                FROM log_search
+                JOIN executions e ON e.id = log_search.rowid
+                JOIN jobs j ON j.id = e.job_id
+                WHERE log_search MATCH :phrase {job_filter}
+                ORDER BY e.timestamp DESC, e.id DESC
+                LIMIT :limit
+            """), params).fetchall()
+
+            results = []
+            for execution_id, execution_job_id, job_name, timestamp, state, exit_code, snippet in rows:
+                # Keep only the lines of the snippet that contain a match
+                lines = [
+                    line.replace(SNIPPET_START, '').replace(SNIPPET_END, '').strip()
+                    for line in snippet.splitlines()
+                    if SNIPPET_START in line or SNIPPET_END in line
+                ]
+                results.append({
+                    'execution_id': execution_id,
+                    'job_id': execution_job_id,
+                    'job_name': job_name,
+                    'timestamp': datetime.fromisoformat(timestamp).isoformat(),
+                    'state': state,
+                    'exit_code': exit_code,
+                    'lines': lines
+                })
+
+            return results
         finally:
             session.close()
 
     def add_job_dependency(self, parent_job_id, child_job_id):
-        """Add a dependency between two jobs"""
+        """Add a dependency between two jobs
+
+        Returns False if either job doesn't exist. Raises ValueError if the
+        dependency would close a cycle.
+        """
         session = self.Session()
         try:
             # Check if both jobs exist
@@ -277,6 +1058,21 @@ class Database:
             if existing_dependency:
                 return True  # Already exists
 
+            # The parent must not be downstream of the child
+            children = {}
+            for parent_id, child_id in session.query(JobDependency.parent_job_id, JobDependency.child_job_id):
+                children.setdefault(parent_id, []).append(child_id)
+            pending = [child_job_id]
+            seen = {child_job_id}
+            while pending:
+                job_id = pending.pop()
+                if job_id == parent_job_id:
+                    raise ValueError(f"{parent_job.name} already depends on {child_job.name}, directly or not")
+                for next_id in children.get(job_id, ()):
+                    if next_id not in seen:
+                        seen.add(next_id)
+                        pending.append(next_id)
+
             # Create new dependency
             dependency = JobDependency(
                 parent_job_id=parent_job_id,
@@ -287,6 +1083,7 @@ class Database:
             child_job.trigger_type = 'dependency'
 
             session.add(dependency)
+            self._bump_version(session, 'jobs')
             session.commit()
             return True
         finally:
@@ -317,40 +1114,12 @@ class Database:
                 if child_job:
                     child_job.trigger_type = 'schedule'
 
+            self._bump_version(session, 'jobs')
             session.commit()
             return True
         finally:
             session.close()
 
-    def get_job_dependencies(self, job_id):
-        """Get all dependencies for a job"""
-        session = self.Session()
-        try:
-            job = session.query(Job).filter_by(id=job_id).first()
-            if not job:
-                return None
-
-            # Get parent jobs (jobs that trigger this job)
-            parents = []
-            for dep in job.parent_dependencies:
-                parent_job = session.query(Job).filter_by(id=dep.parent_job_id).first()
-                if parent_job:
-                    parents.append(self._job_to_dict(parent_job))
-
-            # Get child jobs (jobs triggered by this job)
-            children = []
-            for dep in job.child_dependencies:
-                child_job = session.query(Job).filter_by(id=dep.child_job_id).first()
-                if child_job:
-                    children.append(self._job_to_dict(child_job))
-
-            return {
-                'parents': parents,
-                'children': children
-            }
-        finally:
-            session.close()
-
     def get_all_dependencies(self):
         """Get all job dependencies"""
         session = self.Session()
@@ -368,69 +1137,41 @@ class Database:
         finally:
             session.close()
 
-    def get_dependent_jobs(self, job_id):
-        """Get jobs that should be triggered when this job completes successfully"""
-        session = self.Session()
-        try:
-            dependencies = session.query(JobDependency).filter_by(parent_job_id=job_id).all()
-            result = []
-
-            for dep in dependencies:
-                child_job = session.query(Job).filter_by(id=dep.child_job_id).first()
-                if child_job and not child_job.is_paused:
-                    result.append(self._job_to_dict(child_job))
-
-            return result
-        finally:
-            session.close()
-
     def cleanup_old_executions(self, job_id=None):
         """Clean up old execution records and log files
 
         If job_id is provided, only clean up executions for that job.
-        Otherwise, clean up executions for all jobs.
+        Otherwise, clean up executions for all jobs. Expired rows are removed
+        with a single windowed DELETE and their log files are deleted after
+        the commit. Returns the number of executions removed, or None on error.
         """
         session = self.Session()
         try:
-            if job_id:
-                # Clean up executions for a specific job
-                self._cleanup_job_executions(session, job_id)
-            else:
-                # Clean up executions for all jobs
-                jobs = session.query(Job).all()
-                for job in jobs:
-                    self._cleanup_job_executions(session, job.id)
-
+            log_files = self._delete_expired_executions(session, job_id)
+            if log_files:
+                self._bump_version(session, 'executions')
             session.commit()
-            return True
         except Exception as e:
             print(f"Error cleaning up executions: {e}")
             session.rollback()
-            return False
+            return None
         finally:
             session.close()
 
+        self._remove_log_files(log_files)
+        return len(log_files)
+
     def delete_all_job_executions(self, job_id):
         """Delete all execution records and log files for a job"""
         session = self.Session()
         try:
-            # Get all executions for the job
-            executions = session.query(Execution).filter_by(job_id=job_id).all()
-
-            for execution in executions:
-                # Delete the log file if it exists
-                if execution.log_file and os.path.exists(execution.log_file):
-                    try:
-                        os.remove(execution.log_file)
-                        print(f"Deleted log file: {execution.log_file}")
-                    except Exception as e:
-                        print(f"Error deleting log file {execution.log_file}: {e}")
-
-                # Delete the execution record
-                session.delete(execution)
-
+            rows = session.execute(
+                text("DELETE FROM executions WHERE job_id = :job_id RETURNING log_file"),
+                {'job_id': job_id}
+            ).fetchall()
+            if rows:
+                self._bump_version(session, 'executions')
             session.commit()
-            return True
         except Exception as e:
             print(f"Error deleting job executions: {e}")
             session.rollback()
@@ -438,62 +1179,178 @@ class Database:
         finally:
             session.close()
 
-    def _cleanup_job_executions(self, session, job_id):
-        """Helper method to clean up executions for a specific job"""
-        # Get all executions for the job, ordered by timestamp (newest first)
-        executions = session.query(Execution).filter_by(job_id=job_id).order_by(Execution.timestamp.desc()).all()
+        self._remove_log_files([row[0] for row in rows])
+        return True
 
-        # Keep the most recent max_executions_per_job executions
-        if len(executions) > self.max_executions_per_job:
-            executions_to_delete = executions[self.max_executions_per_job:]
+    def _delete_expired_executions(self, session, job_id=None):
+        """Delete executions outside their retention policy and return their log files"""
+        params = {
+            'max_executions': self.max_executions_per_job,
+            'retention_days': self.retention_days,
+            'max_log_mb': self.max_log_mb_per_job,
+            'now': datetime.now().isoformat(sep=' ')
+        }
+        job_filter = ''
+        if job_id:
+            job_filter = 'AND e.job_id = :job_id'
+            params['job_id'] = job_id
 
-            for execution in executions_to_delete:
-                # Delete the log file if it exists
-                if execution.log_file and os.path.exists(execution.log_file):
-                    try:
-                        os.remove(execution.log_file)
-                    except Exception as e:
-                        print(f"Error deleting log file {execution.log_file}: {e}")
+        expired = EXPIRED_EXECUTIONS_SQL.format(job_filter=job_filter)
+        rows = session.execute(
+            text(f"DELETE FROM executions WHERE id IN ({expired}) RETURNING log_file"),
+            params
+        ).fetchall()
 
-                # Delete the execution record
-                session.delete(execution)
+        return [row[0] for row in rows]
 
-    def _job_to_dict(self, job):
-        """Convert Job object to dictionary"""
-        session = self.Session()
+    def _init_log_search(self):
+        """Create the log search table and trigger, returning False without FTS5"""
         try:
-            # Count dependencies
-            parent_count = session.query(JobDependency).filter_by(child_job_id=job.id).count()
-            child_count = session.query(JobDependency).filter_by(parent_job_id=job.id).count()
-
-            # Get parent jobs if this is a dependency-triggered job
-            parent_jobs = []
-            if job.trigger_type == 'dependency':
-                parent_dependencies = session.query(JobDependency).filter_by(child_job_id=job.id).all()
-                for dep in parent_dependencies:
-                    parent_job = session.query(Job).filter_by(id=dep.parent_job_id).first()
-                    if parent_job:
-                        parent_jobs.append({
-                            'id': parent_job.id,
-                            'name': parent_job.name
-                        })
-
-            return {
-                'id': job.id,
-                'name': job.name,
-                'command': job.command,
-                'schedule': job.schedule,
-                'description': job.description,
-                'created_at': job.created_at.isoformat() if job.created_at else None,
-                'last_run': job.last_run.isoformat() if job.last_run else None,
-                'is_paused': job.is_paused,
-                'trigger_type': job.trigger_type,
-                'parent_count': parent_count,
-                'child_count': child_count,
-                'parent_jobs': parent_jobs if parent_jobs else None
-            }
-        finally:
-            session.close()
+            with self.engine.begin() as conn:
+                for statement in LOG_SEARCH_DDL:
+                    conn.execute(text(statement))
+            return True
+        except OperationalError as e:
+            print(f"Log search disabled: {e}")
+            return False
+
+    def _index_log(self, session, execution_id, log_content):
+        """Add an execution's log to the search index"""
+        if not self.log_search_enabled or not log_content:
+            return
+
+        session.execute(
+            text("INSERT OR REPLACE INTO log_search (rowid, output) VALUES (:id, :output)"),
+            {'id': execution_id, 'output': log_content[-self.log_search_max_chars:]}
+        )
+
+    def _remove_log_files(self, log_files):
+        """Delete log files, ignoring ones that are already gone"""
+        for log_file in log_files:
+            if not log_file:
+                continue
+            try:
+                os.remove(log_file)
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                print(f"Error deleting log file {log_file}: {e}")
+
+    def _log_file_path(self, job_id, timestamp):
+        """Get the log file path for a job execution"""
+        # Generate a unique filename based on job_id and timestamp
+        filename = f"{job_id}_{timestamp.strftime('%Y%m%d%H%M%S%f')}.txt"
+        return os.path.join(self.logs_path, filename)
+
+    def _read_log_tail(self, log_file):
+        """Read the end of a log file, up to the amount indexed for search"""
+        try:
+            with open(log_file, 'rb') as f:
+                f.seek(0, os.SEEK_END)
+                f.seek(max(0, f.tell() - self.log_search_max_chars))
+                return f.read().decode('utf-8', errors='ignore')
+        except OSError:
+            return None
+
+    def _job_to_dict(self, session, job):
+        """Convert Job object to dictionary"""
+        return self._jobs_to_dicts(session, [job])[0]
+
+    def _jobs_to_dicts(self, session, jobs, all_jobs=False):
+        """Convert Job objects to dictionaries using the caller's session
+
+        Dependency counts and parent names are loaded with a fixed number of
+        aggregate/join queries instead of per-job lookups. Pass all_jobs=True
+        when jobs is the whole table so the queries can skip the id filter.
+        """
+        if not jobs:
+            return []
+
+        job_ids = [job.id for job in jobs]
+
+        # Count dependencies
+        parent_counts_query = session.query(
+            JobDependency.child_job_id, func.count(JobDependency.id)
+        ).group_by(JobDependency.child_job_id)
+        child_counts_query = session.query(
+            JobDependency.parent_job_id, func.count(JobDependency.id)
+        ).group_by(JobDependency.parent_job_id)
+
+        # Get parent jobs of dependency-triggered jobs
+        parent_job = aliased(Job)
+        child_job = aliased(Job)
+        parent_jobs_query = session.query(
+            JobDependency.child_job_id, parent_job.id, parent_job.name
+        ).join(
+            parent_job, parent_job.id == JobDependency.parent_job_id
+        ).join(
+            child_job, child_job.id == JobDependency.child_job_id
+        ).filter(child_job.trigger_type == 'dependency')
+
+        if not all_jobs:
+            parent_counts_query = parent_counts_query.filter(JobDependency.child_job_id.in_(job_ids))
+            child_counts_query = child_counts_query.filter(JobDependency.parent_job_id.in_(job_ids))
+            parent_jobs_query = parent_jobs_query.filter(JobDependency.child_job_id.in_(job_ids))
+
+        parent_counts = dict(parent_counts_query.all())
+        child_counts = dict(child_counts_query.all())
+
+        parent_jobs = {}
+        for child_id, parent_id, parent_name in parent_jobs_query.order_by(JobDependency.id).all():
+            parent_jobs.setdefault(child_id, []).append({
+                'id': parent_id,
+                'name': parent_name
+            })
+
+        return [{
+            'id': job.id,
+            'name': job.name,
+            'command': job.command,
+            'schedule': job.schedule,
+            'description': job.description,
+            'created_at': job.created_at.isoformat() if job.created_at else None,
+            'last_run': job.last_run.isoformat() if job.last_run else None,
+            'is_paused': job.is_paused,
+            'trigger_type': job.trigger_type,
+            'max_executions': job.max_executions,
+            'retention_days': job.retention_days,
+            'max_log_mb': job.max_log_mb,
+            'max_output_mb': job.max_output_mb,
+            'priority': job.priority or 'normal',
+            'worker_label': job.worker_label,
+            'jitter_seconds': job.jitter_seconds,
+            'join_policy': job.join_policy or 'all',
+            'parent_count': parent_counts.get(job.id, 0),
+            'child_count': child_counts.get(job.id, 0),
+            'parent_jobs': parent_jobs.get(job.id)
+        } for job in jobs]
+
+    def _bump_version(self, session, name):
+        """Increment a collection's change counter as part of the session's transaction"""
+        version = session.execute(text(
+            "INSERT INTO change_versions (name, version) VALUES (:name, 1) "
+            "ON CONFLICT (name) DO UPDATE SET version = version + 1 RETURNING version"
+        ), {'name': name}).scalar()
+        # Published to self.versions once the transaction commits
+        session.info.setdefault('versions', {})[name] = version
+
+    def _publish_versions(self, session):
+        """Record the change counters bumped by a committed transaction"""
+        versions = session.info.pop('versions', None)
+        if versions:
+            with self._versions_lock:
+                for name, version in versions.items():
+                    self._own_versions.setdefault(name, set()).add(version)
+            self._update_versions(versions)
+
+    def _update_versions(self, versions):
+        """Move the known change counters forward, noting when each one moved"""
+        now = datetime.now(timezone.utc)
+        with self._versions_lock:
+            for name, version in versions.items():
+                if version > self.versions.get(name, 0):
+                    self.versions[name] = version
+                    self.versions_modified[name] = now
 
     def _execution_to_dict(self, execution, include_job=False):
         """Convert Execution object to dictionary"""
@@ -504,7 +1361,12 @@ class Database:
             'state': execution.state,
             'exit_code': execution.exit_code,
             'duration': execution.duration,
-            'log_file': execution.log_file
+            'log_file': execution.log_file,
+            'log_size': execution.log_size,
+            'worker_label': execution.worker_label,
+            'worker_id': execution.worker_id,
+            'attempts': execution.attempts,
+            'dag_run_id': execution.dag_run_id
         }
 
         if include_job:
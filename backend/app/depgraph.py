@@ -0,0 +1,179 @@
+import threading
+import uuid
+from datetime import datetime, timezone
+
+
+class DependencyGraph:
+    """In-memory adjacency index of the job dependencies
+
+    All edges are loaded with load_edges() on first use. Edges added or
+    removed by this process are applied in place; invalidate() makes the
+    next read reload them, e.g. after another process changed them. Parents
+    and children are kept in insertion order. The version goes up whenever
+    the edges change, and only then; the epoch changes on every restart.
+    """
+
+    def __init__(self, load_edges):
+        self.load_edges = load_edges
+        self.loads = 0
+        self.epoch = uuid.uuid4().hex
+        self._version = 0
+        self._modified_at = datetime.now(timezone.utc)
+
+        # job id -> {child id: None} and {parent id: None}
+        self._children = {}
+        self._parents = {}
+        self._edges = 0
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def children(self, job_id):
+        """Get the ids of the jobs that depend on a job"""
+        with self._lock:
+            self._ensure_loaded()
+            return list(self._children.get(job_id, ()))
+
+    def parents(self, job_id):
+        """Get the ids of the jobs a job depends on"""
+        with self._lock:
+            self._ensure_loaded()
+            return list(self._parents.get(job_id, ()))
+
+    def edges(self):
+        """Get every dependency as a dictionary, like Database.get_all_dependencies"""
+        with self._lock:
+            self._ensure_loaded()
+            return [
+                {'parent_job_id': parent_id, 'child_job_id': child_id}
+                for parent_id, children in self._children.items()
+                for child_id in children
+            ]
+
+    def version(self):
+        """Get the version of the edges and when it last moved"""
+        with self._lock:
+            self._ensure_loaded()
+            return self._version, self._modified_at
+
+    def ancestors(self, job_id, max_depth=None):
+        """Get the jobs a job depends on, directly or not, as {job id: depth}"""
+        with self._lock:
+            self._ensure_loaded()
+            return self._walk(self._parents, job_id, max_depth)
+
+    def descendants(self, job_id, max_depth=None):
+        """Get the jobs that depend on a job, directly or not, as {job id: depth}"""
+        with self._lock:
+            self._ensure_loaded()
+            return self._walk(self._children, job_id, max_depth)
+
+    def add_edge(self, parent_job_id, child_job_id):
+        """Record a dependency added to the database"""
+        with self._lock:
+            if self._loaded and self._add(parent_job_id, child_job_id):
+                self._changed()
+
+    def remove_edge(self, parent_job_id, child_job_id):
+        """Forget a dependency removed from the database"""
+        with self._lock:
+            if self._loaded and self._remove(parent_job_id, child_job_id):
+                self._changed()
+
+    def remove_job(self, job_id):
+        """Forget the dependencies of a removed job"""
+        with self._lock:
+            if not self._loaded:
+                return
+            edges = self._edges
+            for child_id in list(self._children.get(job_id, ())):
+                self._remove(job_id, child_id)
+            for parent_id in list(self._parents.get(job_id, ())):
+                self._remove(parent_id, job_id)
+            if self._edges != edges:
+                self._changed()
+
+    def invalidate(self):
+        """Reload the dependencies on the next read"""
+        with self._lock:
+            # The edges are kept until then, to tell whether they changed
+            self._loaded = False
+
+    def stats(self):
+        """Get the size of the index"""
+        with self._lock:
+            return {
+                'loaded': self._loaded,
+                'loads': self.loads,
+                'version': self._version,
+                'edges': self._edges,
+                'parents': len(self._children),
+                'children': len(self._parents)
+            }
+
+    def _ensure_loaded(self):
+        """Load all edges if needed; the caller holds the lock"""
+        if self._loaded:
+            return
+        self.loads += 1
+        previous = self._edge_list()
+        self._children = {}
+        self._parents = {}
+        self._edges = 0
+        for dependency in self.load_edges():
+            self._add(dependency['parent_job_id'], dependency['child_job_id'])
+        self._loaded = True
+        if self._edge_list() != previous:
+            self._changed()
+
+    def _edge_list(self):
+        """Get the edges as (parent id, child id) pairs, in order; the caller holds the lock"""
+        return [(parent_id, child_id) for parent_id, children in self._children.items() for child_id in children]
+
+    def _changed(self):
+        """Move the version forward; the caller holds the lock"""
+        self._version += 1
+        self._modified_at = datetime.now(timezone.utc)
+
+    def _add(self, parent_job_id, child_job_id):
+        """Add an edge to both directions of the index, if new; the caller holds the lock"""
+        children = self._children.setdefault(parent_job_id, {})
+        if child_job_id in children:
+            return False
+        children[child_job_id] = None
+        self._parents.setdefault(child_job_id, {})[parent_job_id] = None
+        self._edges += 1
+        return True
+
+    def _remove(self, parent_job_id, child_job_id):
+        """Remove an edge from both directions of the index, if present; the caller holds the lock"""
+        children = self._children.get(parent_job_id)
+        if not children or child_job_id not in children:
+            return False
+        del children[child_job_id]
+        if not children:
+            del self._children[parent_job_id]
+        parents = self._parents[child_job_id]
+        del parents[parent_job_id]
+        if not parents:
+            del self._parents[child_job_id]
+        self._edges -= 1
+        return True
+
+    @staticmethod
+    def _walk(adjacency, job_id, max_depth):
+        """Breadth-first search from a job, up to max_depth edges away"""
+        depths = {job_id: 0}
+        frontier = [job_id]
+        depth = 0
+        while frontier and (max_depth is None or depth < max_depth):
+            depth += 1
+            next_frontier = []
+            for current in frontier:
+                for other in adjacency.get(current, ()):
+                    if other not in depths:
+                        depths[other] = depth
+                        next_frontier.append(other)
+            frontier = next_frontier
+
+        del depths[job_id]
+        return depths
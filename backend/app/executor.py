@@ -0,0 +1,140 @@
+import collections
+import threading
+
+# Priority classes, highest first
+PRIORITIES = ('high', 'normal', 'low')
+DEFAULT_PRIORITY = 'normal'
+
+
+class ExecutionPool:
+    """Limit the number of job runs in progress
+
+    Every run, whether scheduled, manual or triggered by a dependency, goes
+    through submit(). Waiting runs are taken from the highest priority class
+    first and in submission order within a class. A job has at most one
+    waiting run: submitting a job that is already waiting is a no-op, so a
+    job that fires often can't crowd out others. A job never runs twice at
+    once either: its waiting run is held back until the run in progress is
+    done, and runs of other jobs go ahead of it meanwhile.
+
+    Runs are started by `threads` dispatcher threads with fn(job_id, done).
+    fn may return as soon as the run is under way; the run holds its slot
+    until done() is called, so the number of runs in progress isn't tied to
+    the number of threads.
+    """
+
+    def __init__(self, max_running=10, threads=4):
+        self.max_running = max_running
+        self.submitted = 0
+        self.coalesced = 0
+        self.completed = 0
+
+        # priority -> ids of waiting jobs, oldest first
+        self._queues = {priority: collections.deque() for priority in PRIORITIES}
+        # job_id -> (function, priority) of its waiting run
+        self._waiting = {}
+        # ids of the jobs with a run in progress
+        self._running = set()
+        self._busy = 0
+        self._condition = threading.Condition()
+
+        self._workers = []
+        for index in range(threads):
+            worker = threading.Thread(target=self._run, name=f'job-dispatcher-{index}')
+            worker.daemon = True
+            worker.start()
+            self._workers.append(worker)
+
+    def submit(self, job_id, fn, priority=DEFAULT_PRIORITY, on_queued=None):
+        """Queue a run of fn(job_id, done)
+
+        on_queued(job_id) is called before the run is queued if it has to
+        wait for a free slot; not if it only waits for the job's run in
+        progress. Returns False if the job already has a waiting run.
+        """
+        if priority not in PRIORITIES:
+            priority = DEFAULT_PRIORITY
+
+        with self._condition:
+            if job_id in self._waiting:
+                self.coalesced += 1
+                return False
+            must_wait = job_id not in self._running and self._busy + self._queued() >= self.max_running
+            self._waiting[job_id] = (fn, priority)
+            self.submitted += 1
+
+        # Report the wait before a worker can pick the run up
+        if must_wait and on_queued:
+            on_queued(job_id)
+
+        with self._condition:
+            self._queues[priority].append(job_id)
+            self._condition.notify()
+        return True
+
+    def stats(self):
+        """Get the number of runs in progress and queue depths"""
+        with self._condition:
+            return {
+                'max_running': self.max_running,
+                'running': self._busy,
+                'queued': self._queued(),
+                'held': sum(1 for job_id in self._waiting if job_id in self._running),
+                'queued_by_priority': {priority: len(queue) for priority, queue in self._queues.items()},
+                'submitted': self.submitted,
+                'coalesced': self.coalesced,
+                'completed': self.completed
+            }
+
+    def _queued(self):
+        """Count waiting runs; the caller holds the lock"""
+        return sum(len(queue) for queue in self._queues.values())
+
+    def _next(self):
+        """Take the next waiting run of a job that isn't running; the caller holds the lock"""
+        for priority in PRIORITIES:
+            queue = self._queues[priority]
+            for index, job_id in enumerate(queue):
+                if job_id in self._running:
+                    continue
+                del queue[index]
+                fn, _ = self._waiting.pop(job_id)
+                self._running.add(job_id)
+                return job_id, fn
+        return None
+
+    def _release(self, job_id):
+        """Return a function that frees a run's slot, once"""
+        released = []
+
+        def done():
+            with self._condition:
+                if released:
+                    return
+                released.append(True)
+                self._running.discard(job_id)
+                self._busy -= 1
+                self.completed += 1
+                self._condition.notify()
+
+        return done
+
+    def _run(self):
+        """Dispatcher loop: start waiting runs while slots are free"""
+        while True:
+            with self._condition:
+                task = None
+                while task is None:
+                    if self._busy < self.max_running:
+                        task = self._next()
+                    if task is None:
+                        self._condition.wait()
+                self._busy += 1
+
+            job_id, fn = task
+            done = self._release(job_id)
+            try:
+                fn(job_id, done)
+            except Exception as e:
+                print(f"Error running job {job_id}: {e}")
+                done()
@@ -0,0 +1,126 @@
+import collections
+from datetime import timedelta
+
+# Limits that keep a forecast cheap to compute
+MAX_WINDOW = timedelta(days=7)
+MAX_BUCKETS = 10000
+MIN_BUCKET_SECONDS = 60
+
+
+def fire_times(trigger, start, end):
+    """Yield a trigger's fire times from start up to (not including) end"""
+    fire_time = trigger.get_next_fire_time(None, start)
+    while fire_time and fire_time < end:
+        yield fire_time
+        fire_time = trigger.get_next_fire_time(fire_time, fire_time + timedelta(microseconds=1))
+
+
+def forecast_load(groups, start, end, bucket_seconds):
+    """Forecast the runs started and the time spent running per time bucket
+
+    groups is a list of (trigger, durations) pairs, one per distinct
+    schedule, where durations holds the average run duration of each job
+    using the trigger (None for jobs that have no history). Fire times are
+    worked out once per trigger and count for all of its jobs. Each run is
+    assumed to take its job's average duration and is spread over the
+    buckets it overlaps; a bucket's concurrency is the average number of
+    runs in progress during it. Raises ValueError if the window or bucket
+    size is out of range.
+    """
+    if end <= start:
+        raise ValueError("to must be after from")
+    if end - start > MAX_WINDOW:
+        raise ValueError(f"The window can be at most {MAX_WINDOW.days} days")
+    if bucket_seconds < MIN_BUCKET_SECONDS:
+        raise ValueError(f"bucket must be at least {MIN_BUCKET_SECONDS} seconds")
+
+    window_seconds = (end - start).total_seconds()
+    count = int(-(-window_seconds // bucket_seconds))
+    if count > MAX_BUCKETS:
+        raise ValueError(f"The window can span at most {MAX_BUCKETS} buckets")
+
+    runs = [0] * count
+    busy = [0.0] * count
+    # Difference array of buckets filled completely by runs, in seconds
+    full = [0.0] * (count + 1)
+
+    jobs = 0
+    without_history = 0
+    for trigger, durations in groups:
+        jobs += len(durations)
+        without_history += durations.count(None)
+        known = [duration for duration in durations if duration]
+
+        # Runs of a trigger's jobs fill the buckets the same way whenever they
+        # start at the same point of a bucket, e.g. on every hour
+        spreads = {}
+        for fire_time in fire_times(trigger, start, end):
+            offset = (fire_time - start).total_seconds()
+            index = int(offset // bucket_seconds)
+            runs[index] += len(durations)
+            if not known:
+                continue
+
+            within = offset - index * bucket_seconds
+            spread = spreads.get(within)
+            if spread is None:
+                spread = spreads[within] = _spread(known, within, bucket_seconds)
+            first, full_counts, tails = spread
+
+            busy[index] += first
+            for buckets, job_count in full_counts.items():
+                full[min(index + 1, count)] += job_count * bucket_seconds
+                full[min(index + 1 + buckets, count)] -= job_count * bucket_seconds
+            for after, seconds in tails.items():
+                if index + after < count:
+                    busy[index + after] += seconds
+
+    filled = 0.0
+    buckets = []
+    for index in range(count):
+        filled += full[index]
+        seconds = busy[index] + filled
+        buckets.append({
+            'start': (start + timedelta(seconds=index * bucket_seconds)).isoformat(),
+            'runs': runs[index],
+            'busy_seconds': round(seconds, 1),
+            'concurrency': round(seconds / bucket_seconds, 2)
+        })
+
+    return {
+        'from': start.isoformat(),
+        'to': end.isoformat(),
+        'bucket_seconds': bucket_seconds,
+        'jobs': jobs,
+        'schedules': len(groups),
+        'jobs_without_history': without_history,
+        'total_runs': sum(runs),
+        'peak_runs': max(buckets, key=lambda bucket: bucket['runs']) if buckets else None,
+        'peak_concurrency': max(buckets, key=lambda bucket: bucket['concurrency']) if buckets else None,
+        'buckets': buckets
+    }
+
+
+def _spread(durations, offset, bucket_seconds):
+    """Work out how runs starting `offset` seconds into a bucket fill the buckets
+
+    Returns the seconds the runs spend in the bucket they start in, a
+    {n: runs} count of runs that then fill the n following buckets
+    completely, and a {k: seconds} map of the time runs spend in the k-th
+    bucket after the first, where they end.
+    """
+    first = 0.0
+    full_counts = collections.Counter()
+    tails = collections.defaultdict(float)
+    room = bucket_seconds - offset
+    for duration in durations:
+        if duration <= room:
+            first += duration
+            continue
+        first += room
+        buckets, tail = divmod(duration - room, bucket_seconds)
+        if buckets:
+            full_counts[int(buckets)] += 1
+        if tail:
+            tails[int(buckets) + 1] += tail
+    return first, full_counts, tails
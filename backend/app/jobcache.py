@@ -0,0 +1,123 @@
+import threading
+
+
+class JobRecord:
+    """Cached metadata of one job"""
+
+    __slots__ = (
+        'id', 'name', 'command', 'schedule', 'description', 'created_at', 'last_run',
+        'is_paused', 'trigger_type', 'max_executions', 'retention_days', 'max_log_mb',
+        'max_output_mb', 'priority', 'worker_label', 'jitter_seconds', 'join_policy', 'parent_count', 'child_count',
+        'parent_jobs'
+    )
+
+    def __init__(self, job):
+        for field in self.__slots__:
+            setattr(self, field, job.get(field))
+
+    def to_dict(self):
+        """Convert to the dictionary returned by Database.get_job"""
+        job = {field: getattr(self, field) for field in self.__slots__}
+        if job['parent_jobs'] is not None:
+            job['parent_jobs'] = [dict(parent) for parent in job['parent_jobs']]
+        return job
+
+
+class JobCache:
+    """Read-through in-process cache of job metadata
+
+    All jobs are loaded in one pass and served from memory until
+    invalidate() is called after a write; the next read reloads them. Which
+    jobs depend on which is looked up in the dependency graph index.
+    """
+
+    def __init__(self, db, graph):
+        self.db = db
+        self.graph = graph
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+
+        self._records = {}
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def get(self, job_id):
+        """Get a job as a dictionary, or None if it doesn't exist"""
+        with self._lock:
+            loaded = self._ensure_loaded()
+            record = self._records.get(job_id)
+            if record is not None:
+                if loaded:
+                    self.hits += 1
+                return record.to_dict()
+            if not loaded:
+                return None
+            self.misses += 1
+
+        # Not cached, e.g. added by another process; reload on the next read
+        job = self.db.get_job(job_id)
+        if job:
+            self.invalidate()
+        return job
+
+    def get_all(self):
+        """Get all jobs as dictionaries"""
+        with self._lock:
+            if self._ensure_loaded():
+                self.hits += 1
+            return [record.to_dict() for record in self._records.values()]
+
+    def get_dependent_jobs(self, job_id):
+        """Get the unpaused jobs that depend on a job"""
+        with self._lock:
+            if self._ensure_loaded():
+                self.hits += 1
+            children = (self._records.get(child_id) for child_id in self.graph.children(job_id))
+            return [record.to_dict() for record in children if record and not record.is_paused]
+
+    def get_active_parent_ids(self, job_id):
+        """Get the ids of the unpaused jobs a job depends on"""
+        with self._lock:
+            if self._ensure_loaded():
+                self.hits += 1
+            parents = (self._records.get(parent_id) for parent_id in self.graph.parents(job_id))
+            return [record.id for record in parents if record and not record.is_paused]
+
+    def set_last_run(self, job_id, last_run):
+        """Record the start time of a job's latest run"""
+        with self._lock:
+            record = self._records.get(job_id)
+            if record is not None:
+                record.last_run = last_run
+
+    def invalidate(self):
+        """Drop all cached jobs after jobs or dependencies change"""
+        with self._lock:
+            self._records = {}
+            self._loaded = False
+
+    def stats(self):
+        """Get cache counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'jobs': len(self._records),
+                'loaded': self._loaded,
+                'hits': self.hits,
+                'misses': self.misses,
+                'loads': self.loads,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else None
+            }
+
+    def _ensure_loaded(self):
+        """Load all jobs if needed; returns False if this read caused the load"""
+        if self._loaded:
+            return True
+
+        self.misses += 1
+        self.loads += 1
+
+        self._records = {job['id']: JobRecord(job) for job in self.db.get_jobs()}
+        self._loaded = True
+        return False
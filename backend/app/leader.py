@@ -0,0 +1,83 @@
+import fcntl
+import os
+import threading
+import time
+from datetime import datetime
+
+
+class LeaderLock:
+    """Elect the one process that schedules and runs jobs
+
+    Every server process sharing a database tries to take an exclusive lock
+    on the file at `path`. The process that gets it becomes the leader and
+    calls on_elected(); the others keep serving the API and retry every
+    `retry_interval` seconds. The lock is held until the process exits, when
+    the OS releases it, so a dead leader is replaced within one interval.
+    """
+
+    def __init__(self, path, retry_interval=1.0):
+        self.path = path
+        self.on_elected = None
+        self.retry_interval = retry_interval
+        self.is_leader = False
+        self.elected_at = None
+
+        self._file = None
+        self._thread = None
+
+    def start(self, on_elected):
+        """Try to become leader now, then keep trying in the background"""
+        self.on_elected = on_elected
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._file = open(self.path, 'a+')
+        if self._try_acquire():
+            return
+
+        self._thread = threading.Thread(target=self._run, name='leader-election')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stats(self):
+        """Get this process's role and the pid of the current leader"""
+        leader_pid = None
+        try:
+            with open(self.path) as f:
+                leader_pid = int(f.read().strip() or 0) or None
+        except (OSError, ValueError):
+            pass
+
+        return {
+            'leader': self.is_leader,
+            'pid': os.getpid(),
+            'leader_pid': leader_pid,
+            'elected_at': self.elected_at.isoformat() if self.elected_at else None
+        }
+
+    def _run(self):
+        """Retry the lock until this process becomes leader"""
+        while True:
+            time.sleep(self.retry_interval)
+            if self._try_acquire():
+                return
+
+    def _try_acquire(self):
+        """Take the lock if it is free; returns True if this process is now leader"""
+        try:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            return False
+
+        # Record who leads, for stats() in the other processes
+        self._file.seek(0)
+        self._file.truncate()
+        self._file.write(str(os.getpid()))
+        self._file.flush()
+
+        self.is_leader = True
+        self.elected_at = datetime.now()
+        print(f"Process {os.getpid()} is now the scheduler leader")
+        try:
+            self.on_elected()
+        except Exception as e:
+            print(f"Error starting the scheduler: {e}")
+        return True
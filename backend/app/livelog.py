@@ -0,0 +1,107 @@
+import collections
+import threading
+import time
+
+
+class LiveLog:
+    """Ring buffer of the most recent output lines of one run
+
+    Every line gets a sequence number, starting at 1 for each run, so
+    clients can ask for the lines they missed. The buffer holds at most
+    `max_lines` lines and `max_bytes` of UTF-8 encoded text; older lines
+    are dropped.
+    """
+
+    def __init__(self, execution_id=None, max_lines=1000, max_bytes=256 * 1024):
+        self.execution_id = execution_id
+        self.max_lines = max_lines
+        self.max_bytes = max_bytes
+        self.last_seq = 0
+        self.finished_at = None
+
+        self._lines = collections.deque()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def append(self, line):
+        """Add a line and return its sequence number"""
+        with self._lock:
+            self.last_seq += 1
+            # UTF-8 size; ASCII lines, the common case, need no encoding
+            size = len(line) if line.isascii() else len(line.encode('utf-8', 'replace'))
+            self._lines.append((self.last_seq, line, size))
+            self._size += size
+
+            while self._lines and (len(self._lines) > self.max_lines or self._size > self.max_bytes):
+                _, _, dropped_size = self._lines.popleft()
+                self._size -= dropped_size
+
+            return self.last_seq
+
+    def since(self, seq=0):
+        """Get the retained lines with a sequence number greater than seq
+
+        Returns a dict with the lines, the sequence number of the first line
+        and the number of requested lines that are no longer retained.
+        """
+        with self._lock:
+            lines = [line for line_seq, line, _ in self._lines if line_seq > seq]
+            first_seq = self.last_seq - len(lines) + 1
+            return {
+                'execution_id': self.execution_id,
+                'lines': lines,
+                'first_seq': first_seq,
+                'last_seq': self.last_seq,
+                'skipped': max(0, first_seq - seq - 1)
+            }
+
+    def finish(self):
+        """Mark the run as finished"""
+        self.finished_at = time.monotonic()
+
+
+class LiveLogRegistry:
+    """Live logs of running jobs, freed a grace period after they finish"""
+
+    def __init__(self, max_lines=1000, max_bytes=256 * 1024, grace_period=60):
+        self.max_lines = max_lines
+        self.max_bytes = max_bytes
+        self.grace_period = grace_period
+
+        self._logs = {}
+        self._lock = threading.Lock()
+
+    def start(self, job_id, execution_id=None):
+        """Create a fresh buffer for a new run of a job"""
+        live_log = LiveLog(execution_id, self.max_lines, self.max_bytes)
+        with self._lock:
+            self._logs[job_id] = live_log
+        return live_log
+
+    def get(self, job_id):
+        """Get a job's current buffer, or None"""
+        with self._lock:
+            return self._logs.get(job_id)
+
+    def finish(self, job_id):
+        """Mark a job's run as finished; its buffer is freed after the grace period"""
+        live_log = self.get(job_id)
+        if live_log:
+            live_log.finish()
+
+    def discard(self, job_id):
+        """Free a job's buffer immediately"""
+        with self._lock:
+            self._logs.pop(job_id, None)
+
+    def purge_expired(self):
+        """Free buffers of runs that finished more than the grace period ago"""
+        cutoff = time.monotonic() - self.grace_period
+        with self._lock:
+            expired = [
+                job_id for job_id, live_log in self._logs.items()
+                if live_log.finished_at is not None and live_log.finished_at < cutoff
+            ]
+            for job_id in expired:
+                del self._logs[job_id]
+        return len(expired)
@@ -0,0 +1,171 @@
+import collections
+import os
+import threading
+import time
+
+# Size of the blocks read when streaming or scanning log files
+CHUNK_SIZE = 64 * 1024
+
+# Seconds between flushes of logs that are being written
+FLUSH_INTERVAL = 1.0
+
+
+def tail_offset(path, lines, chunk_size=CHUNK_SIZE):
+    """Return the byte offset at which the last `lines` lines of a file start
+
+    The file is scanned backwards from the end in blocks, so the cost
+    depends on the size of the tail rather than the size of the file.
+    """
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        if lines <= 0 or position == 0:
+            return position
+
+        # A trailing newline ends the last line rather than starting a new one
+        f.seek(position - 1)
+        if f.read(1) == b'\n':
+            position -= 1
+
+        newlines = 0
+        while position > 0:
+            read_size = min(chunk_size, position)
+            position -= read_size
+            f.seek(position)
+            block = f.read(read_size)
+
+            index = len(block)
+            while True:
+                index = block.rfind(b'\n', 0, index)
+                if index == -1:
+                    break
+                newlines += 1
+                if newlines == lines:
+                    return position + index + 1
+
+        return 0
+
+
+def iter_file_range(path, start, length, chunk_size=CHUNK_SIZE):
+    """Yield `length` bytes of a file starting at `start`, in chunks"""
+    with open(path, 'rb') as f:
+        f.seek(start)
+        remaining = length
+        while remaining > 0:
+            chunk = f.read(min(chunk_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+class LogWriter:
+    """Stream job output to a log file as it is produced
+
+    Output goes through a bounded write buffer that a background thread
+    flushes every FLUSH_INTERVAL seconds, so a partial log is on disk if the
+    process dies mid-run. When `max_bytes` is set, the first half of the
+    limit is written as it arrives and only the most recent output is kept
+    for the second half; on close the tail is appended after a truncation
+    marker.
+    """
+
+    def __init__(self, path, max_bytes=0):
+        self.path = path
+        self.max_bytes = max_bytes
+
+        self.head_limit = max_bytes - max_bytes // 2 if max_bytes else 0
+        self.tail_limit = max_bytes // 2
+        self.written = 0
+        self.truncated = 0
+
+        self._tail = collections.deque()
+        self._tail_size = 0
+        self._lock = threading.Lock()
+        self._file = open(path, 'wb', buffering=CHUNK_SIZE)
+        _register_writer(self)
+
+    def write(self, text):
+        """Append output to the log"""
+        data = text.encode('utf-8', errors='replace')
+
+        with self._lock:
+            if not self.max_bytes or (not self._tail and self.written + len(data) <= self.head_limit):
+                self._file.write(data)
+                self.written += len(data)
+            else:
+                self._append_tail(data)
+
+    def flush(self):
+        """Flush buffered output to disk"""
+        with self._lock:
+            if not self._file.closed:
+                self._file.flush()
+
+    def close(self):
+        """Write any retained tail, close the file and return its size"""
+        _unregister_writer(self)
+
+        with self._lock:
+            if self.truncated:
+                marker = f"\n... {self.truncated} bytes truncated ...\n".encode()
+                self._file.write(marker)
+                self.written += len(marker)
+
+            for data in self._tail:
+                self._file.write(data)
+                self.written += len(data)
+            self._tail.clear()
+
+            self._file.close()
+            return self.written
+
+    def _append_tail(self, data):
+        """Keep data in the bounded tail buffer, dropping the oldest output"""
+        if len(data) > self.tail_limit:
+            self.truncated += len(data) - self.tail_limit
+            data = data[-self.tail_limit:] if self.tail_limit else b''
+
+        self._tail.append(data)
+        self._tail_size += len(data)
+
+        while self._tail_size > self.tail_limit:
+            dropped = self._tail.popleft()
+            self._tail_size -= len(dropped)
+            self.truncated += len(dropped)
+
+
+# Open log writers, flushed periodically by a single background thread
+_open_writers = set()
+_open_writers_lock = threading.Lock()
+_flusher = None
+
+
+def _register_writer(writer):
+    """Track an open writer, starting the flusher thread if needed"""
+    global _flusher
+    with _open_writers_lock:
+        _open_writers.add(writer)
+        if _flusher is None:
+            _flusher = threading.Thread(target=_flush_open_writers, name='log-flusher')
+            _flusher.daemon = True
+            _flusher.start()
+
+
+def _unregister_writer(writer):
+    """Stop tracking a writer that is being closed"""
+    with _open_writers_lock:
+        _open_writers.discard(writer)
+
+
+def _flush_open_writers():
+    """Flush every open writer each FLUSH_INTERVAL seconds"""
+    while True:
+        time.sleep(FLUSH_INTERVAL)
+        with _open_writers_lock:
+            writers = list(_open_writers)
+        for writer in writers:
+            try:
+                writer.flush()
+            except Exception as e:
+                print(f"Error flushing log file {writer.path}: {e}")
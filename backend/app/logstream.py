@@ -0,0 +1,187 @@
+import collections
+import threading
+import time
+
+
+def job_room(job_id):
+    """Name of the Socket.IO room of the clients viewing a job"""
+    return f'job:{job_id}'
+
+
+def _split_line(line, max_bytes):
+    """Cut a line into pieces of at most max_bytes of UTF-8, between characters"""
+    data = line.encode('utf-8', 'replace')
+    start = 0
+    while start < len(data):
+        end = min(start + max_bytes, len(data))
+        while end < len(data) and data[end] & 0xC0 == 0x80:
+            end -= 1
+        yield data[start:end].decode('utf-8')
+        start = end
+
+
+class _Client:
+    """Outbound state of one connected Socket.IO client"""
+
+    def __init__(self, sid):
+        self.sid = sid
+        self.queue = collections.deque()
+        # Lines dropped per job since the client's last delivered frame
+        self.skipped = collections.Counter()
+        self.in_flight = 0
+        self.last_ack = time.monotonic()
+
+
+class LogStream:
+    """Coalesce job output into frames and deliver them with backpressure
+
+    Job threads add lines with add_line(). A single dispatcher thread
+    turns each job's pending lines into job_log frames every `interval`
+    seconds (or as soon as `max_frame_bytes` are pending) and queues them
+    for every client in the job's room. Frames hold at most
+    `max_frame_bytes` of UTF-8 encoded output; longer lines are cut into
+    pieces that are sent in frames of their own. Each client has a queue of at most `max_queued_frames`
+    frames and at most `window` unacknowledged frames in flight; when a slow
+    client's queue overflows the oldest frames are dropped and the next frame
+    of that job reports how many lines were skipped. A job therefore never
+    waits on a browser, and one slow client doesn't delay the others.
+    """
+
+    def __init__(self, socketio, interval=0.1, max_frame_bytes=64 * 1024, max_queued_frames=50,
+                 window=4, ack_timeout=10.0):
+        self.socketio = socketio
+        self.interval = interval
+        self.max_frame_bytes = max_frame_bytes
+        self.max_queued_frames = max_queued_frames
+        self.window = window
+        self.ack_timeout = ack_timeout
+
+        # job_id -> frames being filled, each {'execution_id', 'first_seq',
+        # 'last_seq', 'lines', 'size'}
+        self._pending = {}
+        self._clients = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+
+        self._thread = threading.Thread(target=self._run, name='log-stream')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def add_client(self, sid):
+        """Start delivering frames to a connected client"""
+        with self._lock:
+            self._clients[sid] = _Client(sid)
+
+    def remove_client(self, sid):
+        """Stop delivering frames to a disconnected client"""
+        with self._lock:
+            self._clients.pop(sid, None)
+
+    def add_line(self, job_id, execution_id, seq, line):
+        """Queue a line of job output for the next frame"""
+        size = len(line) if line.isascii() else len(line.encode('utf-8', 'replace'))
+        if size <= self.max_frame_bytes:
+            pieces = [(line, size)]
+        else:
+            pieces = [(piece, len(piece.encode('utf-8'))) for piece in _split_line(line, self.max_frame_bytes)]
+
+        with self._lock:
+            frames = self._pending.setdefault(job_id, [])
+            for piece, size in pieces:
+                frame = frames[-1] if frames else None
+                if (frame is None or frame['execution_id'] != execution_id
+                        or frame['size'] + size > self.max_frame_bytes):
+                    frame = {'execution_id': execution_id, 'first_seq': seq, 'lines': [], 'size': 0}
+                    frames.append(frame)
+                frame['lines'].append(piece)
+                frame['last_seq'] = seq
+                frame['size'] += size
+            full = len(frames) > 1 or frames[-1]['size'] >= self.max_frame_bytes
+
+        if full:
+            self._wakeup.set()
+
+    def flush(self):
+        """Build frames from pending lines and deliver what clients can take"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            clients = list(self._clients.values())
+
+            for job_id, batches in pending.items():
+                members = self._room_members(job_room(job_id))
+                for batch in batches:
+                    frame = {
+                        'id': job_id,
+                        'execution_id': batch['execution_id'],
+                        'first_seq': batch['first_seq'],
+                        'last_seq': batch['last_seq'],
+                        'lines': batch['lines']
+                    }
+                    for client in clients:
+                        if client.sid not in members:
+                            continue
+                        if len(client.queue) >= self.max_queued_frames:
+                            dropped = client.queue.popleft()
+                            client.skipped[dropped['id']] += len(dropped['lines'])
+                        client.queue.append(frame)
+
+            sends = self._take_sendable(clients)
+
+        for client, frame in sends:
+            self.socketio.emit('job_log', frame, to=client.sid,
+                               callback=lambda *args, client=client: self._ack(client))
+
+    def stats(self):
+        """Get per-client queue depths and in-flight frame counts"""
+        with self._lock:
+            return {
+                client.sid: {
+                    'queued_frames': len(client.queue),
+                    'in_flight': client.in_flight,
+                    'skipped_lines': sum(client.skipped.values())
+                }
+                for client in self._clients.values()
+            }
+
+    def _room_members(self, room):
+        """Get the sids of the clients in a room"""
+        return {sid for sid, _ in self.socketio.server.manager.get_participants('/', room)}
+
+    def _take_sendable(self, clients):
+        """Pop the frames each client's window allows, adding skip counts"""
+        now = time.monotonic()
+        sends = []
+        for client in clients:
+            # Assume frames are lost if a client stops acknowledging them
+            if client.in_flight and now - client.last_ack > self.ack_timeout:
+                client.in_flight = 0
+
+            while client.queue and client.in_flight < self.window:
+                frame = client.queue.popleft()
+                skipped = client.skipped.pop(frame['id'], 0)
+                sends.append((client, dict(frame, skipped=skipped)))
+                client.in_flight += 1
+                if client.in_flight == 1:
+                    client.last_ack = now
+        return sends
+
+    def _ack(self, client):
+        """Record that a client has processed a frame"""
+        with self._lock:
+            client.in_flight = max(0, client.in_flight - 1)
+            client.last_ack = time.monotonic()
+            backlog = bool(client.queue)
+
+        # Send queued frames now rather than on the next tick
+        if backlog:
+            self._wakeup.set()
+
+    def _run(self):
+        """Flush pending lines every interval, or early when a frame fills up"""
+        while True:
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Error emitting job logs: {e}")
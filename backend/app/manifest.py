@@ -0,0 +1,163 @@
+import json
+import uuid
+import yaml
+
+# Job fields a manifest can set, with the value a job gets when one is left out
+MANIFEST_FIELDS = {
+    'command': None,
+    'schedule': None,
+    'description': '',
+    'is_paused': False,
+    'priority': 'normal',
+    'join_policy': 'all',
+    'worker_label': None,
+    'jitter_seconds': None,
+    'max_executions': None,
+    'retention_days': None,
+    'max_log_mb': None,
+    'max_output_mb': None,
+}
+
+MANIFEST_FORMATS = ('json', 'yaml')
+
+
+def parse_manifest(text, format='json'):
+    """Parse a JSON or YAML job manifest
+
+    A manifest is an object with a list of jobs. Each job has a unique name
+    and a command, optionally other MANIFEST_FIELDS, and may name the jobs
+    it depends on in depends_on. Only jobs that depend on others may leave
+    out the schedule, to run just when their parents do. Raises ValueError
+    if the manifest is malformed.
+    """
+    try:
+        manifest = yaml.safe_load(text) if format == 'yaml' else json.loads(text)
+    except (ValueError, yaml.YAMLError) as e:
+        raise ValueError(f"Invalid {format.upper()} manifest: {e}")
+
+    if not isinstance(manifest, dict) or not isinstance(manifest.get('jobs'), list):
+        raise ValueError("A manifest must be an object with a list of jobs")
+
+    names = set()
+    for index, job in enumerate(manifest['jobs']):
+        if not isinstance(job, dict) or not isinstance(job.get('name'), str) or not job['name'].strip():
+            raise ValueError(f"Job {index} has no name")
+        name = job['name']
+        if name in names:
+            raise ValueError(f"Job {name} is listed twice")
+        names.add(name)
+
+        unknown = set(job) - set(MANIFEST_FIELDS) - {'name', 'depends_on'}
+        if unknown:
+            raise ValueError(f"Job {name} has unknown fields: {', '.join(sorted(unknown))}")
+        if not job.get('command'):
+            raise ValueError(f"Job {name} needs a command")
+        depends_on = job.get('depends_on', [])
+        if not isinstance(depends_on, list) or not all(isinstance(parent, str) for parent in depends_on):
+            raise ValueError(f"depends_on of job {name} must be a list of job names")
+        if job.get('schedule') is None:
+            if not depends_on:
+                raise ValueError(f"Job {name} needs a schedule or depends_on")
+            job.pop('schedule', None)
+
+    return manifest
+
+
+def diff_manifest(manifest, jobs, edges, prune=False):
+    """Work out the changes that make the jobs match a manifest
+
+    jobs are the current jobs as dictionaries and edges the current
+    dependencies as (parent id, child id) pairs; jobs are matched by name.
+    Only the fields and dependencies that differ are changed. With prune,
+    jobs missing from the manifest are deleted. Returns (changes, summary):
+    the keyword arguments of apply_job_changes, and the changes by job name.
+    Raises ValueError if a job depends on a job that won't exist.
+    """
+    existing = {job['name']: job for job in jobs}
+    wanted = {job['name']: job for job in manifest['jobs']}
+    ids = {name: job['id'] for name, job in existing.items()}
+
+    create = []
+    update = {}
+    updated = {}
+    for name, spec in wanted.items():
+        fields = {field: spec.get(field, default) for field, default in MANIFEST_FIELDS.items()}
+        current = existing.get(name)
+        if current is None:
+            ids[name] = str(uuid.uuid4())
+            create.append(dict(fields, id=ids[name], name=name))
+            continue
+
+        changed = {}
+        for field, value in fields.items():
+            current_value = current.get(field)
+            if current_value is None:
+                current_value = MANIFEST_FIELDS[field]
+            if current_value != value:
+                changed[field] = value
+        if changed:
+            update[current['id']] = changed
+            updated[name] = sorted(changed)
+
+    deleted = sorted(name for name in existing if name not in wanted) if prune else []
+    for name in deleted:
+        del ids[name]
+
+    wanted_edges = set()
+    for name, spec in wanted.items():
+        for parent in spec.get('depends_on', []):
+            if parent not in ids:
+                raise ValueError(f"Job {name} depends on {parent}, which doesn't exist")
+            wanted_edges.add((ids[parent], ids[name]))
+    # Dependencies of jobs outside the manifest are left alone, and those of
+    # deleted jobs go with them
+    managed = {ids[name] for name in wanted}
+    kept = set(ids.values())
+    current_edges = set(edges)
+    add_dependencies = sorted(wanted_edges - current_edges)
+    remove_dependencies = sorted(
+        edge for edge in current_edges if edge[1] in managed and edge[0] in kept and edge not in wanted_edges
+    )
+
+    names = {job_id: name for name, job_id in ids.items()}
+    changes = {
+        'create': create,
+        'update': update,
+        'delete': [existing[name]['id'] for name in deleted],
+        'add_dependencies': add_dependencies,
+        'remove_dependencies': remove_dependencies
+    }
+    summary = {
+        'created': [job['name'] for job in create],
+        'updated': updated,
+        'deleted': deleted,
+        'dependencies_added': [[names[parent], names[child]] for parent, child in add_dependencies],
+        'dependencies_removed': [[names[parent], names[child]] for parent, child in remove_dependencies],
+        'unchanged': len(wanted) - len(create) - len(updated)
+    }
+    return changes, summary
+
+
+def export_manifest(jobs, edges):
+    """Build the manifest of the given jobs and (parent id, child id) dependencies
+
+    Fields left at their default are omitted, including the schedule of
+    jobs that only run after the jobs they depend on.
+    """
+    names = {job['id']: job['name'] for job in jobs}
+    parents = {}
+    for parent_id, child_id in edges:
+        parents.setdefault(child_id, []).append(names[parent_id])
+
+    exported = []
+    for job in jobs:
+        entry = {'name': job['name']}
+        for field, default in MANIFEST_FIELDS.items():
+            value = job.get(field)
+            if value is not None and value != default:
+                entry[field] = value
+        if job['id'] in parents:
+            entry['depends_on'] = parents[job['id']]
+        exported.append(entry)
+
+    return {'jobs': exported}
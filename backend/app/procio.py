@@ -0,0 +1,169 @@
+import codecs
+import os
+import queue
+import selectors
+import threading
+
+# Size of the blocks read from job output pipes
+READ_SIZE = 64 * 1024
+
+# Output without a newline is passed on once it reaches this many characters
+MAX_LINE_CHARS = 64 * 1024
+
+# Seconds between checks for processes that closed their output but haven't exited
+REAP_INTERVAL = 0.05
+
+
+class LineSplitter:
+    """Decode blocks of output incrementally and pass on complete lines"""
+
+    def __init__(self, on_output):
+        self.on_output = on_output
+        self.decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        self.partial = ''
+
+    def feed(self, data, final=False):
+        """Decode a block of output and pass on every complete line
+
+        Like text mode pipes, '\r\n' and '\r' end lines too and are passed
+        on as '\n'.
+        """
+        text = self.partial + self.decoder.decode(data, final)
+
+        # A trailing '\r' may be the first half of a '\r\n'
+        held = ''
+        if text.endswith('\r') and not final:
+            text, held = text[:-1], '\r'
+
+        lines = text.replace('\r\n', '\n').replace('\r', '\n').split('\n')
+        self.partial = lines.pop()
+        lines = [line + '\n' for line in lines]
+
+        # Don't hold back the end of the output or a huge line that never ends
+        if self.partial and (final or len(self.partial) >= MAX_LINE_CHARS):
+            lines.append(self.partial)
+            self.partial = ''
+        self.partial += held
+
+        for line in lines:
+            self.on_output(line)
+
+
+class _Watch:
+    """A watched process and the decoding state of its output"""
+
+    def __init__(self, process, on_output, on_exit):
+        self.process = process
+        self.splitter = LineSplitter(on_output)
+        self.on_exit = on_exit
+
+
+class ProcessMonitor:
+    """Read the output of many processes from a single thread
+
+    Each watched process's stdout pipe is read in binary blocks as soon as
+    data is available, decoded incrementally and split into lines, which are
+    passed to on_output(line) on the monitor thread. When the pipe is closed
+    and the process has exited, on_exit(exit_code) is called on a separate
+    thread so slow exit handling doesn't hold up reading other processes.
+    Callbacks must not block for long.
+    """
+
+    def __init__(self):
+        self._selector = selectors.DefaultSelector()
+        self._new = queue.Queue()
+        self._exiting = []
+        self._exits = queue.Queue()
+
+        # Wakes the monitor thread up when a process is added
+        self._wakeup_read, self._wakeup_write = os.pipe()
+        os.set_blocking(self._wakeup_read, False)
+        self._selector.register(self._wakeup_read, selectors.EVENT_READ)
+
+        self._thread = threading.Thread(target=self._run, name='process-monitor')
+        self._thread.daemon = True
+        self._thread.start()
+
+        self._exit_thread = threading.Thread(target=self._run_exits, name='process-exit')
+        self._exit_thread.daemon = True
+        self._exit_thread.start()
+
+    def watch(self, process, on_output, on_exit):
+        """Start reading a process started with stdout=subprocess.PIPE"""
+        os.set_blocking(process.stdout.fileno(), False)
+        self._new.put(_Watch(process, on_output, on_exit))
+        os.write(self._wakeup_write, b'\0')
+
+    def stats(self):
+        """Get the number of processes being read and waited for"""
+        return {
+            'reading': len(self._selector.get_map()) - 1,
+            'exiting': len(self._exiting)
+        }
+
+    def _run(self):
+        """Monitor loop: read ready pipes and reap exited processes"""
+        while True:
+            timeout = REAP_INTERVAL if self._exiting else None
+            for key, _ in self._selector.select(timeout):
+                if key.data is None:
+                    self._add_new()
+                else:
+                    self._read(key.data)
+
+            if self._exiting:
+                self._reap()
+
+    def _add_new(self):
+        """Register processes added since the last wakeup"""
+        try:
+            while os.read(self._wakeup_read, 4096):
+                pass
+        except BlockingIOError:
+            pass
+
+        while True:
+            try:
+                watch = self._new.get_nowait()
+            except queue.Empty:
+                return
+            self._selector.register(watch.process.stdout, selectors.EVENT_READ, watch)
+
+    def _read(self, watch):
+        """Read what a process has written, handling the end of its output"""
+        try:
+            data = os.read(watch.process.stdout.fileno(), READ_SIZE)
+        except BlockingIOError:
+            return
+        except OSError:
+            data = b''
+
+        try:
+            watch.splitter.feed(data, final=not data)
+        except Exception as e:
+            print(f"Error handling job output: {e}")
+
+        if not data:
+            self._selector.unregister(watch.process.stdout)
+            watch.process.stdout.close()
+            self._exiting.append(watch)
+
+    def _reap(self):
+        """Hand processes that have exited over to the exit thread"""
+        still_running = []
+        for watch in self._exiting:
+            exit_code = watch.process.poll()
+            if exit_code is None:
+                still_running.append(watch)
+            else:
+                self._exits.put((watch, exit_code))
+        self._exiting = still_running
+
+    def _run_exits(self):
+        """Call on_exit for processes that have exited, in order"""
+        while True:
+            watch, exit_code = self._exits.get()
+            try:
+                watch.on_exit(exit_code)
+            except Exception as e:
+                print(f"Error handling job exit: {e}")
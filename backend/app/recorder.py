@@ -0,0 +1,133 @@
+import queue
+import threading
+import time
+
+
+class ExecutionRecorder:
+    """Write-behind recorder for finished executions
+
+    Job threads enqueue results and return immediately; a single writer
+    thread drains the queue and stores each batch of results (and their log
+    search entries) in one transaction, so bursts of completions don't
+    serialize on SQLite's writer lock.
+    """
+
+    def __init__(self, db, batch_size=100, retries=3, retry_delay=0.5):
+        self.db = db
+        self.batch_size = batch_size
+        # Attempts after a failed batch write, and the first wait between them
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.queue = queue.Queue()
+
+        self._lock = threading.Lock()
+        self._stopped = False
+        self._batches = 0
+        self._records = 0
+        self._failed = 0
+        self._last_flush = None
+        self._total_flush = 0.0
+        self._max_flush = 0.0
+
+        self._thread = threading.Thread(target=self._run, name='execution-recorder')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def record(self, execution_id, state, exit_code=None, duration=None, log_size=None):
+        """Queue the result of a run created with Database.start_execution"""
+        self.queue.put({
+            'execution_id': execution_id,
+            'state': state,
+            'exit_code': exit_code,
+            'duration': duration,
+            'log_size': log_size
+        })
+
+    def stop(self, timeout=30):
+        """Flush queued executions and stop the writer thread"""
+        if self._stopped:
+            return
+        self._stopped = True
+        self.queue.put(None)
+        self._thread.join(timeout)
+
+    def stats(self):
+        """Get queue depth and flush latency statistics"""
+        with self._lock:
+            return {
+                'enabled': True,
+                'queue_depth': self.queue.qsize(),
+                'batches': self._batches,
+                'records': self._records,
+                'failed_records': self._failed,
+                'last_flush_ms': self._last_flush * 1000 if self._last_flush is not None else None,
+                'avg_flush_ms': self._total_flush / self._batches * 1000 if self._batches else None,
+                'max_flush_ms': self._max_flush * 1000
+            }
+
+    def _run(self):
+        """Drain the queue in batches until stopped"""
+        stopping = False
+        while not stopping:
+            item = self.queue.get()
+            if item is None:
+                break
+
+            # Take whatever else is already queued, up to the batch size
+            batch = [item]
+            while len(batch) < self.batch_size:
+                try:
+                    item = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            self._flush(batch)
+
+        # Flush anything queued after the stop marker
+        remaining = []
+        while True:
+            try:
+                item = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                remaining.append(item)
+        for start in range(0, len(remaining), self.batch_size):
+            self._flush(remaining[start:start + self.batch_size])
+
+    def _flush(self, batch):
+        """Write a batch of executions in a single transaction
+
+        A failed batch is retried with exponential backoff, then written one
+        execution at a time so a single bad result doesn't lose the others.
+        The ids of executions that still can't be written are logged.
+        """
+        start_time = time.perf_counter()
+        success = self.db.finish_executions(batch)
+        delay = self.retry_delay
+        for _ in range(self.retries):
+            if success:
+                break
+            time.sleep(delay)
+            delay *= 2
+            success = self.db.finish_executions(batch)
+
+        failed = []
+        if not success:
+            failed = [result for result in batch if not self.db.finish_executions([result])]
+            if failed:
+                print(f"Could not record executions {', '.join(str(result['execution_id']) for result in failed)}; "
+                      f"they stay running until marked interrupted")
+        elapsed = time.perf_counter() - start_time
+
+        with self._lock:
+            self._batches += 1
+            self._records += len(batch) - len(failed)
+            self._failed += len(failed)
+            self._last_flush = elapsed
+            self._total_flush += elapsed
+            self._max_flush = max(self._max_flush, elapsed)
@@ -0,0 +1,52 @@
+import collections
+import threading
+
+
+class ResponseCache:
+    """Serialized response bodies kept until the data they were built from changes
+
+    Bodies are cached per key (e.g. the request's path and query string)
+    together with the version of the data. All of them are dropped once a
+    newer version is seen, and at most max_entries are kept, the least
+    recently used being evicted first. Versions must only ever go up.
+    """
+
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        self._version = None
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, version, key, build):
+        """Get the body cached for a key at a version, or build and cache it
+
+        version must be read before the data, so that a body is never cached
+        under a version newer than the data it was built from.
+        """
+        with self._lock:
+            if version == self._version and key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        value = build()
+
+        with self._lock:
+            if self._version is None or version > self._version:
+                self._version = version
+                self._entries.clear()
+            if version == self._version:
+                self._entries[key] = value
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return value
+
+    def stats(self):
+        """Get the hit/miss counters and the number of cached bodies"""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._entries)}
@@ -4,10 +4,29 @@ import threading
 import time
 import uuid
 from datetime import datetime
+from functools import lru_cache
+from apscheduler.jobstores.base import JobLookupError
+from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
-from flask_socketio import emit
-from app import socketio, db
+from apscheduler.triggers.interval import IntervalTrigger
+from apscheduler.util import undefined
+from flask import request
+from flask_socketio import emit, join_room, leave_room
+from app import socketio, db, recorder
+from app.logfiles import LogWriter
+from app.cronhash import resolve_schedule
+from app.dag import DagEngine
+from app.depgraph import DependencyGraph
+from app.executor import ExecutionPool
+from app.forecast import forecast_load
+from app.manifest import diff_manifest, export_manifest
+from app.jobcache import JobCache
+from app.leader import LeaderLock
+from app.livelog import LiveLogRegistry
+from app.logstream import LogStream, job_room
+from app.procio import LineSplitter, ProcessMonitor, READ_SIZE
+from app.snapshot import JobSnapshot
 
 # Initialize the scheduler
 scheduler = BackgroundScheduler()
@@ -15,13 +34,90 @@ scheduler.start()
 
 # In-memory cache for job states (not stored in DB)
 job_states = {}
-# In-memory cache for live logs
-live_logs = {}
+
+# Which jobs depend on which, kept up to date by add_dependency and
+# remove_dependency and reloaded when another process changes jobs
+dependency_graph = DependencyGraph(db.get_all_dependencies)
+
+# Job metadata served from memory; invalidated on every job write
+job_cache = JobCache(db, dependency_graph)
+
+# Limits the runs in progress, whether scheduled, manual or dependency-triggered
+execution_pool = ExecutionPool(max_running=int(os.environ.get('CRONBAT_MAX_CONCURRENT_RUNS', '10')))
+
+# Reads the output of all running jobs from a single thread
+process_monitor = ProcessMonitor()
+
+# Runs dependent jobs once their parents have finished
+dag_engine = DagEngine(
+    job_cache.get_dependent_jobs,
+    job_cache.get_active_parent_ids,
+    max_running=int(os.environ.get('CRONBAT_DAG_MAX_CONCURRENCY', '4'))
+)
+
+# Only the process holding the leader lock schedules and runs jobs; other
+# processes serve the API and follow the leader through the database
+leader = LeaderLock(
+    os.environ.get('CRONBAT_LEADER_LOCK', db.db_path + '.lock'),
+    retry_interval=float(os.environ.get('CRONBAT_LEADER_RETRY', '1'))
+)
+
+# Cron expression and jitter of each job in the scheduler, keyed by job id
+scheduled_jobs = {}
+
+# Job store of the jobs' cron triggers; with CRONBAT_PERSIST_SCHEDULE the
+# leader keeps them in the database, so next run times survive restarts
+PERSIST_SCHEDULE = os.environ.get('CRONBAT_PERSIST_SCHEDULE', 'false').lower() == 'true'
+JOB_STORE = 'schedules' if PERSIST_SCHEDULE else 'default'
+
+# Next run times worked out by followers: job id -> (cron expression, time)
+follower_next_runs = {}
+
+# Version of the jobs table this process's caches reflect
+jobs_version = db.refresh_versions().get('jobs', 0)
+
+# Runs executed by other processes, keyed by execution id: runs queued for or
+# running on workers, and on followers also the leader's runs
+remote_runs = {}
+remote_runs_lock = threading.Lock()
+
+# Chain runs waiting for a run of a job: by job id for the execution pool,
+# taken by the job's next run to start, and by execution id for runs already
+# queued for a worker
+chain_runs_by_job = {}
+chain_runs_by_execution = {}
+chain_runs_lock = threading.Lock()
+
+# Id of the newest execution a follower has seen
+last_execution_id = None
+WORKER_MAX_ATTEMPTS = int(os.environ.get('CRONBAT_WORKER_MAX_ATTEMPTS', '3'))
+
+# Room of the clients showing the job list; they only get job summaries,
+# while per-job events go to the room of each job (see job_room)
+DASHBOARD_ROOM = 'dashboard'
+
+# Batched, backpressured delivery of job output to Socket.IO clients
+log_stream = LogStream(
+    socketio,
+    interval=int(os.environ.get('CRONBAT_LOG_BATCH_MS', '100')) / 1000,
+    max_frame_bytes=int(os.environ.get('CRONBAT_LOG_BATCH_KB', '64')) * 1024,
+    max_queued_frames=int(os.environ.get('CRONBAT_LOG_CLIENT_QUEUE', '50'))
+)
+
+# Bounded in-memory buffers of the latest output of running jobs
+live_logs = LiveLogRegistry(
+    max_lines=int(os.environ.get('CRONBAT_LIVE_LOG_MAX_LINES', '1000')),
+    max_bytes=int(os.environ.get('CRONBAT_LIVE_LOG_MAX_KB', '256')) * 1024,
+    grace_period=int(os.environ.get('CRONBAT_LIVE_LOG_GRACE', '60'))
+)
 
 def get_jobs():
     """Get all jobs with their metadata"""
     result = []
-    jobs = db.get_jobs()
+    jobs = job_cache.get_all()
+
+    # Look up next run times in one pass instead of once per job
+    next_run_times = get_next_run_times(jobs)
 
     for job in jobs:
         job_id = job['id']
@@ -36,21 +132,37 @@ def get_jobs():
             'is_paused': job.get('is_paused', False),
             'trigger_type': job.get('trigger_type', 'schedule'),
             'parent_jobs': job.get('parent_jobs', None),
+            'max_executions': job.get('max_executions'),
+            'retention_days': job.get('retention_days'),
+            'max_log_mb': job.get('max_log_mb'),
+            'max_output_mb': job.get('max_output_mb'),
+            'priority': job.get('priority', 'normal'),
+            'worker_label': job.get('worker_label'),
+            'jitter_seconds': job.get('jitter_seconds'),
+            'join_policy': job.get('join_policy', 'all'),
             'next_run': None
         }
 
         # Get next run time if job is scheduled
-        apscheduler_job = scheduler.get_job(job_id)
-        if apscheduler_job:
-            job_info['next_run'] = apscheduler_job.next_run_time.isoformat() if apscheduler_job.next_run_time else None
+        next_run_time = next_run_times.get(job_id)
+        if next_run_time:
+            job_info['next_run'] = next_run_time.isoformat()
 
         result.append(job_info)
 
     return result
 
+# Job list served to clients, rebuilt only after jobs change
+job_snapshot = JobSnapshot(get_jobs)
+
+def invalidate_jobs():
+    """Drop cached job metadata after jobs or their dependencies change"""
+    job_cache.invalidate()
+    job_snapshot.invalidate()
+
 def get_job(job_id):
     """Get a specific job by ID"""
-    job = db.get_job(job_id)
+    job = job_cache.get(job_id)
     if not job:
         return None
 
@@ -65,42 +177,80 @@ def get_job(job_id):
         'is_paused': job.get('is_paused', False),
         'trigger_type': job.get('trigger_type', 'schedule'),
         'parent_jobs': job.get('parent_jobs', None),
+        'max_executions': job.get('max_executions'),
+        'retention_days': job.get('retention_days'),
+        'max_log_mb': job.get('max_log_mb'),
+        'max_output_mb': job.get('max_output_mb'),
+        'priority': job.get('priority', 'normal'),
+        'worker_label': job.get('worker_label'),
+        'jitter_seconds': job.get('jitter_seconds'),
+        'join_policy': job.get('join_policy', 'all'),
         'next_run': None
     }
 
     # Get next run time if job is scheduled
-    apscheduler_job = scheduler.get_job(job_id)
-    if apscheduler_job:
-        job_info['next_run'] = apscheduler_job.next_run_time.isoformat() if apscheduler_job.next_run_time else None
+    next_run_time = get_next_run_times([job]).get(job_id)
+    if next_run_time:
+        job_info['next_run'] = next_run_time.isoformat()
 
     return job_info
 
-def add_job(name, command, schedule, description=''):
+def get_next_run_times(jobs):
+    """Get the next run time of each of the given jobs that is scheduled, keyed by job id
+
+    Followers don't schedule jobs, so they work the times out from the jobs'
+    cron expressions, recomputing a job's time only once it has passed. The
+    times they report leave out the jobs' random jitter.
+    """
+    if leader.is_leader:
+        if len(jobs) == 1:
+            apscheduler_job = scheduler.get_job(jobs[0]['id'])
+            apscheduler_jobs = [apscheduler_job] if apscheduler_job else []
+        else:
+            apscheduler_jobs = scheduler.get_jobs()
+        return {apscheduler_job.id: apscheduler_job.next_run_time for apscheduler_job in apscheduler_jobs}
+
+    now = datetime.now().astimezone()
+    next_run_times = {}
+    for job in jobs:
+        if job.get('is_paused', False) or not job.get('schedule'):
+            continue
+        cached = follower_next_runs.get(job['id'])
+        if not cached or cached[0] != job['schedule'] or (cached[1] and cached[1] <= now):
+            try:
+                trigger = get_job_trigger(job['id'], job['schedule'])
+            except ValueError:
+                continue
+            cached = (job['schedule'], trigger.get_next_fire_time(None, now))
+            follower_next_runs[job['id']] = cached
+        next_run_times[job['id']] = cached[1]
+    return next_run_times
+
+def add_job(name, command, schedule, description='', max_executions=None, retention_days=None,
+            max_log_mb=None, max_output_mb=None, priority='normal', worker_label=None,
+            jitter_seconds=None, join_policy='all'):
     """Add a new job to the scheduler"""
     job_id = str(uuid.uuid4())
 
     # Store job in database
-    db.add_job(job_id, name, command, schedule, description)
-
-    # Initialize live logs
-    live_logs[job_id] = []
+    if not db.add_job(job_id, name, command, schedule, description, max_executions=max_executions,
+                      retention_days=retention_days, max_log_mb=max_log_mb, max_output_mb=max_output_mb,
+                      priority=priority, worker_label=worker_label, jitter_seconds=jitter_seconds,
+                      join_policy=join_policy):
+        return None
 
     # Schedule the job if not paused
-    scheduler.add_job(
-        execute_job,
-        CronTrigger.from_crontab(schedule),
-        id=job_id,
-        args=[job_id]
-    )
+    schedule_job(job_id, schedule, jitter_seconds)
 
     # Emit job added event
-    socketio.emit('job_added', get_job(job_id))
+    invalidate_jobs()
+    socketio.emit('job_added', get_job(job_id), to=DASHBOARD_ROOM)
 
     return job_id
 
 def update_job(job_id, data):
     """Update job properties"""
-    job = db.get_job(job_id)
+    job = job_cache.get(job_id)
     if not job:
         return False
 
@@ -108,55 +258,37 @@ def update_job(job_id, data):
     success = db.update_job(job_id, data)
     if not success:
         return False
-
-    # Check if job is currently in the scheduler
-    job_in_scheduler = False
-    try:
-        scheduler.get_job(job_id)
-        job_in_scheduler = True
-    except:
-        job_in_scheduler = False
+    invalidate_jobs()
 
     # Always remove the job from the scheduler if it exists
     # This prevents the ConflictingIdError
-    if job_in_scheduler:
-        try:
-            scheduler.remove_job(job_id)
-        except:
-            pass
+    unschedule_job(job_id)
 
     # Get the updated job data
-    updated_job = db.get_job(job_id)
+    updated_job = job_cache.get(job_id)
 
     # Determine if the job should be scheduled
     is_paused = updated_job.get('is_paused', False)
 
-    # Only add the job back to the scheduler if it's not paused
-    if not is_paused:
+    # Only add the job back to the scheduler if it's not paused and has a
+    # schedule of its own
+    if not is_paused and updated_job['schedule']:
         try:
-            scheduler.add_job(
-                execute_job,
-                CronTrigger.from_crontab(updated_job['schedule']),
-                id=job_id,
-                args=[job_id]
-            )
+            schedule_job(job_id, updated_job['schedule'], updated_job.get('jitter_seconds'))
         except Exception as e:
             print(f"Error scheduling job: {e}")
             # Even if scheduling fails, we still updated the database
             # so we'll return success
 
     # Emit job updated event
-    socketio.emit('job_updated', get_job(job_id))
+    emit_job_event('job_updated', get_job(job_id), dashboard=True)
 
     return True
 
 def remove_job(job_id):
     """Remove a job from the scheduler"""
     # Remove the job from the scheduler
-    try:
-        scheduler.remove_job(job_id)
-    except:
-        pass
+    unschedule_job(job_id)
 
     # Delete all execution records and log files for the job
     db.delete_all_job_executions(job_id)
@@ -165,21 +297,22 @@ def remove_job(job_id):
     success = db.remove_job(job_id)
     if not success:
         return False
+    dependency_graph.remove_job(job_id)
+    invalidate_jobs()
 
     # Clean up in-memory data
     if job_id in job_states:
         del job_states[job_id]
-    if job_id in live_logs:
-        del live_logs[job_id]
+    live_logs.discard(job_id)
 
     # Emit job removed event
-    socketio.emit('job_removed', {'id': job_id})
+    emit_job_event('job_removed', {'id': job_id}, dashboard=True)
 
     return True
 
 def run_job(job_id):
     """Manually trigger a job to run"""
-    job = db.get_job(job_id)
+    job = job_cache.get(job_id)
     if not job:
         return False
 
@@ -187,119 +320,548 @@ def run_job(job_id):
     if job.get('is_paused', False):
         return False
 
-    # Run the job in a separate thread
-    thread = threading.Thread(target=execute_job, args=[job_id])
-    thread.daemon = True
-    thread.start()
+    # Only the leader runs jobs; it picks the request up on its next sync
+    if not leader.is_leader:
+        return db.request_run(job_id)
+
+    # Run the job on the execution pool
+    submit_run(job_id)
+
+    return True
+
+def apply_job_changes(create=(), update=None, delete=(), add_dependencies=(), remove_dependencies=()):
+    """Create, update and delete many jobs and dependencies at once
+
+    New jobs without an id are given one. Everything is written in one
+    transaction, only the jobs whose schedule changed are rescheduled, and
+    dashboard clients get a single jobs_delta event. Returns the ids of the
+    created jobs. Raises ValueError, changing nothing, if the database
+    rejects the changes.
+    """
+    create = [job if job.get('id') else dict(job, id=str(uuid.uuid4())) for job in create]
+    since = job_snapshot.snapshot()['version']
+    db.apply_job_changes(create, update, delete, add_dependencies, remove_dependencies)
+    dependency_graph.invalidate()
+    invalidate_jobs()
+
+    for job_id in delete:
+        job_states.pop(job_id, None)
+        live_logs.discard(job_id)
+
+    if leader.is_leader:
+        # No wakeups of the scheduler thread while adding jobs
+        scheduler.pause()
+        try:
+            reschedule_jobs()
+        finally:
+            scheduler.resume()
+
+    broadcast_job_changes(since)
+    return [job['id'] for job in create]
+
+def apply_manifest(manifest, prune=False, dry_run=False):
+    """Make the jobs and dependencies match a parsed manifest
+
+    Only what differs is changed, in one transaction; with prune, jobs
+    missing from the manifest are deleted. Returns the changes by job name,
+    which are only worked out with dry_run. Raises ValueError if the
+    manifest can't be applied.
+    """
+    edges = [(edge['parent_job_id'], edge['child_job_id']) for edge in dependency_graph.edges()]
+    changes, summary = diff_manifest(manifest, job_cache.get_all(), edges, prune)
+    if not dry_run and any(changes.values()):
+        apply_job_changes(**changes)
+    return dict(summary, dry_run=dry_run)
+
+def get_manifest():
+    """Get every job and dependency in the manifest format"""
+    edges = [(edge['parent_job_id'], edge['child_job_id']) for edge in dependency_graph.edges()]
+    return export_manifest(job_cache.get_all(), edges)
+
+def add_dependency(parent_job_id, child_job_id):
+    """Make a job run after another one
+
+    Returns False if either job doesn't exist. Raises ValueError if the
+    dependency would close a cycle.
+    """
+    if not db.add_job_dependency(parent_job_id, child_job_id):
+        return False
+    dependency_graph.add_edge(parent_job_id, child_job_id)
+    invalidate_jobs()
+    return True
+
+def remove_dependency(parent_job_id, child_job_id):
+    """Remove a dependency between two jobs; returns False if there is none"""
+    if not db.remove_job_dependency(parent_job_id, child_job_id):
+        return False
+    dependency_graph.remove_edge(parent_job_id, child_job_id)
+    invalidate_jobs()
+    return True
+
+def get_direct_dependencies(job_id):
+    """Get the jobs a job depends on and the jobs depending on it, or None if it doesn't exist"""
+    if not job_cache.get(job_id):
+        return None
+    return {
+        'parents': _cached_jobs(dependency_graph.parents(job_id)),
+        'children': _cached_jobs(dependency_graph.children(job_id))
+    }
+
+def get_related_jobs(job_id, direction, max_depth=None):
+    """Get a job's ancestors or descendants up to max_depth levels away
+
+    Returns None if the job doesn't exist. Jobs are ordered by depth, and
+    each one is listed once, at its shortest distance.
+    """
+    if not job_cache.get(job_id):
+        return None
+    if direction == 'ancestors':
+        depths = dependency_graph.ancestors(job_id, max_depth)
+    else:
+        depths = dependency_graph.descendants(job_id, max_depth)
+
+    jobs = []
+    for related_id, depth in depths.items():
+        job = job_cache.get(related_id)
+        if job:
+            jobs.append({'id': related_id, 'name': job['name'], 'is_paused': job.get('is_paused', False), 'depth': depth})
+    return jobs
+
+def get_dependency_graph():
+    """Get every job and dependency, for drawing the whole workflow"""
+    nodes = [{
+        'id': job['id'],
+        'name': job['name'],
+        'is_paused': job.get('is_paused', False),
+        'trigger_type': job.get('trigger_type', 'schedule'),
+        'join_policy': job.get('join_policy', 'all')
+    } for job in job_cache.get_all()]
+    return {'nodes': nodes, 'edges': dependency_graph.edges()}
+
+def _cached_jobs(job_ids):
+    """Look up jobs in the cache, skipping any that were removed meanwhile"""
+    jobs = (job_cache.get(job_id) for job_id in job_ids)
+    return [job for job in jobs if job]
+
+@lru_cache(maxsize=4096)
+def get_trigger(schedule, jitter=None):
+    """Get the trigger of a cron expression, shared by all jobs using it with the same jitter"""
+    fields = schedule.split()
+    if len(fields) != 5:
+        raise ValueError(f"Wrong number of fields; got {len(fields)}, expected 5")
+    return CronTrigger(minute=fields[0], hour=fields[1], day=fields[2], month=fields[3],
+                       day_of_week=fields[4], jitter=jitter)
+
+def get_job_trigger(job_id, schedule, jitter=None):
+    """Get the trigger of a job's cron expression, with its H fields resolved for the job"""
+    return get_trigger(resolve_schedule(schedule, job_id), jitter or None)
+
+def check_schedule(schedule):
+    """Raise ValueError if a cron expression, which may use H fields, is invalid"""
+    get_job_trigger('', schedule)
+
+def schedule_job(job_id, schedule, jitter=None, next_run_time=undefined):
+    """Add or replace a job's cron trigger; only the leader schedules jobs
+
+    next_run_time may be passed when it is already known, to save working
+    it out from the trigger; None means the trigger never fires.
+    """
+    if not leader.is_leader:
+        return
+    scheduler.add_job(
+        submit_run,
+        get_job_trigger(job_id, schedule, jitter),
+        id=job_id,
+        args=[job_id],
+        jobstore=JOB_STORE,
+        replace_existing=True,
+        next_run_time=next_run_time
+    )
+    scheduled_jobs[job_id] = (schedule, jitter or None)
+
+def unschedule_job(job_id):
+    """Remove a job's cron trigger if it has one"""
+    scheduled_jobs.pop(job_id, None)
+    try:
+        scheduler.remove_job(job_id)
+    except JobLookupError:
+        pass
+
+def reschedule_jobs():
+    """Bring the scheduler in line with the unpaused jobs in the database"""
+    wanted = {
+        job['id']: (job['schedule'], job.get('jitter_seconds') or None)
+        for job in job_cache.get_all() if job['schedule'] and not job.get('is_paused', False)
+    }
+
+    for job_id in list(scheduled_jobs):
+        if job_id not in wanted:
+            unschedule_job(job_id)
+
+    now = datetime.now().astimezone()
+    first_runs = {}
+    for job_id, (schedule, jitter) in wanted.items():
+        if scheduled_jobs.get(job_id) != (schedule, jitter):
+            try:
+                next_run_time = get_first_run_time(get_job_trigger(job_id, schedule, jitter), now, first_runs)
+                schedule_job(job_id, schedule, jitter, next_run_time)
+            except Exception as e:
+                print(f"Error scheduling job {job_id}: {e}")
+
+def get_first_run_time(trigger, now, first_runs):
+    """Get a trigger's first fire time after now, worked out once per trigger in first_runs
+
+    Working it out can take long, e.g. for triggers that never fire, so
+    jobs sharing a trigger share the result. Jittered triggers fire at a
+    different time for each job and are left to work theirs out.
+    """
+    if trigger.jitter:
+        return undefined
+    if trigger not in first_runs:
+        first_runs[trigger] = trigger.get_next_fire_time(None, now)
+    return first_runs[trigger]
+
+def sync_job_changes():
+    """Pick up jobs and dependencies changed by other processes
+
+    The caches are reloaded, the leader reschedules changed jobs, and
+    dashboard clients of this process are sent the changed jobs.
+    """
+    global jobs_version
+    version = db.refresh_versions().get('jobs', 0)
+    # This process's own writes already updated its caches
+    own = db.take_own_versions('jobs', version)
+    previous, jobs_version = jobs_version, max(jobs_version, version)
+    if version - previous <= sum(1 for own_version in own if own_version > previous):
+        return
+
+    since = job_snapshot.snapshot()['version']
+    dependency_graph.invalidate()
+    invalidate_jobs()
+    if leader.is_leader:
+        reschedule_jobs()
+    broadcast_job_changes(since)
+
+def broadcast_job_changes(since):
+    """Send dashboard clients the jobs changed after a snapshot version, in one event"""
+    delta = job_snapshot.changes_since(job_snapshot.epoch, since)
+    if delta and (delta['changed'] or delta['removed']):
+        socketio.emit('jobs_delta', delta, to=DASHBOARD_ROOM)
+
+def submit_run(job_id, dag_run_id=None):
+    """Queue a run of a job on the execution pool, or for a worker
+
+    dag_run_id is the dependency chain run the run is part of, if any; a
+    run of the job that is already queued then runs for the chain run too.
+    Returns False if the job doesn't exist or already has a queued run.
+    """
+    job = job_cache.get(job_id)
+    if not job:
+        return False
+    if job.get('worker_label'):
+        return dispatch_to_worker(job, dag_run_id)
+
+    if dag_run_id:
+        with chain_runs_lock:
+            chain_runs_by_job.setdefault(job_id, []).append(dag_run_id)
+    return execution_pool.submit(job_id, execute_job, job.get('priority', 'normal'), on_queued=mark_queued)
+
+def dispatch_to_worker(job, dag_run_id=None):
+    """Queue a run of a job in the database for a worker with its label"""
+    execution = db.enqueue_execution(job['id'], job['worker_label'], dag_run_id)
+    if not execution:
+        pending_id = db.get_pending_execution_id(job['id']) if dag_run_id else None
+        if pending_id:
+            with chain_runs_lock:
+                chain_runs_by_execution.setdefault(pending_id, []).append(dag_run_id)
+        return False
+    job_cache.set_last_run(job['id'], execution['timestamp'])
 
+    # Track the run right away so its result is seen even if it finishes
+    # before the next sync
+    with remote_runs_lock:
+        remote_runs.setdefault(execution['id'], _new_remote_run())
+    mark_queued(job['id'])
     return True
 
-def execute_job(job_id):
-    """Execute a job and capture its output"""
-    job = db.get_job(job_id)
+def _new_remote_run():
+    """Progress of a remote run as last seen by sync_remote_runs"""
+    return {'state': None, 'attempts': None, 'offset': 0, 'splitter': None}
+
+def sync_remote_runs():
+    """Relay the progress of runs executed by other processes to clients
+
+    Output written to the runs' log files is passed on to live viewers, and
+    state changes and results are announced like those of local runs. The
+    leader follows runs on workers, requeues runs of dead workers, starts
+    runs requested through other processes, and triggers the dependent jobs
+    of finished worker runs. Followers follow every run, so that their own
+    clients see the leader's runs too.
+    """
+    global last_execution_id
+    is_leader = leader.is_leader
+    if is_leader:
+        db.expire_leases(WORKER_MAX_ATTEMPTS)
+        for job_id in db.take_run_requests():
+            submit_run(job_id)
+    elif last_execution_id is None:
+        last_execution_id = db.get_last_execution_id()
+
+    with remote_runs_lock:
+        tracked = list(remote_runs)
+
+    if is_leader:
+        executions = db.get_active_executions(tracked, workers_only=True)
+    else:
+        # Runs started since the last sync are included even if they already finished
+        executions = db.get_active_executions(tracked, after_id=last_execution_id)
+        if executions:
+            last_execution_id = max(last_execution_id, executions[-1]['id'])
+
+    for execution in executions:
+        execution_id = execution['id']
+        job_id = execution['job_id']
+        with remote_runs_lock:
+            if execution_id not in remote_runs:
+                job_cache.set_last_run(job_id, execution['timestamp'])
+            run = remote_runs.setdefault(execution_id, _new_remote_run())
+
+        # Each attempt rewrites the log from the start
+        if execution['state'] != 'pending' and execution['attempts'] != run['attempts']:
+            run['attempts'] = execution['attempts']
+            run['offset'] = 0
+            run['splitter'] = LineSplitter(_relay_output(job_id, execution_id))
+
+        if execution['state'] != run['state']:
+            run['state'] = execution['state']
+            if run['state'] == 'pending':
+                mark_queued(job_id)
+            elif run['state'] == 'running':
+                job_states[job_id] = 'running'
+                emit_job_event('job_state_changed', {'id': job_id, 'state': 'running'}, dashboard=True)
+
+        finished = execution['state'] not in ('pending', 'running')
+        if run['splitter']:
+            run['offset'] = _relay_log(execution['log_file'], run['offset'], run['splitter'], finished)
+
+        if finished:
+            with remote_runs_lock:
+                del remote_runs[execution_id]
+            _announce_remote_result(job_id, execution, trigger=is_leader)
+
+def _relay_output(job_id, execution_id):
+    """Return a function passing a remote run's output lines to live viewers"""
+    live_log = live_logs.start(job_id, execution_id)
+
+    def relay(line):
+        seq = live_log.append(line)
+        log_stream.add_line(job_id, execution_id, seq, line)
+
+    return relay
+
+def _relay_log(log_file, offset, splitter, final):
+    """Feed new output in a log file to a splitter; returns the new offset
+
+    Live viewers only keep the latest output, so when a lot has been
+    written since the last sync only the end of it is read.
+    """
+    limit = 16 * READ_SIZE
+    try:
+        with open(log_file, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            offset = max(offset, f.tell() - limit)
+            f.seek(offset)
+            data = f.read(limit)
+    except OSError:
+        data = b''
+    splitter.feed(data, final=final)
+    return offset + len(data)
+
+def _announce_remote_result(job_id, execution, trigger):
+    """Announce a finished remote run, advancing the chain runs of its dependent jobs if requested"""
+    live_logs.finish(job_id)
+    log_stream.flush()
+
+    job_states[job_id] = 'success' if execution['state'] == 'success' else 'failed'
+    emit_job_event('job_state_changed', {'id': job_id, 'state': job_states[job_id]}, dashboard=True)
+    emit_job_event('job_completed', {
+        'id': job_id,
+        'exit_code': execution['exit_code'],
+        'duration': execution['duration']
+    })
+
+    with chain_runs_lock:
+        dag_run_ids = chain_runs_by_execution.pop(execution['id'], [])
+    if execution['dag_run_id']:
+        dag_run_ids.insert(0, execution['dag_run_id'])
+    if trigger:
+        trigger_dependent_jobs(job_id, execution['state'] == 'success', dag_run_ids)
+
+def mark_queued(job_id):
+    """Show a job as waiting for a free worker"""
+    job_states[job_id] = 'queued'
+    emit_job_event('job_state_changed', {'id': job_id, 'state': 'queued'}, dashboard=True)
+
+def execute_job(job_id, done=None):
+    """Start a job and capture its output
+
+    The process's output is read and its exit handled by the process
+    monitor, so this returns as soon as the process is started. done() is
+    called once the run has been recorded. The run serves the chain runs
+    that queued a run of the job since its last start.
+    """
+    with chain_runs_lock:
+        dag_run_ids = chain_runs_by_job.pop(job_id, [])
+
+    job = job_cache.get(job_id)
     if not job:
+        if done:
+            done()
+        trigger_dependent_jobs(job_id, False, dag_run_ids)
         return
 
     # Update job state to running
     job_states[job_id] = 'running'
-    socketio.emit('job_state_changed', {'id': job_id, 'state': 'running'})
+    emit_job_event('job_state_changed', {'id': job_id, 'state': 'running'}, dashboard=True)
 
     # Get job command
     command = job['command']
 
+    # Record the execution up front so its log survives a crash mid-run
+    execution = db.start_execution(job_id, dag_run_ids[0] if dag_run_ids else None)
+    if not execution:
+        job_states[job_id] = 'idle'
+        if done:
+            done()
+        trigger_dependent_jobs(job_id, False, dag_run_ids)
+        return
+    job_cache.set_last_run(job_id, execution['timestamp'])
+
     # Record start time
     start_time = datetime.now()
 
-    # Initialize log
-    log_output = ''
-    exit_code = None
-    duration = None
+    # Stream output straight to the execution's log file
+    max_output_mb = job.get('max_output_mb')
+    if max_output_mb is None:
+        max_output_mb = db.max_output_mb
+    log_writer = LogWriter(execution['log_file'], max_bytes=int(max_output_mb * 1024 * 1024))
+    live_log = live_logs.start(job_id, execution['id'])
+
+    def handle_output(line):
+        log_writer.write(line)
+        seq = live_log.append(line)
+        log_stream.add_line(job_id, execution['id'], seq, line)
+
+    def handle_exit(exit_code):
+        try:
+            finish_job(job_id, execution, log_writer, start_time, exit_code, dag_run_ids)
+        finally:
+            if done:
+                done()
 
     try:
         # Process multi-line commands by joining them with semicolons
         processed_command = '; '.join(command.splitlines())
 
-        # Execute the command
+        # Execute the command; its output is read in binary blocks by the
+        # process monitor
         process = subprocess.Popen(
             processed_command,
             shell=True,
             stdout=subprocess.PIPE,
             stderr=subprocess.STDOUT,
-            text=True,
-            bufsize=1
+            bufsize=0
         )
-
-        # Clear live logs
-        live_logs[job_id] = []
-
-        # Stream output in real-time
-        for line in iter(process.stdout.readline, ''):
-            log_output += line
-            live_logs[job_id].append(line)
-            socketio.emit('job_log', {'id': job_id, 'line': line})
-
-        # Wait for process to complete
-        exit_code = process.wait()
-
-        # Update job state based on exit code
-        job_states[job_id] = 'success' if exit_code == 0 else 'failed'
+        process_monitor.watch(process, handle_output, handle_exit)
 
     except Exception as e:
         # Handle execution errors
-        error_msg = f"Error executing job: {str(e)}\n"
-        log_output += error_msg
-        live_logs[job_id].append(error_msg)
-        socketio.emit('job_log', {'id': job_id, 'line': error_msg})
-        exit_code = -1
-        job_states[job_id] = 'failed'
+        handle_output(f"Error executing job: {str(e)}\n")
+        handle_exit(-1)
+
+def finish_job(job_id, execution, log_writer, start_time, exit_code, dag_run_ids=()):
+    """Record the result of a run once its process has exited"""
+    # Update job state based on exit code
+    job_states[job_id] = 'success' if exit_code == 0 else 'failed'
 
     # Calculate duration
     end_time = datetime.now()
     duration = (end_time - start_time).total_seconds()
 
-    # Add execution record to database
-    db.add_execution(
-        job_id=job_id,
-        state=job_states[job_id],
-        exit_code=exit_code,
-        duration=duration,
-        log_content=log_output
-    )
-
-    # Clean up old executions for this job
-    db.cleanup_old_executions(job_id)
+    log_size = log_writer.close()
+    live_logs.finish(job_id)
+
+    # Deliver the last lines before announcing completion
+    log_stream.flush()
+
+    # Old executions are removed by the periodic retention sweep
+    if recorder:
+        # Hand the result to the write-behind recorder, which stores it
+        # in a batched transaction
+        recorder.record(
+            execution_id=execution['id'],
+            state=job_states[job_id],
+            exit_code=exit_code,
+            duration=duration,
+            log_size=log_size
+        )
+    else:
+        # Record the result of the execution
+        db.finish_execution(
+            execution_id=execution['id'],
+            state=job_states[job_id],
+            exit_code=exit_code,
+            duration=duration,
+            log_size=log_size
+        )
 
     # Emit job state changed event
-    socketio.emit('job_state_changed', {'id': job_id, 'state': job_states[job_id]})
+    emit_job_event('job_state_changed', {'id': job_id, 'state': job_states[job_id]}, dashboard=True)
 
     # Emit job completed event
-    socketio.emit('job_completed', {
+    emit_job_event('job_completed', {
         'id': job_id,
         'exit_code': exit_code,
         'duration': duration
     })
 
-    # If job was successful, trigger dependent jobs
-    if exit_code == 0:
-        trigger_dependent_jobs(job_id)
-
-def trigger_dependent_jobs(parent_job_id):
-    """Trigger jobs that depend on the successful completion of the parent job"""
-    dependent_jobs = db.get_dependent_jobs(parent_job_id)
-
-    for job in dependent_jobs:
-        # Run each dependent job in a separate thread
-        thread = threading.Thread(target=execute_job, args=[job['id']])
-        thread.daemon = True
-        thread.start()
-
-        # Log and emit event for the triggered job
-        info_msg = f"Job triggered by successful completion of job {parent_job_id}"
-        socketio.emit('job_triggered', {
-            'id': job['id'],
-            'parent_id': parent_job_id,
-            'message': info_msg
-        })
+    # Run the dependent jobs that are now ready
+    trigger_dependent_jobs(job_id, exit_code == 0, dag_run_ids)
+
+def trigger_dependent_jobs(job_id, success=True, dag_run_ids=()):
+    """Advance the dependency chain runs after a run of a job ended
+
+    dag_run_ids are the chain runs the run was started for. A job becomes
+    due once its parents have finished since its own last run, so a job
+    with several parents runs once after the last of them. The jobs made
+    ready are queued as part of their chain run; a job that no longer
+    exists counts as failed.
+    """
+    finished = [(job_id, success, dag_run_ids)]
+    while finished:
+        for child_id, run_id, parent_id in dag_engine.job_finished(*finished.pop()):
+            # A run of the job that is already waiting counts for the chain run
+            if not submit_run(child_id, dag_run_id=run_id) and not job_cache.get(child_id):
+                finished.append((child_id, False, [run_id]))
+                continue
+
+            # Log and emit event for the triggered job
+            info_msg = f"Job triggered by completion of its parents, the last being job {parent_id}"
+            emit_job_event('job_triggered', {
+                'id': child_id,
+                'parent_id': parent_id,
+                'dag_run_id': run_id,
+                'message': info_msg
+            })
+
+def emit_job_event(event, data, dashboard=False):
+    """Emit an event to the clients viewing a job, and to the dashboard if requested"""
+    rooms = [job_room(data['id'])]
+    if dashboard:
+        job_snapshot.invalidate()
+        rooms.append(DASHBOARD_ROOM)
+    # Clients in several of the rooms receive the event once
+    socketio.emit(event, data, to=rooms)
 
 def get_job_logs(job_id, limit=10):
     """Get logs for a specific job"""
@@ -313,54 +875,250 @@ def get_all_executions(limit=50):
     """Get execution history for all jobs"""
     return db.get_all_executions(limit)
 
-def get_execution_log(job_id, timestamp):
-    """Get log for a specific execution"""
-    return db.get_execution_log(job_id, timestamp)
+def export_executions(**options):
+    """Iterate over the whole execution history in batches, oldest first"""
+    return db.iter_execution_batches(**options)
+
+def get_executions_page(**filters):
+    """Get a keyset-paginated, filtered page of execution history"""
+    return db.get_executions_page(**filters)
+
+def get_execution(execution_id):
+    """Get a specific execution by ID"""
+    return db.get_execution(execution_id)
+
+def find_execution_id(job_id, timestamp):
+    """Get the id of a job's execution by its start time"""
+    return db.find_execution_id(job_id, timestamp)
+
+def search_logs(query, job_id=None, limit=50):
+    """Search execution logs for a phrase"""
+    return db.search_logs(query, job_id, limit)
+
+def get_schedule_forecast(start, end, bucket_seconds):
+    """Forecast the runs and load of the scheduled jobs per time bucket
+
+    Jobs are grouped by cron expression, so fire times are worked out once
+    per distinct schedule, and weighted by each job's average run duration.
+    Raises ValueError if the window or bucket size is out of range.
+    """
+    durations = db.get_average_durations()
+    schedules = {}
+    for job in job_cache.get_all():
+        if job.get('is_paused', False) or not job.get('schedule'):
+            continue
+        try:
+            schedule = resolve_schedule(job['schedule'], job['id'])
+        except ValueError:
+            continue
+        schedules.setdefault(schedule, []).append(durations.get(job['id']))
 
-def get_live_log(job_id):
-    """Get the current live log for a running job"""
-    if job_id in live_logs:
-        return live_logs[job_id]
-    return []
+    groups = []
+    for schedule, job_durations in schedules.items():
+        try:
+            groups.append((get_trigger(schedule), job_durations))
+        except ValueError:
+            continue
+    return forecast_load(groups, start.astimezone(), end.astimezone(), bucket_seconds)
+
+def sweep_old_executions():
+    """Apply execution retention policies across all jobs"""
+    removed = db.cleanup_old_executions()
+    if removed:
+        print(f"Retention sweep removed {removed} executions")
+
+def get_recorder_stats():
+    """Get write-behind recorder queue depth and flush latency"""
+    if recorder:
+        return recorder.stats()
+    return {'enabled': False}
+
+def get_live_log(job_id, since=0):
+    """Get the live log lines of a job's current or latest run after seq since"""
+    live_log = live_logs.get(job_id)
+    if live_log:
+        return live_log.since(since)
+    return {'execution_id': None, 'lines': [], 'first_seq': 1, 'last_seq': 0, 'skipped': 0}
 
 # Load jobs from database on startup
 def load_jobs_from_db():
-    """Load all jobs from the database and schedule them"""
-    jobs = db.get_jobs()
-    for job in jobs:
-        job_id = job['id']
-
-        # Initialize live logs
-        live_logs[job_id] = []
+    """Load all jobs from the database and schedule them
+
+    Only the jobs' ids, schedules, paused flags and jitter are read. Jobs
+    with the same resolved cron expression and jitter share its trigger and
+    first run time, which are worked out once. Jobs already in a persistent
+    job store with the same trigger keep their next run time. The time taken
+    by each step is logged.
+    """
+    started = time.perf_counter()
+
+    # Runs still marked as running were cut off by a restart
+    interrupted = db.mark_interrupted_executions()
+    if interrupted:
+        print(f"Marked {interrupted} interrupted executions")
+    marked = time.perf_counter()
+
+    jobs = db.get_job_schedules()
+    stored = {job.id: repr(job.trigger) for job in scheduler.get_jobs(jobstore=JOB_STORE)}
+    listed = time.perf_counter()
+
+    # No wakeups of the scheduler thread while adding jobs
+    scheduler.pause()
+    now = datetime.now().astimezone()
+    first_runs = {}
+    wanted = set()
+    trigger_time = 0
+    try:
+        for job_id, schedule, is_paused, jitter in jobs:
+            # Skip scheduling if job is paused or only runs after its parents
+            if is_paused or not schedule:
+                continue
+            wanted.add(job_id)
+
+            parse_started = time.perf_counter()
+            try:
+                key = (resolve_schedule(schedule, job_id), jitter or None)
+                if key not in first_runs:
+                    trigger = get_trigger(*key)
+                    first_runs[key] = (repr(trigger), get_first_run_time(trigger, now, {}))
+            except ValueError as e:
+                print(f"Error scheduling job {job_id}: {e}")
+                continue
+            finally:
+                trigger_time += time.perf_counter() - parse_started
+
+            # Schedule the job, unless it is stored with the same trigger
+            trigger_text, next_run_time = first_runs[key]
+            if stored.get(job_id) == trigger_text:
+                scheduled_jobs[job_id] = (schedule, jitter or None)
+            else:
+                schedule_job(job_id, schedule, jitter, next_run_time)
+
+        # Stored jobs that were removed or paused meanwhile; ids starting
+        # with __ are this process's maintenance jobs
+        for job_id in stored:
+            if job_id not in wanted and not job_id.startswith('__'):
+                unschedule_job(job_id)
+    finally:
+        scheduler.resume()
+    finished = time.perf_counter()
+
+    print(
+        f"Scheduled {len(scheduled_jobs)} jobs ({len(first_runs)} distinct schedules) "
+        f"in {finished - started:.2f}s: interrupted runs {marked - started:.2f}s, "
+        f"job list {listed - marked:.2f}s, triggers {trigger_time:.2f}s, "
+        f"jobs and scheduling {finished - listed - trigger_time:.2f}s"
+    )
 
-        # Skip scheduling if job is paused
-        if job.get('is_paused', False):
-            continue
+def start_scheduling():
+    """Schedule jobs and periodic maintenance once this process is the leader"""
+    if PERSIST_SCHEDULE:
+        # Paused until load_jobs_from_db is done, so that stored jobs don't
+        # fire before they are checked against the database
+        scheduler.pause()
+        scheduler.add_jobstore(SQLAlchemyJobStore(engine=db.engine), alias=JOB_STORE)
+    load_jobs_from_db()
 
-        # Schedule the job
-        scheduler.add_job(
-            execute_job,
-            CronTrigger.from_crontab(job['schedule']),
-            id=job_id,
-            args=[job_id]
-        )
+    # Sweep old executions periodically instead of after every run
+    scheduler.add_job(
+        sweep_old_executions,
+        IntervalTrigger(seconds=int(os.environ.get('CRONBAT_RETENTION_INTERVAL', '60'))),
+        id='__retention_sweep__',
+        replace_existing=True
+    )
 
 # Socket.IO event handlers
 @socketio.on('connect')
-def handle_connect():
-    """Handle client connection"""
-    # Send current jobs to the connected client
-    emit('jobs', get_jobs())
+def handle_connect(auth=None):
+    """Handle client connection
+
+    Clients may pass the jobs_epoch and jobs_version of the last job list
+    they received in their auth data; they are sent only the jobs changed
+    since then as a jobs_delta event when possible, otherwise the full list
+    as a jobs_snapshot event.
+    """
+    auth = auth if isinstance(auth, dict) else {}
+    delta = job_snapshot.changes_since(auth.get('jobs_epoch'), auth.get('jobs_version'))
+    if delta is not None:
+        emit('jobs_delta', delta)
+    else:
+        emit('jobs_snapshot', job_snapshot.snapshot())
+    log_stream.add_client(request.sid)
+
+@socketio.on('disconnect')
+def handle_disconnect():
+    """Handle client disconnection"""
+    log_stream.remove_client(request.sid)
+
+@socketio.on('subscribe_dashboard')
+def handle_subscribe_dashboard():
+    """Start sending job summaries to the client"""
+    join_room(DASHBOARD_ROOM)
+
+@socketio.on('unsubscribe_dashboard')
+def handle_unsubscribe_dashboard():
+    """Stop sending job summaries to the client"""
+    leave_room(DASHBOARD_ROOM)
 
 @socketio.on('subscribe_to_job')
 def handle_subscribe_to_job(data):
-    """Handle job subscription"""
+    """Handle job subscription
+
+    The client joins the job's room and receives its events, including
+    live output, until it unsubscribes or disconnects. Clients may send the
+    execution_id and seq of the last live log line they have seen; they are
+    sent the retained lines after it (or all retained lines of the current
+    run) as a job_log_catchup event.
+    """
     job_id = data.get('id')
     if job_id:
-        job = db.get_job(job_id)
+        job = job_cache.get(job_id)
         if job:
-            # Join the job's room
+            join_room(job_room(job_id))
             emit('job_details', get_job(job_id))
 
-# Load jobs when the module is imported
-load_jobs_from_db()
+            live_log = live_logs.get(job_id)
+            if live_log:
+                since = 0
+                if data.get('execution_id') == live_log.execution_id:
+                    since = data.get('since') or 0
+                emit('job_log_catchup', dict(live_log.since(since), id=job_id))
+
+@socketio.on('unsubscribe_from_job')
+def handle_unsubscribe_from_job(data):
+    """Handle job unsubscription"""
+    job_id = data.get('id')
+    if job_id:
+        leave_room(job_room(job_id))
+
+# Become the leader now if no other process is, or take over when the leader
+# exits. Processes started with CRONBAT_SCHEDULE_JOBS=false only serve the API.
+if os.environ.get('CRONBAT_SCHEDULE_JOBS', 'true').lower() == 'true':
+    leader.start(start_scheduling)
+
+# Build the job list for the first clients in the background instead of
+# holding up startup
+threading.Thread(target=job_snapshot.snapshot, name='job-list-warmup', daemon=True).start()
+
+# Free live logs of finished runs once their grace period is over
+scheduler.add_job(
+    live_logs.purge_expired,
+    IntervalTrigger(seconds=max(1, live_logs.grace_period // 2)),
+    id='__live_log_sweep__',
+    replace_existing=True
+)
+
+# Follow runs and job changes made by other processes
+sync_interval = float(os.environ.get('CRONBAT_SYNC_INTERVAL', '1'))
+scheduler.add_job(
+    sync_remote_runs,
+    IntervalTrigger(seconds=sync_interval),
+    id='__remote_sync__',
+    replace_existing=True
+)
+scheduler.add_job(
+    sync_job_changes,
+    IntervalTrigger(seconds=sync_interval),
+    id='__job_sync__',
+    replace_existing=True
+)
@@ -0,0 +1,102 @@
+import collections
+import json
+import threading
+import uuid
+from datetime import datetime, timezone
+
+
+class JobSnapshot:
+    """Versioned in-memory copy of the job list
+
+    The list is rebuilt with `build` only after invalidate() has been called,
+    and at most once for any number of concurrent readers. Every rebuild that
+    changes the list bumps the version and records which jobs changed, so a
+    client that knows an older version can be sent just the difference. The
+    epoch changes on every restart, making versions from an earlier process
+    invalid.
+    """
+
+    def __init__(self, build, history=100):
+        self.build = build
+        self.epoch = uuid.uuid4().hex
+        self.version = 0
+        self.modified_at = None
+
+        self._jobs = {}
+        self._list = []
+        self._json = '[]'
+        # (version, ids of changed jobs, ids of removed jobs), oldest first
+        self._changes = collections.deque(maxlen=history)
+        self._dirty = True
+        self._lock = threading.Lock()
+
+    def invalidate(self):
+        """Mark the snapshot as stale; it is rebuilt on the next read"""
+        self._dirty = True
+
+    def snapshot(self):
+        """Get the full job list with its epoch and version"""
+        with self._lock:
+            self._refresh()
+            return {'epoch': self.epoch, 'version': self.version, 'jobs': self._list}
+
+    def json(self):
+        """Get the job list serialized as JSON"""
+        with self._lock:
+            self._refresh()
+            return self._json
+
+    def versioned_json(self):
+        """Get the version, when it last moved and the job list as JSON, all at once"""
+        with self._lock:
+            self._refresh()
+            return self.version, self.modified_at, self._json
+
+    def changes_since(self, epoch, version):
+        """Get the jobs changed and removed after a version
+
+        Returns None if the version is unknown or too old, in which case the
+        client needs the full snapshot.
+        """
+        with self._lock:
+            self._refresh()
+            if epoch != self.epoch or not isinstance(version, int) or version > self.version:
+                return None
+            if version < self.version and (not self._changes or self._changes[0][0] > version + 1):
+                return None
+
+            # A job is listed once, as changed or removed by its latest change
+            is_removed = {}
+            for change_version, changed_ids, removed_ids in self._changes:
+                if change_version > version:
+                    is_removed.update(dict.fromkeys(changed_ids, False))
+                    is_removed.update(dict.fromkeys(removed_ids, True))
+
+            return {
+                'epoch': self.epoch,
+                'version': self.version,
+                'since': version,
+                'changed': [self._jobs[job_id] for job_id, removed in is_removed.items() if not removed],
+                'removed': sorted(job_id for job_id, removed in is_removed.items() if removed)
+            }
+
+    def _refresh(self):
+        """Rebuild the list if it has been invalidated, recording what changed"""
+        if not self._dirty:
+            return
+        # Cleared before building so changes made meanwhile trigger another rebuild
+        self._dirty = False
+
+        jobs = self.build()
+        new_jobs = {job['id']: job for job in jobs}
+        changed = [job_id for job_id, job in new_jobs.items() if self._jobs.get(job_id) != job]
+        removed = [job_id for job_id in self._jobs if job_id not in new_jobs]
+        if self.version and not changed and not removed:
+            return
+
+        self.version += 1
+        self.modified_at = datetime.now(timezone.utc)
+        self._changes.append((self.version, changed, removed))
+        self._jobs = new_jobs
+        self._list = jobs
+        self._json = json.dumps(jobs)
@@ -0,0 +1,137 @@
+import os
+import signal
+import subprocess
+import threading
+import time
+from datetime import datetime
+from app.logfiles import LogWriter
+from app.procio import ProcessMonitor
+
+
+class Worker:
+    """Run jobs claimed from the worker queue in the database
+
+    The worker claims pending runs whose label is one of `labels`, at most
+    `concurrency` at a time, and renews their leases every third of
+    `lease_seconds`. Output goes to the run's log file, at the path the
+    server chose, where the server picks it up for live viewers, log
+    requests and search, and the result is written back to the execution.
+    The worker must therefore see the server's logs directory, e.g. on a
+    shared volume. If a lease is lost (e.g. the worker was paused for longer than
+    the lease), the run has been handed to another worker and is killed here.
+    """
+
+    def __init__(self, db, worker_id, labels, concurrency=4, lease_seconds=30, poll_interval=1.0):
+        self.db = db
+        self.worker_id = worker_id
+        self.labels = labels
+        self.concurrency = concurrency
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+
+        # execution_id -> process of the runs in progress
+        self._running = {}
+        self._lock = threading.Lock()
+        self._slots = threading.Semaphore(concurrency)
+        self._monitor = ProcessMonitor()
+
+    def run(self):
+        """Claim and run jobs until interrupted"""
+        heartbeat = threading.Thread(target=self._heartbeat, name='worker-heartbeat')
+        heartbeat.daemon = True
+        heartbeat.start()
+
+        print(f"Worker {self.worker_id} waiting for runs labelled {', '.join(self.labels)}")
+        while True:
+            self._slots.acquire()
+            execution = self.db.claim_execution(self.worker_id, self.labels, self.lease_seconds)
+            if not execution:
+                self._slots.release()
+                time.sleep(self.poll_interval)
+                continue
+            self._start(execution)
+
+    def _start(self, execution):
+        """Start a claimed run"""
+        execution_id = execution['id']
+        job = self.db.get_job(execution['job_id'])
+        if not job:
+            self.db.finish_execution(execution_id, 'failed', exit_code=-1, worker_id=self.worker_id)
+            self._slots.release()
+            return
+
+        print(f"Running job {job['name']} (execution {execution_id}, attempt {execution['attempts']})")
+        start_time = datetime.now()
+
+        max_output_mb = job.get('max_output_mb')
+        if max_output_mb is None:
+            max_output_mb = self.db.max_output_mb
+        try:
+            log_writer = LogWriter(execution['log_file'], max_bytes=int(max_output_mb * 1024 * 1024))
+        except OSError as e:
+            # The server reads the log from this path, so the run can't go ahead without it
+            print(f"Cannot write the log of execution {execution_id} to {execution['log_file']}: {e}. "
+                  f"Workers must share the server's CRONBAT_LOGS_PATH directory")
+            self.db.finish_execution(execution_id, 'failed', exit_code=-1, worker_id=self.worker_id)
+            self._slots.release()
+            return
+
+        def handle_exit(exit_code):
+            try:
+                self._finish(execution_id, log_writer, start_time, exit_code)
+            finally:
+                self._slots.release()
+
+        try:
+            process = subprocess.Popen(
+                '; '.join(job['command'].splitlines()),
+                shell=True,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                bufsize=0,
+                # Own process group, so a lost run can be killed with its children
+                start_new_session=True
+            )
+            with self._lock:
+                self._running[execution_id] = process
+            self._monitor.watch(process, log_writer.write, handle_exit)
+        except Exception as e:
+            log_writer.write(f"Error executing job: {str(e)}\n")
+            handle_exit(-1)
+
+    def _finish(self, execution_id, log_writer, start_time, exit_code):
+        """Write the result of a run back to the database"""
+        with self._lock:
+            self._running.pop(execution_id, None)
+
+        duration = (datetime.now() - start_time).total_seconds()
+        log_size = log_writer.close()
+        self.db.finish_execution(
+            execution_id=execution_id,
+            state='success' if exit_code == 0 else 'failed',
+            exit_code=exit_code,
+            duration=duration,
+            log_size=log_size,
+            worker_id=self.worker_id
+        )
+
+    def _heartbeat(self):
+        """Renew the leases of runs in progress, killing runs whose lease was lost"""
+        while True:
+            time.sleep(self.lease_seconds / 3)
+            with self._lock:
+                execution_ids = list(self._running)
+            if not execution_ids:
+                continue
+
+            held = set(self.db.renew_leases(self.worker_id, execution_ids, self.lease_seconds))
+            for execution_id in execution_ids:
+                if execution_id not in held:
+                    with self._lock:
+                        process = self._running.get(execution_id)
+                    if process:
+                        print(f"Lost the lease of execution {execution_id}, stopping it")
+                        try:
+                            os.killpg(process.pid, signal.SIGKILL)
+                        except OSError:
+                            pass
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""Benchmark Database.get_jobs() query count and latency
+
+Usage:
+    python benchmarks/bench_get_jobs.py [job counts...]
+
+Seeds a throwaway SQLite database with the given number of jobs (default
+100, 1000 and 10000), makes every fifth job depend on the job before it and
+reports how many SQL statements a single get_jobs() call issues and how long
+it takes.
+"""
+import os
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime
+
+from sqlalchemy import event
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from app.database import Database, Job, JobDependency
+
+RUNS = 5
+
+
+def seed(db, count):
+    """Insert count jobs and a dependency edge for every fifth job"""
+    session = db.Session()
+    try:
+        job_ids = [str(uuid.uuid4()) for _ in range(count)]
+        session.bulk_insert_mappings(Job, [{
+            'id': job_id,
+            'name': f'job-{i}',
+            'command': 'true',
+            'schedule': '* * * * *',
+            'created_at': datetime.now(),
+            'is_paused': False,
+            'trigger_type': 'dependency' if i and i % 5 == 0 else 'schedule'
+        } for i, job_id in enumerate(job_ids)])
+        session.bulk_insert_mappings(JobDependency, [{
+            'parent_job_id': job_ids[i - 1],
+            'child_job_id': job_ids[i]
+        } for i in range(5, count, 5)])
+        session.commit()
+    finally:
+        session.close()
+
+
+def bench(count):
+    """Return (queries, best seconds) for get_jobs() over count jobs"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(
+            db_path=os.path.join(tmp, 'cronbat.db'),
+            logs_path=os.path.join(tmp, 'logs')
+        )
+        seed(db, count)
+
+        statements = []
+
+        def count_statement(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', count_statement)
+
+        timings = []
+        for _ in range(RUNS):
+            statements.clear()
+            start = time.perf_counter()
+            jobs = db.get_jobs()
+            timings.append(time.perf_counter() - start)
+
+        assert len(jobs) == count
+        event.remove(db.engine, 'before_cursor_execute', count_statement)
+        db.engine.dispose()
+
+        return len(statements), min(timings)
+
+
+def main():
+    counts = [int(arg) for arg in sys.argv[1:]] or [100, 1000, 10000]
+
+    print(f"{'jobs':>8} {'queries':>8} {'best ms':>10}")
+    for count in counts:
+        queries, seconds = bench(count)
+        print(f"{count:>8} {queries:>8} {seconds * 1000:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
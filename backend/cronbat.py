@@ -0,0 +1,64 @@
+import argparse
+import os
+import socket
+from dotenv import load_dotenv
+
+
+def run_worker(args):
+    """Run jobs queued for workers with the given labels"""
+    from app import db
+    from app.worker import Worker
+
+    if not os.access(db.logs_path, os.W_OK):
+        raise SystemExit(f"Cannot write to the logs directory {db.logs_path}; workers must share "
+                         f"CRONBAT_LOGS_PATH (and CRONBAT_DB_PATH) with the server")
+
+    labels = [label.strip() for label in args.labels.split(',') if label.strip()]
+    worker = Worker(
+        db,
+        worker_id=args.id,
+        labels=labels,
+        concurrency=args.concurrency,
+        lease_seconds=args.lease,
+        poll_interval=args.poll
+    )
+    try:
+        worker.run()
+    except KeyboardInterrupt:
+        # Runs in progress are handed to another worker once their lease expires
+        print("Worker stopped")
+
+
+def main():
+    # Load environment variables from .env file
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(prog='cronbat')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    worker = commands.add_parser(
+        'worker',
+        help='Run jobs from the worker queue',
+        description='Run jobs from the worker queue. The worker writes run logs where the server reads '
+                    'them, so it must see the same CRONBAT_DB_PATH and CRONBAT_LOGS_PATH as the '
+                    'server, e.g. through a shared volume.'
+    )
+    worker.add_argument('--labels', default=os.environ.get('CRONBAT_WORKER_LABELS', 'default'),
+                        help='Comma-separated labels of the jobs to run (default: default)')
+    worker.add_argument('--id', default=f'{socket.gethostname()}:{os.getpid()}',
+                        help='Worker name shown on its runs (default: host:pid)')
+    worker.add_argument('--concurrency', type=int,
+                        default=int(os.environ.get('CRONBAT_WORKER_CONCURRENCY', '4')),
+                        help='Maximum number of jobs run at once (default: 4)')
+    worker.add_argument('--lease', type=int, default=int(os.environ.get('CRONBAT_WORKER_LEASE', '30')),
+                        help='Seconds a claimed run stays assigned without a heartbeat (default: 30)')
+    worker.add_argument('--poll', type=float, default=1.0,
+                        help='Seconds between checks for new runs when idle (default: 1)')
+    worker.set_defaults(handler=run_worker)
+
+    args = parser.parse_args()
+    args.handler(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -2,7 +2,213 @@
 import os
 import sqlite3
 import sys
+from datetime import datetime
 from app import db
+from app.database import LOG_SEARCH_DDL
+
+# Migrations are applied in order and recorded in the schema_version table.
+# Every step must be idempotent: databases created before versioning was
+# introduced start at version 0 and may already contain some of the changes.
+
+def _get_columns(cursor, table):
+    """Return a dict of column name -> PRAGMA table_info row"""
+    cursor.execute(f"PRAGMA table_info({table})")
+    return {column[1]: column for column in cursor.fetchall()}
+
+def _create_job_dependencies_table(cursor):
+    """Create the job_dependencies table"""
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS job_dependencies (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        parent_job_id VARCHAR NOT NULL,
+        child_job_id VARCHAR NOT NULL,
+        FOREIGN KEY (parent_job_id) REFERENCES jobs(id) ON DELETE CASCADE,
+        FOREIGN KEY (child_job_id) REFERENCES jobs(id) ON DELETE CASCADE
+    )
+    """)
+
+def _add_trigger_type_column(cursor):
+    """Add the trigger_type column to the jobs table"""
+    if 'trigger_type' not in _get_columns(cursor, 'jobs'):
+        cursor.execute("ALTER TABLE jobs ADD COLUMN trigger_type VARCHAR DEFAULT 'schedule'")
+
+def _make_schedule_nullable(cursor):
+    """Make the jobs.schedule column nullable"""
+    schedule = _get_columns(cursor, 'jobs').get('schedule')
+    if not schedule or not schedule[3]:
+        return
+
+    # SQLite doesn't support ALTER COLUMN, so we need to create a new table and copy the data
+    cursor.execute("""
+    CREATE TABLE jobs_new (
+        id VARCHAR PRIMARY KEY,
+        name VARCHAR NOT NULL,
+        command VARCHAR NOT NULL,
+        schedule VARCHAR,
+        description TEXT,
+        created_at TIMESTAMP,
+        last_run TIMESTAMP,
+        is_paused BOOLEAN DEFAULT 0,
+        trigger_type VARCHAR DEFAULT 'schedule'
+    )
+    """)
+    cursor.execute("""
+    INSERT INTO jobs_new (id, name, command, schedule, description, created_at, last_run, is_paused, trigger_type)
+    SELECT id, name, command, schedule, description, created_at, last_run, is_paused, trigger_type FROM jobs
+    """)
+    cursor.execute("DROP TABLE jobs")
+    cursor.execute("ALTER TABLE jobs_new RENAME TO jobs")
+
+def _add_lookup_indexes(cursor):
+    """Index execution history and dependency lookups"""
+    cursor.execute("CREATE INDEX IF NOT EXISTS ix_executions_job_id_timestamp ON executions (job_id, timestamp)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS ix_job_dependencies_parent_job_id ON job_dependencies (parent_job_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS ix_job_dependencies_child_job_id ON job_dependencies (child_job_id)")
+
+def _add_unique_job_name(cursor):
+    """Enforce unique job names, renaming existing duplicates"""
+    cursor.execute("""
+    SELECT id, name FROM jobs
+    WHERE name IN (SELECT name FROM jobs GROUP BY name HAVING COUNT(*) > 1)
+    ORDER BY name, created_at, rowid
+    """)
+    seen = set()
+    for job_id, name in cursor.fetchall():
+        if name not in seen:
+            # Keep the oldest job's name as-is
+            seen.add(name)
+            continue
+        new_name = f"{name} ({job_id[:8]})"
+        print(f"Renaming duplicate job name '{name}' to '{new_name}'")
+        cursor.execute("UPDATE jobs SET name = ? WHERE id = ?", (new_name, job_id))
+
+    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS uq_jobs_name ON jobs (name)")
+
+def _add_retention_columns(cursor):
+    """Add per-job retention overrides and execution log sizes"""
+    job_columns = _get_columns(cursor, 'jobs')
+    for column, column_type in (('max_executions', 'INTEGER'), ('retention_days', 'INTEGER'), ('max_log_mb', 'FLOAT')):
+        if column not in job_columns:
+            cursor.execute(f"ALTER TABLE jobs ADD COLUMN {column} {column_type}")
+
+    if 'log_size' not in _get_columns(cursor, 'executions'):
+        cursor.execute("ALTER TABLE executions ADD COLUMN log_size INTEGER")
+
+    # Backfill log sizes so the size policy covers existing executions
+    cursor.execute("SELECT id, log_file FROM executions WHERE log_size IS NULL AND log_file IS NOT NULL")
+    sizes = []
+    for execution_id, log_file in cursor.fetchall():
+        try:
+            sizes.append((os.path.getsize(log_file), execution_id))
+        except OSError:
+            sizes.append((0, execution_id))
+    cursor.executemany("UPDATE executions SET log_size = ? WHERE id = ?", sizes)
+
+def _add_execution_timestamp_index(cursor):
+    """Index execution history across all jobs"""
+    cursor.execute("CREATE INDEX IF NOT EXISTS ix_executions_timestamp ON executions (timestamp)")
+
+def _add_log_search(cursor):
+    """Create the log search index and index existing logs"""
+    try:
+        for statement in LOG_SEARCH_DDL:
+            cursor.execute(statement)
+    except sqlite3.OperationalError as e:
+        print(f"Skipping log search index: {e}")
+        return
+
+    cursor.execute("""
+    SELECT id, log_file FROM executions
+    WHERE log_file IS NOT NULL AND id NOT IN (SELECT rowid FROM log_search)
+    """)
+    for execution_id, log_file in cursor.fetchall():
+        try:
+            with open(log_file, 'r', errors='replace') as f:
+                output = f.read()[-db.log_search_max_chars:]
+        except OSError:
+            continue
+        cursor.execute("INSERT INTO log_search (rowid, output) VALUES (?, ?)", (execution_id, output))
+
+def _add_max_output_column(cursor):
+    """Add the per-run log size limit to the jobs table"""
+    if 'max_output_mb' not in _get_columns(cursor, 'jobs'):
+        cursor.execute("ALTER TABLE jobs ADD COLUMN max_output_mb FLOAT")
+
+def _add_priority_column(cursor):
+    """Add the execution queue priority class to the jobs table"""
+    if 'priority' not in _get_columns(cursor, 'jobs'):
+        cursor.execute("ALTER TABLE jobs ADD COLUMN priority VARCHAR DEFAULT 'normal'")
+
+def _add_worker_queue_columns(cursor):
+    """Add worker routing and lease columns for runs executed by workers"""
+    if 'worker_label' not in _get_columns(cursor, 'jobs'):
+        cursor.execute("ALTER TABLE jobs ADD COLUMN worker_label VARCHAR")
+
+    execution_columns = _get_columns(cursor, 'executions')
+    for name, column_type in (('worker_label', 'VARCHAR'), ('worker_id', 'VARCHAR'),
+                              ('lease_expires_at', 'DATETIME'), ('attempts', 'INTEGER DEFAULT 0')):
+        if name not in execution_columns:
+            cursor.execute(f"ALTER TABLE executions ADD COLUMN {name} {column_type}")
+
+    cursor.execute("CREATE INDEX IF NOT EXISTS ix_executions_state_worker_label ON executions (state, worker_label)")
+
+def _add_leader_tables(cursor):
+    """Add the tables processes use to follow the scheduler leader"""
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS change_versions (
+        name VARCHAR NOT NULL PRIMARY KEY,
+        version INTEGER NOT NULL
+    )
+    """)
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS run_requests (
+        id INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT,
+        job_id VARCHAR NOT NULL,
+        requested_at DATETIME,
+        FOREIGN KEY (job_id) REFERENCES jobs (id) ON DELETE CASCADE
+    )
+    """)
+
+def _add_jitter_column(cursor):
+    """Add the per-job start jitter column"""
+    if 'jitter_seconds' not in _get_columns(cursor, 'jobs'):
+        cursor.execute("ALTER TABLE jobs ADD COLUMN jitter_seconds INTEGER")
+
+def _add_dag_columns(cursor):
+    """Add the join policy of jobs and the chain run id of executions"""
+    if 'join_policy' not in _get_columns(cursor, 'jobs'):
+        cursor.execute("ALTER TABLE jobs ADD COLUMN join_policy VARCHAR DEFAULT 'all'")
+    if 'dag_run_id' not in _get_columns(cursor, 'executions'):
+        cursor.execute("ALTER TABLE executions ADD COLUMN dag_run_id VARCHAR")
+
+MIGRATIONS = [
+    (1, "Create job_dependencies table", _create_job_dependencies_table),
+    (2, "Add jobs.trigger_type column", _add_trigger_type_column),
+    (3, "Make jobs.schedule nullable", _make_schedule_nullable),
+    (4, "Add execution and dependency indexes", _add_lookup_indexes),
+    (5, "Add unique index on jobs.name", _add_unique_job_name),
+    (6, "Add retention policy columns", _add_retention_columns),
+    (7, "Add execution timestamp index", _add_execution_timestamp_index),
+    (8, "Add log search index", _add_log_search),
+    (9, "Add jobs.max_output_mb column", _add_max_output_column),
+    (10, "Add jobs.priority column", _add_priority_column),
+    (11, "Add worker queue columns", _add_worker_queue_columns),
+    (12, "Add leader coordination tables", _add_leader_tables),
+    (13, "Add jobs.jitter_seconds column", _add_jitter_column),
+    (14, "Add dependency chain run columns", _add_dag_columns),
+]
+
+def get_schema_version(cursor):
+    """Return the current schema version, creating the version table if needed"""
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS schema_version (
+        version INTEGER PRIMARY KEY,
+        description VARCHAR NOT NULL,
+        applied_at TIMESTAMP NOT NULL
+    )
+    """)
+    cursor.execute("SELECT MAX(version) FROM schema_version")
+    return cursor.fetchone()[0] or 0
 
 def migrate_database():
     """
@@ -19,75 +225,42 @@ def migrate_database():
         print("No migration needed. The database will be created with the latest schema.")
         return
 
-    # Connect to the database
-    conn = sqlite3.connect(db_path)
+    # Connect to the database; transactions are managed explicitly so that
+    # each step and its version row are committed atomically
+    conn = sqlite3.connect(db_path, isolation_level=None)
     cursor = conn.cursor()
 
     try:
-        # Check if job_dependencies table exists
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='job_dependencies'")
-        if not cursor.fetchone():
-            print("Creating job_dependencies table...")
-            cursor.execute("""
-            CREATE TABLE job_dependencies (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                parent_job_id VARCHAR NOT NULL,
-                child_job_id VARCHAR NOT NULL,
-                FOREIGN KEY (parent_job_id) REFERENCES jobs(id) ON DELETE CASCADE,
-                FOREIGN KEY (child_job_id) REFERENCES jobs(id) ON DELETE CASCADE
-            )
-            """)
-            print("job_dependencies table created successfully")
-
-        # Check if trigger_type column exists in jobs table
-        cursor.execute("PRAGMA table_info(jobs)")
-        columns = [column[1] for column in cursor.fetchall()]
-
-        if 'trigger_type' not in columns:
-            print("Adding trigger_type column to jobs table...")
-            cursor.execute("ALTER TABLE jobs ADD COLUMN trigger_type VARCHAR DEFAULT 'schedule'")
-            print("trigger_type column added successfully")
-
-        # Make schedule column nullable
-        # SQLite doesn't support ALTER COLUMN, so we need to create a new table and copy the data
-        if 'schedule' in columns:
-            print("Making schedule column nullable...")
-
-            # Create a new table with the updated schema
-            cursor.execute("""
-            CREATE TABLE jobs_new (
-                id VARCHAR PRIMARY KEY,
-                name VARCHAR NOT NULL,
-                command VARCHAR NOT NULL,
-                schedule VARCHAR,
-                description TEXT,
-                created_at TIMESTAMP,
-                last_run TIMESTAMP,
-                is_paused BOOLEAN DEFAULT 0,
-                trigger_type VARCHAR DEFAULT 'schedule'
-            )
-            """)
-
-            # Copy data from the old table to the new table
-            cursor.execute("""
-            INSERT INTO jobs_new (id, name, command, schedule, description, created_at, last_run, is_paused, trigger_type)
-            SELECT id, name, command, schedule, description, created_at, last_run, is_paused, trigger_type FROM jobs
-            """)
-
-            # Drop the old table
-            cursor.execute("DROP TABLE jobs")
-
-            # Rename the new table to the original name
-            cursor.execute("ALTER TABLE jobs_new RENAME TO jobs")
-
-            print("schedule column made nullable successfully")
-
-        # Commit the changes
-        conn.commit()
-        print("Database migration completed successfully")
+        current_version = get_schema_version(cursor)
+        pending = [migration for migration in MIGRATIONS if migration[0] > current_version]
+
+        if not pending:
+            print(f"Database schema is up to date (version {current_version})")
+            return
+
+        for version, description, step in pending:
+            # Several server processes may start at once; the first one to
+            # take the write lock applies the step and the others skip it
+            cursor.execute("BEGIN IMMEDIATE")
+            if get_schema_version(cursor) >= version:
+                cursor.execute("ROLLBACK")
+                continue
+
+            print(f"Applying migration {version}: {description}...")
+            try:
+                step(cursor)
+                cursor.execute(
+                    "INSERT INTO schema_version (version, description, applied_at) VALUES (?, ?, ?)",
+                    (version, description, datetime.now().isoformat())
+                )
+                cursor.execute("COMMIT")
+            except Exception:
+                cursor.execute("ROLLBACK")
+                raise
+
+        print(f"Database migration completed successfully (version {pending[-1][0]})")
 
     except Exception as e:
-        conn.rollback()
         print(f"Error during migration: {e}")
         sys.exit(1)
     finally:
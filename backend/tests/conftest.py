@@ -0,0 +1,84 @@
+import os
+import sys
+import tempfile
+import time
+
+import pytest
+
+# Importing the app package opens the database, so point it at a scratch
+# directory before any test module imports it
+_data_dir = tempfile.mkdtemp(prefix='cronbat-tests-')
+os.environ.setdefault('CRONBAT_DB_PATH', os.path.join(_data_dir, 'cronbat.db'))
+os.environ.setdefault('CRONBAT_LOGS_PATH', os.path.join(_data_dir, 'logs'))
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope='session')
+def app():
+    """The Flask app over the scratch database, brought to the latest schema"""
+    import migrate_db
+    from app import create_app
+
+    migrate_db.migrate_database()
+    return create_app()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def make_job(client):
+    """Create a job through the API and return its id"""
+    def make_job(name, command='true', schedule='0 0 1 1 *', **fields):
+        response = client.post('/api/jobs', json=dict(name=name, command=command, schedule=schedule, **fields))
+        assert response.status_code == 201, response.json
+        return response.json['job_id']
+    return make_job
+
+
+@pytest.fixture
+def run_job(client):
+    """Run a job through the API and return its execution once it finished"""
+    def run_job(job_id, timeout=10):
+        before = {execution['id'] for execution in client.get(f'/api/jobs/{job_id}/executions').json}
+        assert client.post(f'/api/jobs/{job_id}/run').status_code == 200
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            for execution in client.get(f'/api/jobs/{job_id}/executions').json:
+                if execution['id'] not in before and execution['state'] not in ('pending', 'running'):
+                    return execution
+            time.sleep(0.05)
+        raise AssertionError(f"Job {job_id} didn't finish within {timeout}s")
+    return run_job
+
+
+@pytest.fixture
+def database(tmp_path):
+    """A Database of its own in a scratch directory"""
+    from app.database import Database
+    return Database(db_path=str(tmp_path / 'cronbat.db'), logs_path=str(tmp_path / 'logs'))
+
+
+@pytest.fixture
+def add_runs(app):
+    """Record finished runs of a job in the app's database, without running it
+
+    Takes (state, exit_code, duration, output) tuples and returns the ids of
+    the runs, oldest first.
+    """
+    from app import db
+
+    def add_runs(job_id, *runs):
+        ids = []
+        for state, exit_code, duration, output in runs:
+            execution = db.start_execution(job_id)
+            with open(execution['log_file'], 'w') as f:
+                f.write(output)
+            db.finish_execution(execution['id'], state, exit_code=exit_code, duration=duration,
+                                log_size=len(output.encode()))
+            ids.append(execution['id'])
+        return ids
+    return add_runs
@@ -0,0 +1,87 @@
+import pytest
+
+from app.responsecache import ResponseCache
+
+
+def test_response_cache_builds_once_per_version():
+    cache = ResponseCache()
+    builds = []
+
+    def build():
+        builds.append(1)
+        return f'body {len(builds)}'
+
+    assert cache.get(1, 'page', build) == 'body 1'
+    assert cache.get(1, 'page', build) == 'body 1'
+    assert cache.get(2, 'page', build) == 'body 2'
+    assert cache.stats() == {'hits': 1, 'misses': 2, 'entries': 1}
+
+
+def test_response_cache_never_goes_back_to_an_older_version():
+    cache = ResponseCache()
+    cache.get(2, 'page', lambda: 'new')
+
+    assert cache.get(1, 'page', lambda: 'old') == 'old'
+    assert cache.get(2, 'page', lambda: 'rebuilt') == 'new'
+
+
+def test_response_cache_evicts_least_recently_used():
+    cache = ResponseCache(max_entries=2)
+    for key in ('a', 'b'):
+        cache.get(1, key, lambda: key)
+    cache.get(1, 'a', lambda: 'rebuilt')
+    cache.get(1, 'c', lambda: 'c')
+
+    assert cache.get(1, 'a', lambda: 'rebuilt') == 'a'
+    assert cache.get(1, 'b', lambda: 'rebuilt') == 'rebuilt'
+
+
+@pytest.mark.parametrize('path', ['/api/jobs', '/api/dependencies', '/api/executions'])
+def test_unchanged_listing_is_not_modified(client, path):
+    response = client.get(path)
+    assert response.status_code == 200
+    assert response.headers['ETag']
+    assert response.headers['Cache-Control'] == 'no-cache'
+
+    again = client.get(path, headers={'If-None-Match': response.headers['ETag']})
+
+    assert again.status_code == 304
+    assert again.data == b''
+    assert again.headers['ETag'] == response.headers['ETag']
+
+
+def test_changed_listing_has_a_new_etag(client, make_job):
+    etags = {path: client.get(path).headers['ETag'] for path in ('/api/jobs', '/api/dependencies')}
+    parent, child = make_job('etag parent'), make_job('etag child')
+    client.post('/api/dependencies', json={'parent_job_id': parent, 'child_job_id': child})
+
+    for path, etag in etags.items():
+        response = client.get(path, headers={'If-None-Match': etag})
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
+    assert 'etag parent' in {job['name'] for job in client.get('/api/jobs').json}
+
+
+def test_new_run_changes_the_executions_etag(client, make_job, add_runs):
+    job_id = make_job('etag runs')
+    etag = client.get('/api/executions').headers['ETag']
+
+    add_runs(job_id, ('success', 0, 1.0, 'done\n'))
+
+    response = client.get('/api/executions', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.json[0]['job_id'] == job_id
+
+
+def test_not_modified_page_is_not_rebuilt(client, monkeypatch):
+    from app.api import routes
+
+    etag = client.get('/api/executions?limit=5').headers['ETag']
+
+    def fail(**filters):
+        raise AssertionError("The page was rebuilt")
+    monkeypatch.setattr(routes, 'get_executions_page', fail)
+
+    assert client.get('/api/executions?limit=5', headers={'If-None-Match': etag}).status_code == 304
+    # Other clients get the cached body
+    assert client.get('/api/executions?limit=5').status_code == 200
@@ -0,0 +1,67 @@
+import pytest
+from apscheduler.triggers.cron import CronTrigger
+from app.cronhash import resolve_schedule
+
+
+def test_plain_schedules_are_unchanged():
+    assert resolve_schedule('*/5 * * * *', 'job') == '*/5 * * * *'
+
+
+@pytest.mark.parametrize('schedule', [
+    '0 0 * * THU',
+    '0 0 * * thu',
+    '30 6 * * MON-FRI',
+    '0 0 * * TUE,THU',
+    '0 0 1 MAR-AUG *',
+    '0 0 1 JAN,JUL THU',
+])
+def test_day_and_month_names_pass_through(schedule):
+    assert resolve_schedule(schedule, 'job') == schedule
+    CronTrigger.from_crontab(schedule)
+
+
+def test_names_next_to_hash_fields():
+    minute, hour, day, month, day_of_week = resolve_schedule('H H * MAR THU', 'job').split()
+    assert 0 <= int(minute) <= 59
+    assert 0 <= int(hour) <= 23
+    assert (day, month, day_of_week) == ('*', 'MAR', 'THU')
+
+
+def test_hash_is_stable_per_seed():
+    assert resolve_schedule('H H * * *', 'a') == resolve_schedule('H H * * *', 'a')
+    resolved = {resolve_schedule('H * * * *', f'job-{index}') for index in range(50)}
+    assert len(resolved) > 1
+
+
+def test_hash_ranges_and_steps():
+    minute = int(resolve_schedule('H(10-20) * * * *', 'job').split()[0])
+    assert 10 <= minute <= 20
+
+    minutes = [int(value) for value in resolve_schedule('H/15 * * * *', 'job').split()[0].split(',')]
+    assert len(minutes) == 4
+    assert all(later - earlier == 15 for earlier, later in zip(minutes, minutes[1:]))
+
+
+@pytest.mark.parametrize('schedule', ['H(1-2 * * * *', 'H(50-70) * * * *', 'H/0 * * * *', 'H * * *'])
+def test_malformed_hash_fields_are_rejected(schedule):
+    with pytest.raises(ValueError):
+        resolve_schedule(schedule, 'job')
+
+
+@pytest.mark.parametrize('schedule', [None, 5, ['H', '*', '*', '*', '*']])
+def test_non_string_schedules_are_rejected(schedule):
+    with pytest.raises(ValueError):
+        resolve_schedule(schedule, 'job')
+
+
+def test_api_rejects_non_string_schedules(client):
+    response = client.post('/api/jobs', json={'name': 'null-schedule', 'command': 'true', 'schedule': None})
+    assert response.status_code == 400
+
+    response = client.post('/api/jobs/bulk', json={'update': [{'id': 'any', 'schedule': 5}]})
+    assert response.status_code == 400
+
+    manifest = {'jobs': [{'name': 'number-schedule', 'command': 'true', 'schedule': 5}]}
+    response = client.post('/api/manifest', json=manifest)
+    assert response.status_code == 400
+    assert 'schedule' in response.json['error']
@@ -0,0 +1,97 @@
+from app.dag import DagEngine
+
+
+def make_engine(edges, policies=None, max_running=4):
+    """An engine over (parent, child) edges, with the join policy per child"""
+    policies = policies or {}
+
+    def get_children(job_id):
+        return [{'id': child, 'join_policy': policies.get(child, 'all')}
+                for parent, child in edges if parent == job_id]
+
+    def get_parents(job_id):
+        return [parent for parent, child in edges if child == job_id]
+
+    return DagEngine(get_children, get_parents, max_running=max_running)
+
+
+FAN_IN = [('a', 'c'), ('b', 'c'), ('d', 'c')]
+
+
+def test_fan_in_runs_once_after_independent_parents():
+    engine = make_engine(FAN_IN)
+
+    assert engine.job_finished('a', True) == []
+    assert engine.job_finished('b', True) == []
+    started = engine.job_finished('d', True)
+
+    assert [(job_id, parent_id) for job_id, _, parent_id in started] == [('c', 'd')]
+    assert [run['state'] for run in engine.stats()['finished']] == ['deferred', 'deferred']
+
+
+def test_fan_in_waits_again_after_the_child_ran():
+    engine = make_engine(FAN_IN)
+    for parent in 'abd':
+        started = engine.job_finished(parent, True)
+    (_, run_id, _), = started
+    engine.job_finished('c', True, [run_id])
+
+    assert engine.job_finished('a', True) == []
+    assert engine.job_finished('b', True) == []
+    assert [job_id for job_id, _, _ in engine.job_finished('d', True)] == ['c']
+
+
+def test_fan_in_any_policy_runs_after_first_parent():
+    engine = make_engine(FAN_IN, policies={'c': 'any'})
+
+    assert [job_id for job_id, _, _ in engine.job_finished('a', True)] == ['c']
+
+
+def test_failed_parent_keeps_child_waiting():
+    engine = make_engine(FAN_IN)
+
+    engine.job_finished('a', True)
+    engine.job_finished('b', False)
+    assert engine.job_finished('d', True) == []
+
+    # The child runs once the failed parent succeeds
+    assert [job_id for job_id, _, _ in engine.job_finished('b', True)] == ['c']
+
+
+def test_chain_runs_through_to_the_end():
+    engine = make_engine([('a', 'b'), ('b', 'c')])
+
+    (job_id, run_id, _), = engine.job_finished('a', True)
+    assert job_id == 'b'
+    (job_id, same_run_id, parent_id), = engine.job_finished('b', True, [run_id])
+    assert (job_id, same_run_id, parent_id) == ('c', run_id, 'b')
+    assert engine.job_finished('c', True, [run_id]) == []
+
+    run = engine.get_run(run_id)
+    assert run['state'] == 'success'
+    assert [node['state'] for node in run['nodes']] == ['success'] * 3
+
+
+def test_failure_skips_the_rest_of_the_chain():
+    engine = make_engine([('a', 'b'), ('b', 'c')])
+
+    (_, run_id, _), = engine.job_finished('a', True)
+    assert engine.job_finished('b', False, [run_id]) == []
+
+    run = engine.get_run(run_id)
+    assert run['state'] == 'failed'
+    assert {node['job_id']: node['state'] for node in run['nodes']} == {'a': 'success', 'b': 'failed', 'c': 'skipped'}
+
+
+def test_finish_is_matched_to_its_chain_run():
+    engine = make_engine([('a', 'b'), ('b', 'c')])
+    (_, run_id, _), = engine.job_finished('a', True)
+
+    # A run of b started on its own starts its own chain run of c and
+    # leaves the node of a's chain run running
+    (job_id, other_run_id, _), = engine.job_finished('b', True)
+    assert job_id == 'c' and other_run_id != run_id
+    assert engine.get_run(run_id)['state'] == 'running'
+
+    engine.job_finished('c', True, [other_run_id])
+    assert engine.job_finished('b', True, [run_id]) == [('c', run_id, 'b')]
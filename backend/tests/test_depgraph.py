@@ -0,0 +1,109 @@
+from app.depgraph import DependencyGraph
+
+
+def make_graph(edges):
+    """A graph that loads (parent, child) edges from a list the test may change"""
+    return DependencyGraph(lambda: [{'parent_job_id': parent, 'child_job_id': child} for parent, child in edges])
+
+
+# a -> b -> c -> d, plus a shortcut a -> c and a second root e -> c
+DIAMOND = [('a', 'b'), ('b', 'c'), ('c', 'd'), ('a', 'c'), ('e', 'c')]
+
+
+def test_ancestors_and_descendants_at_their_shortest_depth():
+    graph = make_graph(DIAMOND)
+
+    assert graph.descendants('a') == {'b': 1, 'c': 1, 'd': 2}
+    assert graph.ancestors('d') == {'c': 1, 'b': 2, 'a': 2, 'e': 2}
+    assert graph.ancestors('a') == {}
+
+
+def test_depth_limit():
+    graph = make_graph(DIAMOND)
+
+    assert graph.ancestors('d', max_depth=1) == {'c': 1}
+    assert graph.descendants('b', max_depth=2) == {'c': 1, 'd': 2}
+
+
+def test_edges_are_loaded_once():
+    graph = make_graph(DIAMOND)
+    graph.children('a')
+    graph.parents('c')
+    graph.edges()
+
+    assert graph.stats()['loads'] == 1
+    assert graph.stats()['edges'] == 5
+
+
+def test_local_changes_are_applied_in_place():
+    graph = make_graph(DIAMOND)
+    version, _ = graph.version()
+
+    graph.add_edge('d', 'f')
+    graph.remove_edge('a', 'c')
+
+    assert graph.descendants('a') == {'b': 1, 'c': 2, 'd': 3, 'f': 4}
+    assert graph.version()[0] == version + 2
+    assert graph.stats()['loads'] == 1
+
+
+def test_removed_job_loses_its_edges():
+    graph = make_graph(DIAMOND)
+    graph.edges()
+
+    graph.remove_job('c')
+
+    assert graph.children('b') == []
+    assert graph.parents('d') == []
+    assert graph.stats()['edges'] == 1
+
+
+def test_version_only_moves_when_edges_change():
+    edges = list(DIAMOND)
+    graph = make_graph(edges)
+    version, _ = graph.version()
+
+    graph.add_edge('a', 'b')
+    graph.invalidate()
+    assert graph.version()[0] == version
+
+    edges.append(('d', 'f'))
+    graph.invalidate()
+    assert graph.version()[0] == version + 1
+    assert graph.children('d') == ['f']
+
+
+def test_related_jobs_api(client, make_job):
+    a, b, c = (make_job(f'graph job {name}') for name in 'abc')
+    for parent, child in [(a, b), (b, c)]:
+        response = client.post('/api/dependencies', json={'parent_job_id': parent, 'child_job_id': child})
+        assert response.status_code == 201
+
+    descendants = client.get(f'/api/jobs/{a}/descendants').json['descendants']
+    assert [(job['id'], job['depth']) for job in descendants] == [(b, 1), (c, 2)]
+    ancestors = client.get(f'/api/jobs/{c}/ancestors?depth=1').json['ancestors']
+    assert [job['name'] for job in ancestors] == ['graph job b']
+
+    graph = client.get('/api/graph').json
+    assert {a, b, c} <= {node['id'] for node in graph['nodes']}
+    assert {'parent_job_id': a, 'child_job_id': b} in graph['edges']
+
+
+def test_cycles_are_rejected(client, make_job):
+    a, b, c = (make_job(f'cycle job {name}') for name in 'abc')
+    for parent, child in [(a, b), (b, c)]:
+        client.post('/api/dependencies', json={'parent_job_id': parent, 'child_job_id': child})
+
+    response = client.post('/api/dependencies', json={'parent_job_id': c, 'child_job_id': a})
+
+    assert response.status_code == 400
+    assert 'cycle' in response.json['error']
+    assert client.get(f'/api/jobs/{a}/ancestors').json['ancestors'] == []
+
+
+def test_related_jobs_api_errors(client, make_job):
+    job_id = make_job('graph job errors')
+
+    assert client.get('/api/jobs/missing/ancestors').status_code == 404
+    assert client.get(f'/api/jobs/{job_id}/descendants?depth=0').status_code == 400
+    assert client.get(f'/api/jobs/{job_id}/descendants?depth=deep').status_code == 400
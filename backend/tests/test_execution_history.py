@@ -0,0 +1,44 @@
+def test_pages_follow_the_cursor(client, make_job, add_runs):
+    job_id = make_job('history-pages')
+    ids = add_runs(job_id, *[('success', 0, 0.1, '')] * 5)
+
+    seen = []
+    cursor = None
+    pages = 0
+    while True:
+        url = f'/api/jobs/{job_id}/executions?limit=2' + (f'&cursor={cursor}' if cursor else '')
+        response = client.get(url)
+        assert response.status_code == 200
+        seen.extend(execution['id'] for execution in response.json)
+        pages += 1
+        cursor = response.headers.get('X-Next-Cursor')
+        if not cursor:
+            break
+        assert 'rel="next"' in response.headers['Link']
+
+    assert pages == 3
+    assert seen == ids[::-1]
+
+
+def test_filters(client, make_job, add_runs):
+    job_id = make_job('history-filters')
+    ok, failed, slow = add_runs(job_id, ('success', 0, 0.1, ''), ('failed', 2, 0.2, ''), ('failed', 1, 5.0, ''))
+
+    def ids(query):
+        response = client.get(f'/api/executions?job_id={job_id}&{query}')
+        assert response.status_code == 200
+        return [execution['id'] for execution in response.json]
+
+    assert ids('state=failed') == [slow, failed]
+    assert ids('state=success,failed') == [slow, failed, ok]
+    assert ids('exit_code=2') == [failed]
+    assert ids('min_duration=1') == [slow]
+    assert ids('until=2000-01-01T00:00:00') == []
+    assert client.get(f'/api/executions?job_id={job_id}').json[0]['job_name'] == 'history-filters'
+
+
+def test_invalid_parameters_are_rejected(client):
+    for query in ('limit=0', 'limit=many', 'exit_code=x', 'since=yesterday', 'min_duration=long', 'cursor=garbage'):
+        response = client.get(f'/api/executions?{query}')
+        assert response.status_code == 400, query
+        assert 'error' in response.json
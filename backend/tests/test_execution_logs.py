@@ -0,0 +1,58 @@
+def test_log_by_job_and_timestamp(client, make_job, run_job):
+    job_id = make_job('log-by-timestamp', 'echo one; echo two')
+    execution = run_job(job_id)
+
+    response = client.get(f"/api/jobs/{job_id}/executions/{execution['timestamp']}/log")
+    assert response.status_code == 200
+    assert response.get_data(as_text=True) == 'one\ntwo\n'
+
+    response = client.get(f"/api/jobs/{job_id}/executions/{execution['timestamp']}/log?tail=1")
+    assert response.get_data(as_text=True) == 'two\n'
+
+    assert client.get(f'/api/jobs/{job_id}/executions/2000-01-01T00:00:00/log').status_code == 404
+    assert client.get(f'/api/jobs/{job_id}/executions/yesterday/log').status_code == 404
+
+
+LOG = ''.join(f'line {index}\n' for index in range(1, 101))
+
+
+def test_whole_log_by_id(client, make_job, add_runs):
+    execution_id, = add_runs(make_job('log-whole'), ('success', 0, 0.1, LOG))
+
+    response = client.get(f'/api/executions/{execution_id}/log')
+    assert response.status_code == 200
+    assert response.get_data(as_text=True) == LOG
+    assert response.headers['X-Log-Size'] == str(len(LOG))
+
+
+def test_tail_of_log(client, make_job, add_runs):
+    execution_id, = add_runs(make_job('log-tail'), ('success', 0, 0.1, LOG))
+
+    response = client.get(f'/api/executions/{execution_id}/log?tail=2')
+    assert response.get_data(as_text=True) == 'line 99\nline 100\n'
+    assert int(response.headers['X-Log-Offset']) == len(LOG) - len('line 99\nline 100\n')
+    assert client.get(f'/api/executions/{execution_id}/log?tail=1000').get_data(as_text=True) == LOG
+
+
+def test_byte_ranges(client, make_job, add_runs):
+    execution_id, = add_runs(make_job('log-range'), ('success', 0, 0.1, LOG))
+
+    response = client.get(f'/api/executions/{execution_id}/log?offset=7&limit=7')
+    assert response.get_data(as_text=True) == 'line 2\n'
+    assert (response.headers['X-Log-Offset'], response.headers['X-Log-Size']) == ('7', str(len(LOG)))
+
+    response = client.get(f'/api/executions/{execution_id}/log', headers={'Range': 'bytes=0-6'})
+    assert response.status_code == 206
+    assert response.get_data(as_text=True) == 'line 1\n'
+    assert response.headers['Content-Range'] == f'bytes 0-6/{len(LOG)}'
+
+    # Offsets past the end give an empty body rather than an error
+    assert client.get(f'/api/executions/{execution_id}/log?offset=100000').get_data() == b''
+
+
+def test_log_errors(client, make_job, add_runs):
+    execution_id, = add_runs(make_job('log-errors'), ('success', 0, 0.1, LOG))
+
+    assert client.get('/api/executions/999999/log').status_code == 404
+    for query in ('tail=-1', 'tail=x', 'offset=-5', 'limit=x'):
+        assert client.get(f'/api/executions/{execution_id}/log?{query}').status_code == 400, query
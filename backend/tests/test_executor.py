@@ -0,0 +1,126 @@
+import threading
+import time
+
+from app.executor import ExecutionPool
+
+
+class Runs:
+    """Records the runs a pool starts and finishes them on request"""
+
+    def __init__(self):
+        self.started = []
+        self._done = {}
+        self._condition = threading.Condition()
+
+    def __call__(self, job_id, done):
+        with self._condition:
+            self.started.append(job_id)
+            self._done[job_id] = done
+            self._condition.notify_all()
+
+    def wait_for(self, count, timeout=5):
+        """Wait until `count` runs were started and return their job ids"""
+        with self._condition:
+            assert self._condition.wait_for(lambda: len(self.started) >= count, timeout), self.started
+            return list(self.started)
+
+    def finish(self, job_id):
+        with self._condition:
+            done = self._done.pop(job_id)
+        done()
+
+
+def settle():
+    """Give the dispatcher threads a moment to pick up runs"""
+    time.sleep(0.1)
+
+
+def test_waiting_runs_start_by_priority_then_submission_order():
+    pool = ExecutionPool(max_running=1, threads=2)
+    runs = Runs()
+    pool.submit('blocker', runs)
+    runs.wait_for(1)
+
+    for job_id, priority in [('low', 'low'), ('normal 1', 'normal'), ('high', 'high'), ('normal 2', 'normal')]:
+        pool.submit(job_id, runs, priority)
+    assert pool.stats()['queued_by_priority'] == {'high': 1, 'normal': 2, 'low': 1}
+
+    for finished, count in [('blocker', 2), ('high', 3), ('normal 1', 4), ('normal 2', 5)]:
+        runs.finish(finished)
+        runs.wait_for(count)
+    assert runs.started == ['blocker', 'high', 'normal 1', 'normal 2', 'low']
+
+
+def test_runs_are_limited_to_max_running():
+    pool = ExecutionPool(max_running=2, threads=4)
+    runs = Runs()
+    for job_id in 'abcd':
+        pool.submit(job_id, runs)
+
+    assert sorted(runs.wait_for(2)) == ['a', 'b']
+    settle()
+    assert len(runs.started) == 2
+    assert pool.stats()['running'] == 2
+    assert pool.stats()['queued'] == 2
+
+    runs.finish('a')
+    assert runs.wait_for(3)[2] == 'c'
+
+
+def test_waiting_job_is_coalesced():
+    pool = ExecutionPool(max_running=1, threads=1)
+    runs = Runs()
+    pool.submit('blocker', runs)
+    runs.wait_for(1)
+
+    assert pool.submit('job', runs) is True
+    assert pool.submit('job', runs) is False
+    assert pool.stats()['coalesced'] == 1
+
+    runs.finish('blocker')
+    runs.wait_for(2)
+    runs.finish('job')
+    settle()
+    assert runs.started == ['blocker', 'job']
+
+
+def test_job_never_runs_twice_at_once():
+    pool = ExecutionPool(max_running=4, threads=2)
+    runs = Runs()
+    pool.submit('job', runs)
+    runs.wait_for(1)
+
+    # The second run is held back while other jobs go ahead
+    pool.submit('job', runs)
+    pool.submit('other', runs)
+    assert runs.wait_for(2) == ['job', 'other']
+    settle()
+    assert pool.stats()['held'] == 1
+
+    runs.finish('job')
+    assert runs.wait_for(3) == ['job', 'other', 'job']
+
+
+def test_on_queued_is_called_only_when_waiting_for_a_slot():
+    pool = ExecutionPool(max_running=1, threads=1)
+    runs = Runs()
+    queued = []
+    pool.submit('blocker', runs, on_queued=queued.append)
+    runs.wait_for(1)
+
+    pool.submit('job', runs, on_queued=queued.append)
+
+    assert queued == ['job']
+
+
+def test_failing_run_frees_its_slot():
+    pool = ExecutionPool(max_running=1, threads=1)
+    runs = Runs()
+
+    def fail(job_id, done):
+        raise RuntimeError("failed to start")
+    pool.submit('broken', fail)
+    pool.submit('job', runs)
+
+    assert runs.wait_for(1) == ['job']
+    assert pool.stats()['completed'] == 1
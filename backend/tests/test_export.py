@@ -0,0 +1,95 @@
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+
+from app.database import EXPORT_COLUMNS
+
+
+def add_finished_runs(database, job_id, count):
+    ids = []
+    for index in range(count):
+        execution = database.start_execution(job_id)
+        database.finish_execution(execution['id'], 'success', exit_code=0, duration=index, log_size=index * 10)
+        ids.append(execution['id'])
+    return ids
+
+
+def test_history_is_read_in_batches_oldest_first(database):
+    database.add_job('a', 'job a', 'true', '0 * * * *')
+    ids = add_finished_runs(database, 'a', 5)
+
+    batches = list(database.iter_execution_batches(batch_size=2))
+
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    assert [execution['id'] for batch in batches for execution in batch] == ids
+    assert set(batches[0][0]) == set(EXPORT_COLUMNS)
+
+
+def test_runs_added_during_the_export_are_included(database):
+    database.add_job('a', 'job a', 'true', '0 * * * *')
+    add_finished_runs(database, 'a', 2)
+
+    batches = database.iter_execution_batches(batch_size=2)
+    first = next(batches)
+    added = add_finished_runs(database, 'a', 1)
+
+    assert [execution['id'] for execution in next(batches)] == added
+    assert len(first) == 2
+
+
+def test_history_filters_and_optional_columns(database):
+    database.add_job('a', 'job a', 'true', '0 * * * *')
+    database.add_job('b', 'job b', 'true', '0 * * * *')
+    add_finished_runs(database, 'a', 2)
+    add_finished_runs(database, 'b', 1)
+
+    executions = [execution for batch in database.iter_execution_batches(
+        job_id='b', include_job=True, include_log_size=True) for execution in batch]
+    assert [(execution['job_id'], execution['job_name'], execution['log_size']) for execution in executions] == [
+        ('b', 'job b', 0)
+    ]
+
+    assert list(database.iter_execution_batches(since=datetime.now() + timedelta(minutes=1))) == []
+
+
+def test_ndjson_export(client, make_job, add_runs):
+    job_id = make_job('export ndjson')
+    ids = add_runs(job_id, ('success', 0, 1.5, 'ok\n'), ('failed', 2, 0.5, 'broken\n'))
+
+    response = client.get(f'/api/executions/export?job_id={job_id}&include=job_name,log_size')
+
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    assert 'executions.ndjson' in response.headers['Content-Disposition']
+    rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [(row['id'], row['state'], row['exit_code'], row['job_name'], row['log_size']) for row in rows] == [
+        (ids[0], 'success', 0, 'export ndjson', 3),
+        (ids[1], 'failed', 2, 'export ndjson', 7)
+    ]
+
+
+def test_csv_export(client, make_job, add_runs):
+    job_id = make_job('export csv')
+    ids = add_runs(job_id, ('success', 0, 1.5, 'ok\n'))
+
+    response = client.get(f'/api/executions/export?format=csv&job_id={job_id}&include=job_name')
+
+    assert response.mimetype == 'text/csv'
+    reader = csv.DictReader(io.StringIO(response.get_data(as_text=True)))
+    assert reader.fieldnames == list(EXPORT_COLUMNS) + ['job_name']
+    rows = list(reader)
+    assert [(row['id'], row['state'], row['duration'], row['job_name']) for row in rows] == [
+        (str(ids[0]), 'success', '1.5', 'export csv')
+    ]
+
+
+def test_empty_csv_export_has_a_header(client):
+    response = client.get('/api/executions/export?format=csv&job_id=missing')
+
+    assert response.get_data(as_text=True).splitlines() == [','.join(EXPORT_COLUMNS)]
+
+
+def test_export_rejects_bad_parameters(client):
+    for query in ('format=xml', 'since=yesterday', 'include=command'):
+        assert client.get(f'/api/executions/export?{query}').status_code == 400
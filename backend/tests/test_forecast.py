@@ -0,0 +1,83 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from apscheduler.triggers.cron import CronTrigger
+
+from app.forecast import forecast_load
+
+START = datetime(2026, 1, 1, tzinfo=timezone.utc)
+HOUR = 3600
+
+
+def cron(expression):
+    return CronTrigger.from_crontab(expression, timezone='UTC')
+
+
+def forecast(groups, hours, bucket_seconds=HOUR):
+    return forecast_load(groups, START, START + timedelta(hours=hours), bucket_seconds)
+
+
+def test_runs_are_counted_per_bucket_for_every_job_of_a_schedule():
+    result = forecast([(cron('0 * * * *'), [600, None]), (cron('0 */2 * * *'), [None])], hours=3)
+
+    assert [bucket['runs'] for bucket in result['buckets']] == [3, 2, 3]
+    assert [bucket['busy_seconds'] for bucket in result['buckets']] == [600, 600, 600]
+    assert result['buckets'][0]['start'] == START.isoformat()
+    assert (result['jobs'], result['schedules'], result['jobs_without_history']) == (3, 2, 2)
+    assert result['total_runs'] == 8
+    assert result['peak_runs']['runs'] == 3
+
+
+def test_long_runs_are_spread_over_the_buckets_they_overlap():
+    # Every run takes two and a half buckets
+    result = forecast([(cron('0 * * * *'), [2.5 * HOUR])], hours=4)
+
+    assert [bucket['concurrency'] for bucket in result['buckets']] == [1, 2, 2.5, 2.5]
+    assert result['peak_concurrency']['start'] == (START + timedelta(hours=2)).isoformat()
+
+
+def test_runs_starting_within_a_bucket_fill_its_remainder_first():
+    result = forecast([(cron('30 * * * *'), [2400])], hours=2)
+
+    assert [bucket['busy_seconds'] for bucket in result['buckets']] == [1800, 600 + 1800]
+
+
+def test_partial_last_bucket():
+    result = forecast([(cron('*/30 * * * *'), [None])], hours=1.5)
+
+    assert [bucket['runs'] for bucket in result['buckets']] == [2, 1]
+
+
+@pytest.mark.parametrize('hours, bucket_seconds, message', [
+    (0, HOUR, 'to must be after from'),
+    (8 * 24, HOUR, 'at most 7 days'),
+    (1, 30, 'at least 60 seconds'),
+    (7 * 24, 60, 'at most 10000 buckets'),
+])
+def test_out_of_range_windows_are_rejected(hours, bucket_seconds, message):
+    with pytest.raises(ValueError, match=message):
+        forecast([], hours, bucket_seconds)
+
+
+def test_forecast_api(client, make_job):
+    make_job('forecast job', schedule='0 12 * * *')
+    start = datetime(2026, 1, 1, 0, 0).astimezone()
+
+    response = client.get('/api/schedule/forecast', query_string={
+        'from': start.isoformat(),
+        'to': (start + timedelta(days=1)).isoformat(),
+        'bucket': '1h'
+    })
+
+    assert response.status_code == 200
+    assert len(response.json['buckets']) == 24
+    assert response.json['buckets'][12]['runs'] >= 1
+
+
+@pytest.mark.parametrize('query', [
+    {'from': 'yesterday'},
+    {'bucket': 'soon'},
+    {'bucket': '10s'},
+])
+def test_forecast_api_rejects_bad_parameters(client, query):
+    assert client.get('/api/schedule/forecast', query_string=query).status_code == 400
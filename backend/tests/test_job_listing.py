@@ -0,0 +1,46 @@
+from sqlalchemy import event
+
+
+def add_jobs(database, count, prefix='job'):
+    ids = [f'{prefix}-{index}' for index in range(count)]
+    for job_id in ids:
+        database.add_job(job_id, job_id, 'true', '0 0 1 1 *')
+    return ids
+
+
+def count_queries(database, fn):
+    statements = []
+
+    def before_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(database.engine, 'before_cursor_execute', before_execute)
+    try:
+        fn()
+    finally:
+        event.remove(database.engine, 'before_cursor_execute', before_execute)
+    return len(statements)
+
+
+def test_jobs_carry_dependency_counts_and_parents(database):
+    extract, transform, load = add_jobs(database, 3)
+    database.add_job_dependency(extract, load)
+    database.add_job_dependency(transform, load)
+
+    jobs = {job['id']: job for job in database.get_jobs()}
+    assert (jobs[extract]['parent_count'], jobs[extract]['child_count']) == (0, 1)
+    assert (jobs[load]['parent_count'], jobs[load]['child_count']) == (2, 0)
+    assert [parent['name'] for parent in jobs[load]['parent_jobs']] == [extract, transform]
+    assert jobs[extract]['parent_jobs'] is None
+    assert database.get_job(load)['parent_count'] == 2
+
+
+def test_listing_takes_the_same_queries_for_any_number_of_jobs(database):
+    ids = add_jobs(database, 3, 'few')
+    database.add_job_dependency(ids[0], ids[1])
+    few = count_queries(database, database.get_jobs)
+
+    ids = add_jobs(database, 50, 'many')
+    for parent, child in zip(ids, ids[1:]):
+        database.add_job_dependency(parent, child)
+    assert count_queries(database, database.get_jobs) == few
@@ -0,0 +1,77 @@
+import pytest
+
+from app.depgraph import DependencyGraph
+from app.jobcache import JobCache
+
+
+@pytest.fixture
+def cache(database):
+    database.add_job('a', 'job a', 'true', '0 * * * *')
+    database.add_job('b', 'job b', 'true', '0 * * * *')
+    return JobCache(database, DependencyGraph(database.get_all_dependencies))
+
+
+def test_jobs_are_loaded_once_and_then_served_from_memory(cache, monkeypatch):
+    assert cache.get('a')['name'] == 'job a'
+
+    def fail(*args):
+        raise AssertionError("The database was read")
+    monkeypatch.setattr(cache.db, 'get_jobs', fail)
+    monkeypatch.setattr(cache.db, 'get_job', fail)
+
+    assert cache.get('b')['name'] == 'job b'
+    assert sorted(job['id'] for job in cache.get_all()) == ['a', 'b']
+    assert cache.stats()['loads'] == 1
+    assert cache.stats()['hits'] == 2
+
+
+def test_returned_jobs_are_copies(cache):
+    cache.get('a')['name'] = 'changed'
+
+    assert cache.get('a')['name'] == 'job a'
+
+
+def test_writes_are_read_after_invalidation(cache):
+    cache.get('a')
+    cache.db.update_job('a', {'command': 'false'})
+    cache.invalidate()
+
+    assert cache.get('a')['command'] == 'false'
+    assert cache.stats()['loads'] == 2
+
+
+def test_job_added_elsewhere_is_read_through(cache):
+    cache.get('a')
+    cache.db.add_job('c', 'job c', 'true', '0 * * * *')
+
+    assert cache.get('c')['name'] == 'job c'
+    # The next read reloads all jobs, including the new one
+    assert cache.stats()['loaded'] is False
+    assert cache.get('c')['name'] == 'job c'
+    assert cache.stats()['loads'] == 2
+
+
+def test_missing_job_is_a_miss(cache):
+    cache.get('a')
+
+    assert cache.get('missing') is None
+    assert cache.stats()['misses'] == 2
+
+
+def test_dependents_skip_paused_jobs(cache):
+    cache.db.add_job('c', 'job c', 'true', '0 * * * *')
+    cache.db.add_job_dependency('a', 'b')
+    cache.db.add_job_dependency('a', 'c')
+    cache.db.update_job('c', {'is_paused': True})
+
+    assert [job['id'] for job in cache.get_dependent_jobs('a')] == ['b']
+    assert cache.get_active_parent_ids('b') == ['a']
+
+
+def test_api_reads_see_updates(client, make_job):
+    job_id = make_job('cached job')
+    assert client.get(f'/api/jobs/{job_id}').json['command'] == 'true'
+
+    assert client.patch(f'/api/jobs/{job_id}', json={'command': 'echo updated'}).status_code == 200
+
+    assert client.get(f'/api/jobs/{job_id}').json['command'] == 'echo updated'
@@ -0,0 +1,51 @@
+import os
+import time
+
+from app.leader import LeaderLock
+
+
+def wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.02)
+
+
+def test_only_one_process_leads(tmp_path):
+    path = str(tmp_path / 'leader.lock')
+    elected = []
+    first, second = LeaderLock(path, retry_interval=0.05), LeaderLock(path, retry_interval=0.05)
+
+    first.start(lambda: elected.append('first'))
+    second.start(lambda: elected.append('second'))
+    time.sleep(0.2)
+
+    assert elected == ['first']
+    assert (first.is_leader, second.is_leader) == (True, False)
+    assert second.stats()['leader_pid'] == os.getpid()
+
+
+def test_follower_takes_over_when_the_leader_exits(tmp_path):
+    path = str(tmp_path / 'leader.lock')
+    elected = []
+    first, second = LeaderLock(path, retry_interval=0.05), LeaderLock(path, retry_interval=0.05)
+    first.start(lambda: elected.append('first'))
+    second.start(lambda: elected.append('second'))
+
+    # The OS releases the lock when the leader's file is closed
+    first._file.close()
+
+    wait_until(lambda: second.is_leader)
+    assert elected == ['first', 'second']
+
+
+def test_failing_election_callback_keeps_the_lock(tmp_path):
+    path = str(tmp_path / 'leader.lock')
+    lock = LeaderLock(path)
+
+    def fail():
+        raise RuntimeError("scheduler failed to start")
+    lock.start(fail)
+
+    assert lock.is_leader
+    assert lock.stats()['elected_at'] is not None
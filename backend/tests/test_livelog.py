@@ -0,0 +1,83 @@
+from app.livelog import LiveLog, LiveLogRegistry
+
+
+def fill(live_log, count):
+    for i in range(1, count + 1):
+        live_log.append(f'line {i}')
+
+
+def test_lines_are_numbered_from_one():
+    live_log = LiveLog(execution_id=7)
+
+    assert live_log.append('first') == 1
+    assert live_log.append('second') == 2
+    assert live_log.since() == {
+        'execution_id': 7,
+        'lines': ['first', 'second'],
+        'first_seq': 1,
+        'last_seq': 2,
+        'skipped': 0
+    }
+
+
+def test_since_returns_only_missed_lines():
+    live_log = LiveLog()
+    fill(live_log, 5)
+
+    result = live_log.since(3)
+    assert result['lines'] == ['line 4', 'line 5']
+    assert result['first_seq'] == 4
+    assert result['skipped'] == 0
+
+    assert live_log.since(5)['lines'] == []
+
+
+def test_dropped_lines_are_reported_as_skipped():
+    live_log = LiveLog(max_lines=3)
+    fill(live_log, 10)
+
+    result = live_log.since(2)
+    assert result['lines'] == ['line 8', 'line 9', 'line 10']
+    assert result['first_seq'] == 8
+    assert result['skipped'] == 5
+
+
+def test_buffer_is_bounded_in_utf8_bytes():
+    live_log = LiveLog(max_bytes=10)
+    live_log.append('aaaa')
+    live_log.append('éé')
+    live_log.append('bbbb')
+
+    # 'éé' is four bytes, so only the last two lines fit in ten bytes
+    result = live_log.since()
+    assert result['lines'] == ['éé', 'bbbb']
+    assert result['skipped'] == 1
+
+
+def test_new_run_starts_a_fresh_buffer():
+    registry = LiveLogRegistry()
+    fill(registry.start('job', execution_id=1), 3)
+
+    live_log = registry.start('job', execution_id=2)
+    assert registry.get('job') is live_log
+    assert live_log.since() == {'execution_id': 2, 'lines': [], 'first_seq': 1, 'last_seq': 0, 'skipped': 0}
+
+
+def test_finished_buffers_are_freed_after_the_grace_period():
+    registry = LiveLogRegistry(grace_period=60)
+    registry.start('running')
+    registry.start('finished').finish()
+    registry.get('finished').finished_at -= 61
+
+    assert registry.purge_expired() == 1
+    assert registry.get('finished') is None
+    assert registry.get('running') is not None
+
+
+def test_finished_buffers_are_kept_during_the_grace_period():
+    registry = LiveLogRegistry(grace_period=60)
+    registry.start('job')
+    registry.finish('job')
+
+    assert registry.purge_expired() == 0
+    assert registry.get('job') is not None
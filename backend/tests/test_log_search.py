@@ -0,0 +1,38 @@
+def test_search_finds_matching_lines(client, make_job, add_runs):
+    job_id = make_job('search-job')
+    first, second, _ = add_runs(
+        job_id,
+        ('failed', 1, 0.1, 'starting\nconnection refused by zebrahost\ndone\n'),
+        ('success', 0, 0.1, 'starting\nretrying zebrahost\nconnection refused by zebrahost again\n'),
+        ('success', 0, 0.1, 'nothing to see\n'),
+    )
+
+    response = client.get('/api/search/logs?q=refused by zebrahost')
+    assert response.status_code == 200
+    results = response.json
+    assert [result['execution_id'] for result in results] == [second, first]
+    assert results[0]['job_name'] == 'search-job'
+    assert results[1]['lines'] == ['connection refused by zebrahost']
+
+
+def test_search_by_job_and_limit(client, make_job, add_runs):
+    one = make_job('search-one')
+    other = make_job('search-other')
+    add_runs(one, ('success', 0, 0.1, 'quokka sighting\n'), ('success', 0, 0.1, 'quokka again\n'))
+    add_runs(other, ('success', 0, 0.1, 'quokka elsewhere\n'))
+
+    assert {result['job_id'] for result in client.get(f'/api/search/logs?q=quokka&job_id={one}').json} == {one}
+    assert len(client.get('/api/search/logs?q=quokka&limit=1').json) == 1
+
+
+def test_phrases_are_matched_literally(client, make_job, add_runs):
+    add_runs(make_job('search-syntax'), ('success', 0, 0.1, 'error: "disk" OR NOT full\n'))
+
+    response = client.get('/api/search/logs?q="disk" OR NOT')
+    assert response.status_code == 200
+    assert len(response.json) == 1
+
+
+def test_search_needs_a_query(client):
+    assert client.get('/api/search/logs?q=').status_code == 400
+    assert client.get('/api/search/logs?q=x&limit=0').status_code == 400
@@ -0,0 +1,63 @@
+from app.logfiles import LogWriter
+
+
+def write_log(path, chunks, max_bytes=0):
+    """Write chunks through a LogWriter and return the file contents and size"""
+    writer = LogWriter(str(path), max_bytes=max_bytes)
+    for chunk in chunks:
+        writer.write(chunk)
+    size = writer.close()
+    return path.read_bytes(), size
+
+
+def test_output_is_written_as_it_arrives(tmp_path):
+    path = tmp_path / 'run.log'
+    writer = LogWriter(str(path))
+    writer.write('first line\n')
+    writer.flush()
+
+    assert path.read_bytes() == b'first line\n'
+    writer.write('second line\n')
+    assert writer.close() == len(b'first line\nsecond line\n')
+    assert path.read_bytes() == b'first line\nsecond line\n'
+
+
+def test_unlimited_log_keeps_everything(tmp_path):
+    chunks = [f'line {i}\n' for i in range(1000)]
+
+    data, size = write_log(tmp_path / 'run.log', chunks)
+
+    assert data == ''.join(chunks).encode()
+    assert size == len(data)
+
+
+def test_log_under_the_limit_is_not_truncated(tmp_path):
+    data, size = write_log(tmp_path / 'run.log', ['abc\n', 'def\n'], max_bytes=100)
+
+    assert data == b'abc\ndef\n'
+    assert size == 8
+
+
+def test_log_over_the_limit_keeps_head_and_tail(tmp_path):
+    chunks = [f'{i:03}\n' for i in range(100)]
+
+    data, size = write_log(tmp_path / 'run.log', chunks, max_bytes=40)
+
+    # 20 bytes of head and 20 bytes of tail, with 360 bytes dropped between
+    assert data == b'000\n001\n002\n003\n004\n' \
+        b'\n... 360 bytes truncated ...\n' \
+        b'095\n096\n097\n098\n099\n'
+    assert size == len(data)
+
+
+def test_oversize_chunk_keeps_its_end(tmp_path):
+    data, _ = write_log(tmp_path / 'run.log', ['head', 'x' * 50 + 'END'], max_bytes=10)
+
+    assert data == b'head\n... 48 bytes truncated ...\nxxEND'
+
+
+def test_output_is_encoded_as_utf8(tmp_path):
+    data, size = write_log(tmp_path / 'run.log', ['café\n'])
+
+    assert data.decode('utf-8') == 'café\n'
+    assert size == 6
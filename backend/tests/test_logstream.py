@@ -0,0 +1,89 @@
+import threading
+
+import pytest
+
+from app.logstream import LogStream
+
+
+class FakeSocketIO:
+    """Records emitted frames; every client is in every job's room"""
+
+    def __init__(self):
+        self.sent = []
+        self.callbacks = []
+        self.sids = []
+        self.server = self
+        self.manager = self
+
+    def get_participants(self, namespace, room):
+        return [(sid, None) for sid in self.sids]
+
+    def emit(self, event, data, to=None, callback=None):
+        self.sent.append((to, data))
+        self.callbacks.append(callback)
+
+
+def make_stream(**options):
+    """A stream with one client, with frames of at most 16 bytes"""
+    socketio = FakeSocketIO()
+    stream = LogStream(socketio, interval=3600, max_frame_bytes=16, **options)
+    # Frames are only flushed by the tests
+    stream._wakeup = threading.Event()
+    socketio.sids.append('client')
+    stream.add_client('client')
+    return stream
+
+
+@pytest.fixture
+def stream():
+    return make_stream(max_queued_frames=3, window=2)
+
+
+def frames(stream):
+    return [frame for _, frame in stream.socketio.sent]
+
+
+def test_lines_are_coalesced_into_frames(stream):
+    for seq, line in enumerate(['a\n', 'b\n', 'c\n'], start=1):
+        stream.add_line('job', 1, seq, line)
+    stream.flush()
+
+    frame, = frames(stream)
+    assert frame['lines'] == ['a\n', 'b\n', 'c\n']
+    assert (frame['id'], frame['execution_id'], frame['first_seq'], frame['last_seq']) == ('job', 1, 1, 3)
+    assert frame['skipped'] == 0
+
+
+def test_frames_stay_within_the_byte_limit():
+    stream = make_stream()
+    lines = ['ééééé\n', 'ü' * 20 + '\n', 'plain\n', '€' * 4 + '\n']
+    for seq, line in enumerate(lines, start=1):
+        stream.add_line('job', 1, seq, line)
+    stream.flush()
+    while stream.socketio.callbacks:
+        stream.socketio.callbacks.pop(0)()
+        stream.flush()
+
+    sent = frames(stream)
+    assert all(sum(len(line.encode()) for line in frame['lines']) <= 16 for frame in sent)
+    assert ''.join(line for frame in sent for line in frame['lines']) == ''.join(lines)
+
+
+def test_slow_clients_skip_the_oldest_frames(stream):
+    # Lines of 16 bytes fill a frame each
+    for seq in range(1, 3):
+        stream.add_line('job', 1, seq, f'{seq:015d}\n')
+    stream.flush()
+    assert [frame['first_seq'] for frame in frames(stream)] == [1, 2]
+
+    # The window is full, and only the last three frames are kept
+    for seq in range(3, 8):
+        stream.add_line('job', 1, seq, f'{seq:015d}\n')
+    stream.flush()
+    assert len(frames(stream)) == 2
+    assert stream.stats()['client'] == {'queued_frames': 3, 'in_flight': 2, 'skipped_lines': 2}
+
+    stream.socketio.callbacks[0]()
+    stream.flush()
+    frame = frames(stream)[-1]
+    assert (frame['first_seq'], frame['skipped']) == (5, 2)
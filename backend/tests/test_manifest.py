@@ -0,0 +1,155 @@
+import json
+
+import pytest
+
+from app.manifest import diff_manifest, parse_manifest
+
+
+def post_manifest(client, manifest, **params):
+    query = '&'.join(f'{key}={value}' for key, value in params.items())
+    return client.post(f'/api/manifest?{query}', data=json.dumps(manifest), content_type='application/json')
+
+
+def test_export_then_import_is_a_no_op(client):
+    manifest = {'jobs': [
+        {'name': 'rt-extract', 'command': 'true', 'schedule': '0 3 * * *', 'priority': 'high'},
+        {'name': 'rt-load', 'command': 'true', 'depends_on': ['rt-extract']},
+    ]}
+    response = post_manifest(client, manifest)
+    assert response.status_code == 200, response.json
+    assert sorted(response.json['created']) == ['rt-extract', 'rt-load']
+
+    exported = client.get('/api/manifest').json
+    loaded = next(job for job in exported['jobs'] if job['name'] == 'rt-load')
+    assert 'schedule' not in loaded
+
+    response = post_manifest(client, exported, prune='true')
+    assert response.status_code == 200, response.json
+    summary = response.json
+    assert (summary['created'], summary['updated'], summary['deleted']) == ([], {}, [])
+    assert (summary['dependencies_added'], summary['dependencies_removed']) == ([], [])
+    assert summary['unchanged'] == len(exported['jobs'])
+
+
+def test_schedule_may_only_be_left_out_with_depends_on(client):
+    response = post_manifest(client, {'jobs': [{'name': 'rt-orphan', 'command': 'true'}]})
+    assert response.status_code == 400
+    assert 'schedule' in response.json['error']
+
+
+JOBS = [
+    {'id': 'id-a', 'name': 'a', 'command': 'true', 'schedule': '0 * * * *', 'priority': 'normal'},
+    {'id': 'id-b', 'name': 'b', 'command': 'true', 'schedule': None},
+    {'id': 'id-c', 'name': 'c', 'command': 'true', 'schedule': '0 1 * * *'},
+]
+EDGES = [('id-a', 'id-b'), ('id-c', 'id-b')]
+
+
+def test_diff_only_changes_what_differs():
+    manifest = {'jobs': [
+        {'name': 'a', 'command': 'true', 'schedule': '0 * * * *', 'priority': 'high'},
+        {'name': 'b', 'command': 'true', 'depends_on': ['a', 'd']},
+        {'name': 'd', 'command': 'echo new', 'schedule': '0 2 * * *'},
+    ]}
+
+    changes, summary = diff_manifest(manifest, JOBS, EDGES)
+
+    (created,) = changes['create']
+    assert (created['name'], created['command']) == ('d', 'echo new')
+    assert changes['update'] == {'id-a': {'priority': 'high'}}
+    assert changes['delete'] == []
+    assert changes['add_dependencies'] == [(created['id'], 'id-b')]
+    assert changes['remove_dependencies'] == [('id-c', 'id-b')]
+    assert summary == {
+        'created': ['d'],
+        'updated': {'a': ['priority']},
+        'deleted': [],
+        'dependencies_added': [['d', 'b']],
+        'dependencies_removed': [['c', 'b']],
+        'unchanged': 1
+    }
+
+
+def test_prune_deletes_jobs_missing_from_the_manifest():
+    manifest = {'jobs': [{'name': 'a', 'command': 'true', 'schedule': '0 * * * *'}]}
+
+    changes, summary = diff_manifest(manifest, JOBS, EDGES, prune=True)
+
+    assert changes['delete'] == ['id-b', 'id-c']
+    assert summary['deleted'] == ['b', 'c']
+    # The dependencies of deleted jobs go with them
+    assert changes['remove_dependencies'] == []
+
+
+def test_jobs_outside_the_manifest_are_kept_without_prune():
+    manifest = {'jobs': [{'name': 'a', 'command': 'true', 'schedule': '0 * * * *'}]}
+
+    changes, summary = diff_manifest(manifest, JOBS, EDGES)
+
+    assert not any(changes.values())
+    assert summary['unchanged'] == 1
+
+
+def test_missing_parent_is_rejected():
+    manifest = {'jobs': [{'name': 'b', 'command': 'true', 'depends_on': ['missing']}]}
+
+    with pytest.raises(ValueError, match='depends on missing'):
+        diff_manifest(manifest, JOBS, EDGES)
+
+
+@pytest.mark.parametrize('text, message', [
+    ('[]', 'list of jobs'),
+    ('{"jobs": [{"command": "true"}]}', 'has no name'),
+    ('{"jobs": [{"name": "a", "command": "true", "schedule": "* * * * *", "owner": "me"}]}', 'unknown fields'),
+    ('{"jobs": [{"name": "a", "schedule": "* * * * *"}]}', 'needs a command'),
+])
+def test_malformed_manifests_are_rejected(text, message):
+    with pytest.raises(ValueError, match=message):
+        parse_manifest(text)
+
+
+def test_yaml_manifest(client):
+    manifest = 'jobs:\n  - name: yaml-job\n    command: "true"\n    schedule: "0 4 * * *"\n'
+
+    response = client.post('/api/manifest?format=yaml', data=manifest)
+
+    assert response.status_code == 200, response.json
+    assert response.json['created'] == ['yaml-job']
+    assert 'name: yaml-job' in client.get('/api/manifest?format=yaml').get_data(as_text=True)
+
+
+def test_dry_run_changes_nothing(client):
+    response = post_manifest(client, {'jobs': [{'name': 'dry-job', 'command': 'true', 'schedule': '0 5 * * *'}]},
+                             dry_run='true')
+
+    assert response.json['created'] == ['dry-job']
+    assert response.json['dry_run'] is True
+    assert 'dry-job' not in {job['name'] for job in client.get('/api/jobs').json}
+
+
+def test_bulk_changes_are_applied_together(client, make_job):
+    paused, removed = make_job('bulk paused'), make_job('bulk removed')
+
+    response = client.post('/api/jobs/bulk', json={
+        'create': [{'name': 'bulk created', 'command': 'true', 'schedule': '0 6 * * *'}],
+        'update': [{'id': paused, 'command': 'echo updated'}],
+        'pause': [paused],
+        'delete': [removed]
+    })
+
+    assert response.status_code == 200, response.json
+    jobs = {job['name']: job for job in client.get('/api/jobs').json}
+    assert 'bulk created' in jobs and 'bulk removed' not in jobs
+    assert (jobs['bulk paused']['command'], jobs['bulk paused']['is_paused']) == ('echo updated', True)
+
+
+def test_failed_bulk_request_changes_nothing(client, make_job):
+    make_job('bulk taken')
+
+    response = client.post('/api/jobs/bulk', json={'create': [
+        {'name': 'bulk fresh', 'command': 'true', 'schedule': '0 6 * * *'},
+        {'name': 'bulk taken', 'command': 'true', 'schedule': '0 6 * * *'},
+    ]})
+
+    assert response.status_code == 400
+    assert 'bulk fresh' not in {job['name'] for job in client.get('/api/jobs').json}
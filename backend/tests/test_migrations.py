@@ -0,0 +1,79 @@
+import sqlite3
+
+import pytest
+
+import migrate_db
+
+# Schema of databases from before versioned migrations
+LEGACY_SCHEMA = """
+CREATE TABLE jobs (
+    id VARCHAR PRIMARY KEY,
+    name VARCHAR NOT NULL,
+    command VARCHAR NOT NULL,
+    schedule VARCHAR NOT NULL,
+    description TEXT,
+    created_at DATETIME,
+    last_run DATETIME,
+    is_paused BOOLEAN
+);
+CREATE TABLE executions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id VARCHAR NOT NULL REFERENCES jobs(id),
+    timestamp DATETIME,
+    state VARCHAR NOT NULL,
+    exit_code INTEGER,
+    duration FLOAT,
+    log_file VARCHAR
+);
+INSERT INTO jobs VALUES ('a', 'backup', 'true', '* * * * *', '', '2024-01-01 00:00:00', NULL, 0);
+INSERT INTO jobs VALUES ('b', 'backup', 'true', '* * * * *', '', '2024-01-02 00:00:00', NULL, 0);
+INSERT INTO executions (job_id, timestamp, state, exit_code) VALUES ('a', '2024-01-01 01:00:00', 'success', 0);
+"""
+
+
+@pytest.fixture
+def legacy_db(tmp_path, monkeypatch):
+    path = str(tmp_path / 'legacy.db')
+    conn = sqlite3.connect(path)
+    conn.executescript(LEGACY_SCHEMA)
+    conn.close()
+    monkeypatch.setenv('CRONBAT_DB_PATH', path)
+    return path
+
+
+def query(path, sql):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute(sql).fetchall()
+    finally:
+        conn.close()
+
+
+def test_legacy_database_is_brought_to_the_latest_version(legacy_db):
+    migrate_db.migrate_database()
+
+    versions = [row[0] for row in query(legacy_db, "SELECT version FROM schema_version ORDER BY version")]
+    assert versions == [migration[0] for migration in migrate_db.MIGRATIONS]
+
+    indexes = {row[0] for row in query(legacy_db, "SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert {'ix_executions_job_id_timestamp', 'ix_job_dependencies_parent_job_id',
+            'ix_job_dependencies_child_job_id', 'uq_jobs_name'} <= indexes
+
+    # The data is kept, duplicate names are made unique
+    assert query(legacy_db, "SELECT COUNT(*) FROM executions") == [(1,)]
+    assert query(legacy_db, "SELECT name FROM jobs ORDER BY created_at") == [('backup',), ('backup (b)',)]
+    with pytest.raises(sqlite3.IntegrityError):
+        query(legacy_db, "INSERT INTO jobs (id, name, command) VALUES ('c', 'backup', 'true')")
+
+
+def test_migrating_again_changes_nothing(legacy_db):
+    migrate_db.migrate_database()
+    before = query(legacy_db, "SELECT version, applied_at FROM schema_version")
+
+    migrate_db.migrate_database()
+    assert query(legacy_db, "SELECT version, applied_at FROM schema_version") == before
+
+
+def test_duplicate_job_names_are_rejected(database):
+    assert database.add_job('first', 'nightly', 'true', '0 0 * * *') == 'first'
+    assert database.add_job('second', 'nightly', 'true', '0 0 * * *') is None
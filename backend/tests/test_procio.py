@@ -0,0 +1,98 @@
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from app import procio
+from app.procio import LineSplitter, ProcessMonitor
+
+
+def split(*blocks):
+    """Feed blocks to a LineSplitter, the last one as final, and return its lines"""
+    lines = []
+    splitter = LineSplitter(lines.append)
+    for block in blocks[:-1]:
+        splitter.feed(block)
+    splitter.feed(blocks[-1], final=True)
+    return lines
+
+
+def test_lines_are_passed_on_when_complete():
+    lines = []
+    splitter = LineSplitter(lines.append)
+
+    splitter.feed(b'one\ntw')
+    assert lines == ['one\n']
+    splitter.feed(b'o\nthree')
+    assert lines == ['one\n', 'two\n']
+    splitter.feed(b'', final=True)
+    assert lines == ['one\n', 'two\n', 'three']
+
+
+def test_carriage_returns_end_lines():
+    assert split(b'a\r\nb\rc\n', b'') == ['a\n', 'b\n', 'c\n']
+
+
+def test_crlf_split_across_blocks_is_one_line_end():
+    assert split(b'a\r', b'\nb\n', b'') == ['a\n', 'b\n']
+
+
+def test_utf8_split_across_blocks_is_decoded():
+    data = 'café\n'.encode()
+
+    assert split(data[:4], data[4:], b'') == ['café\n']
+
+
+def test_invalid_utf8_is_replaced():
+    assert split(b'\xff\n', b'') == ['�\n']
+
+
+def test_long_line_is_passed_on_in_pieces(monkeypatch):
+    monkeypatch.setattr(procio, 'MAX_LINE_CHARS', 4)
+
+    assert split(b'abcdef', b'gh\n', b'') == ['abcdef', 'gh\n']
+
+
+@pytest.fixture(scope='module')
+def monitor():
+    return ProcessMonitor()
+
+
+def watch(monitor, code):
+    """Run Python code under the monitor and return its output lines and exit code"""
+    lines = []
+    exited = threading.Event()
+    result = {}
+
+    def on_exit(exit_code):
+        result['exit_code'] = exit_code
+        exited.set()
+
+    process = subprocess.Popen([sys.executable, '-c', code], stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+    monitor.watch(process, lines.append, on_exit)
+    assert exited.wait(10)
+    return lines, result['exit_code']
+
+
+def test_output_and_exit_code_are_reported(monitor):
+    lines, exit_code = watch(monitor, 'import sys; print("hello"); print("world", end=""); sys.exit(3)')
+
+    assert lines == ['hello\n', 'world']
+    assert exit_code == 3
+
+
+def test_many_processes_are_read_at_once(monitor):
+    results = [None] * 5
+
+    def run(index):
+        results[index] = watch(monitor, f'for i in range(1000): print({index}, i)')
+    threads = [threading.Thread(target=run, args=(index,)) for index in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for index, (lines, exit_code) in enumerate(results):
+        assert lines == [f'{index} {i}\n' for i in range(1000)]
+        assert exit_code == 0
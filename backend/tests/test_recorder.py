@@ -0,0 +1,69 @@
+from app.recorder import ExecutionRecorder
+
+
+class FakeDatabase:
+    """Records finish_executions calls, failing the first `failures` of them
+    and always failing batches with an execution id in `bad`"""
+
+    def __init__(self, failures=0, bad=()):
+        self.failures = failures
+        self.bad = set(bad)
+        self.calls = []
+        self.recorded = []
+
+    def finish_executions(self, results):
+        self.calls.append([result['execution_id'] for result in results])
+        if self.failures:
+            self.failures -= 1
+            return False
+        if any(result['execution_id'] in self.bad for result in results):
+            return False
+        self.recorded.extend(result['execution_id'] for result in results)
+        return True
+
+
+def record_all(recorder, ids):
+    for execution_id in ids:
+        recorder.record(execution_id, 'success', exit_code=0, duration=0.1, log_size=10)
+    recorder.stop()
+
+
+def test_results_are_written_in_batches():
+    fake = FakeDatabase()
+    recorder = ExecutionRecorder(fake, batch_size=10)
+    record_all(recorder, range(25))
+
+    assert sorted(fake.recorded) == list(range(25))
+    assert all(len(call) <= 10 for call in fake.calls)
+    stats = recorder.stats()
+    assert (stats['records'], stats['failed_records']) == (25, 0)
+
+
+def test_failed_batches_are_retried():
+    fake = FakeDatabase(failures=2)
+    recorder = ExecutionRecorder(fake, retry_delay=0.001)
+    record_all(recorder, [1, 2])
+
+    assert fake.recorded == [1, 2]
+    assert recorder.stats()['failed_records'] == 0
+
+
+def test_one_bad_result_does_not_lose_the_others():
+    fake = FakeDatabase(bad=[2])
+    recorder = ExecutionRecorder(fake, retries=1, retry_delay=0.001)
+    record_all(recorder, [1, 2, 3])
+
+    assert fake.recorded == [1, 3]
+    stats = recorder.stats()
+    assert (stats['records'], stats['failed_records']) == (2, 1)
+
+
+def test_results_reach_the_database(database):
+    database.add_job('job', 'job', 'true', '0 0 1 1 *')
+    execution = database.start_execution('job')
+    recorder = ExecutionRecorder(database)
+    recorder.record(execution['id'], 'failed', exit_code=3, duration=1.5, log_size=0)
+    recorder.stop()
+
+    stored = database.get_execution(execution['id'])
+    assert (stored['state'], stored['exit_code'], stored['duration']) == ('failed', 3, 1.5)
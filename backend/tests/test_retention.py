@@ -0,0 +1,78 @@
+import os
+
+from sqlalchemy import text
+
+from app.database import Database
+
+
+def add_runs(database, job_id, count, log_size=10):
+    """Record finished runs of a job with log files; returns their ids, oldest first"""
+    ids = []
+    for _ in range(count):
+        execution = database.start_execution(job_id)
+        with open(execution['log_file'], 'w') as f:
+            f.write('x' * log_size)
+        database.finish_execution(execution['id'], 'success', exit_code=0, duration=0.1, log_size=log_size)
+        ids.append(execution['id'])
+    return ids
+
+
+def remaining(database, job_id):
+    return sorted(execution['id'] for execution in database.get_job_executions(job_id))
+
+
+def test_sweep_keeps_the_latest_runs_per_job(tmp_path):
+    database = Database(db_path=str(tmp_path / 'cronbat.db'), logs_path=str(tmp_path / 'logs'),
+                        max_executions_per_job=3)
+    database.add_job('a', 'a', 'true', '0 0 1 1 *')
+    database.add_job('b', 'b', 'true', '0 0 1 1 *', max_executions=1)
+    a_runs = add_runs(database, 'a', 5)
+    b_runs = add_runs(database, 'b', 2)
+    log_files = [database.get_execution(execution_id)['log_file'] for execution_id in a_runs]
+
+    assert database.cleanup_old_executions() == 3
+
+    assert remaining(database, 'a') == a_runs[2:]
+    assert remaining(database, 'b') == b_runs[1:]
+    assert [os.path.exists(log_file) for log_file in log_files] == [False, False, True, True, True]
+
+
+def test_sweep_applies_age_and_log_size_limits(database):
+    database.add_job('old', 'old', 'true', '0 0 1 1 *', retention_days=7)
+    database.add_job('big', 'big', 'true', '0 0 1 1 *', max_log_mb=1)
+    old_runs = add_runs(database, 'old', 2)
+    big_runs = add_runs(database, 'big', 3, log_size=400 * 1024)
+
+    session = database.Session()
+    session.execute(text("UPDATE executions SET timestamp = datetime('now', '-30 days') WHERE id = :id"),
+                    {'id': old_runs[0]})
+    session.commit()
+    session.close()
+
+    database.cleanup_old_executions()
+
+    assert remaining(database, 'old') == old_runs[1:]
+    # The two latest logs fit in 1 MB, a third one doesn't
+    assert remaining(database, 'big') == big_runs[1:]
+
+
+def test_running_executions_are_kept(database):
+    database.add_job('job', 'job', 'true', '0 0 1 1 *', max_executions=1)
+    finished = add_runs(database, 'job', 2)
+    running = database.start_execution('job')['id']
+
+    database.cleanup_old_executions()
+
+    assert remaining(database, 'job') == [finished[1], running]
+
+
+def test_retention_fields_are_validated(client):
+    job = {'name': 'retention-check', 'command': 'true', 'schedule': '0 0 1 1 *'}
+    for field, value in (('max_executions', -1), ('retention_days', 1.5), ('max_log_mb', 'ten'),
+                         ('max_output_mb', True)):
+        response = client.post('/api/jobs', json=dict(job, **{field: value}))
+        assert response.status_code == 400, field
+        assert field in response.json['error']
+
+    response = client.post('/api/jobs', json=dict(job, max_executions=5, max_log_mb=0.5, retention_days=None))
+    assert response.status_code == 201
@@ -0,0 +1,80 @@
+import pytest
+
+from app import socketio
+
+
+@pytest.fixture
+def connect(app):
+    """Connect a Socket.IO test client, disconnecting it after the test"""
+    clients = []
+
+    def connect():
+        client = socketio.test_client(app)
+        client.get_received()
+        clients.append(client)
+        return client
+    yield connect
+    for client in clients:
+        if client.is_connected():
+            client.disconnect()
+
+
+def event_names(client):
+    return [event['name'] for event in client.get_received()]
+
+
+def test_job_events_go_only_to_subscribed_clients(connect, make_job):
+    from app.scheduler import emit_job_event
+
+    job_id = make_job('rooms viewed job')
+    viewer, dashboard, idle = connect(), connect(), connect()
+    viewer.emit('subscribe_to_job', {'id': job_id})
+    dashboard.emit('subscribe_dashboard')
+    assert 'job_details' in event_names(viewer)
+
+    emit_job_event('job_completed', {'id': job_id})
+
+    assert event_names(viewer) == ['job_completed']
+    assert event_names(dashboard) == []
+    assert event_names(idle) == []
+
+
+def test_dashboard_events_are_received_once(connect, make_job):
+    from app.scheduler import emit_job_event
+
+    job_id = make_job('rooms dashboard job')
+    both, dashboard = connect(), connect()
+    both.emit('subscribe_dashboard')
+    both.emit('subscribe_to_job', {'id': job_id})
+    dashboard.emit('subscribe_dashboard')
+    both.get_received()
+
+    emit_job_event('job_state_changed', {'id': job_id, 'state': 'running'}, dashboard=True)
+
+    assert event_names(both) == ['job_state_changed']
+    assert event_names(dashboard) == ['job_state_changed']
+
+
+def test_unsubscribed_clients_stop_receiving_job_events(connect, make_job):
+    from app.scheduler import emit_job_event
+
+    job_id = make_job('rooms left job')
+    viewer = connect()
+    viewer.emit('subscribe_to_job', {'id': job_id})
+    viewer.emit('unsubscribe_from_job', {'id': job_id})
+    viewer.get_received()
+
+    emit_job_event('job_completed', {'id': job_id})
+
+    assert event_names(viewer) == []
+
+
+def test_unknown_jobs_cannot_be_subscribed_to(connect):
+    from app.scheduler import emit_job_event
+
+    viewer = connect()
+    viewer.emit('subscribe_to_job', {'id': 'no-such-job'})
+
+    emit_job_event('job_completed', {'id': 'no-such-job'})
+
+    assert event_names(viewer) == []
@@ -0,0 +1,66 @@
+MAINTENANCE_JOBS = ('__live_log_sweep__', '__remote_sync__', '__job_sync__', '__retention_sweep__')
+
+
+def test_election_keeps_maintenance_jobs(app):
+    from app import scheduler
+
+    scheduler.start_scheduling()
+
+    for job_id in MAINTENANCE_JOBS:
+        assert scheduler.scheduler.get_job(job_id) is not None, job_id
+
+
+def test_own_job_writes_are_not_synced_again(client):
+    from app import scheduler
+
+    job_id = client.post('/api/jobs', json={'name': 'sync-own', 'command': 'true', 'schedule': '0 0 1 1 *'}).json['job_id']
+    scheduler.job_cache.get(job_id)
+    loads = scheduler.job_cache.stats()['loads']
+
+    scheduler.sync_job_changes()
+
+    scheduler.job_cache.get(job_id)
+    assert scheduler.job_cache.stats()['loads'] == loads
+
+
+def test_job_writes_of_other_processes_are_synced(client):
+    from app import db, scheduler
+    from app.database import Database
+
+    client.post('/api/jobs', json={'name': 'sync-local', 'command': 'true', 'schedule': '0 0 1 1 *'})
+    other = Database(db_path=db.db_path, logs_path=db.logs_path)
+    other.add_job('sync-remote-id', 'sync-remote', 'true', '0 0 1 1 *')
+
+    scheduler.sync_job_changes()
+
+    assert scheduler.job_cache.get('sync-remote-id')['name'] == 'sync-remote'
+    assert 'sync-remote-id' in scheduler.scheduled_jobs
+
+
+def test_startup_shares_triggers_between_jobs_with_a_schedule(app):
+    from app import db, scheduler
+
+    for job_id in ('startup-a', 'startup-b', 'startup-paused'):
+        db.add_job(job_id, job_id, 'true', '15 3 * * *')
+    db.update_job('startup-paused', {'is_paused': True})
+
+    scheduler.load_jobs_from_db()
+
+    first, second = scheduler.scheduler.get_job('startup-a'), scheduler.scheduler.get_job('startup-b')
+    assert first.trigger is second.trigger
+    assert first.next_run_time == second.next_run_time
+    assert (first.next_run_time.hour, first.next_run_time.minute) == (3, 15)
+    assert scheduler.scheduler.get_job('startup-paused') is None
+
+
+def test_startup_unschedules_removed_jobs(app):
+    from app import db, scheduler
+
+    db.add_job('startup-removed', 'startup-removed', 'true', '15 3 * * *')
+    scheduler.load_jobs_from_db()
+    db.remove_job('startup-removed')
+
+    scheduler.load_jobs_from_db()
+
+    assert scheduler.scheduler.get_job('startup-removed') is None
+    assert 'startup-removed' not in scheduler.scheduled_jobs
@@ -0,0 +1,70 @@
+from app.snapshot import JobSnapshot
+
+
+class Jobs:
+    """A job list to build snapshots from, changed by the tests"""
+
+    def __init__(self, *ids):
+        self.jobs = {job_id: {'id': job_id, 'name': job_id} for job_id in ids}
+
+    def build(self):
+        return [dict(job) for job in self.jobs.values()]
+
+
+def test_delta_lists_changed_and_removed_jobs():
+    jobs = Jobs('a', 'b')
+    snapshot = JobSnapshot(jobs.build)
+    start = snapshot.snapshot()
+
+    jobs.jobs['a']['name'] = 'renamed'
+    del jobs.jobs['b']
+    snapshot.invalidate()
+
+    delta = snapshot.changes_since(start['epoch'], start['version'])
+    assert delta['changed'] == [{'id': 'a', 'name': 'renamed'}]
+    assert delta['removed'] == ['b']
+    assert delta['since'] == start['version'] and delta['version'] == start['version'] + 1
+
+
+def test_latest_change_of_a_job_wins():
+    jobs = Jobs('a', 'b')
+    snapshot = JobSnapshot(jobs.build)
+    start = snapshot.snapshot()
+
+    # a is removed and created again, b updated and then removed
+    del jobs.jobs['a']
+    jobs.jobs['b']['name'] = 'renamed'
+    snapshot.invalidate()
+    snapshot.snapshot()
+    jobs.jobs['a'] = {'id': 'a', 'name': 'again'}
+    del jobs.jobs['b']
+    snapshot.invalidate()
+
+    delta = snapshot.changes_since(start['epoch'], start['version'])
+    assert delta['changed'] == [{'id': 'a', 'name': 'again'}]
+    assert delta['removed'] == ['b']
+
+
+def test_unknown_or_expired_versions_need_the_full_list():
+    jobs = Jobs('a')
+    snapshot = JobSnapshot(jobs.build, history=2)
+    start = snapshot.snapshot()
+
+    assert snapshot.changes_since('other-epoch', start['version']) is None
+    assert snapshot.changes_since(start['epoch'], start['version'] + 1) is None
+    assert snapshot.changes_since(start['epoch'], 'latest') is None
+
+    for index in range(3):
+        jobs.jobs['a']['name'] = f'name-{index}'
+        snapshot.invalidate()
+        snapshot.snapshot()
+    assert snapshot.changes_since(start['epoch'], start['version']) is None
+
+
+def test_unchanged_rebuild_keeps_the_version():
+    jobs = Jobs('a')
+    snapshot = JobSnapshot(jobs.build)
+    version = snapshot.snapshot()['version']
+
+    snapshot.invalidate()
+    assert snapshot.snapshot()['version'] == version
@@ -0,0 +1,91 @@
+import threading
+import time
+
+import pytest
+
+from app.worker import Worker
+
+
+@pytest.fixture
+def queue(database):
+    database.add_job('a', 'job a', 'true', '0 * * * *', worker_label='gpu')
+    database.add_job('b', 'job b', 'true', '0 * * * *', worker_label='cpu')
+    return database
+
+
+def test_runs_are_claimed_by_label_oldest_first(queue):
+    queue.add_job('c', 'job c', 'true', '0 * * * *', worker_label='gpu')
+    first = queue.enqueue_execution('a', 'gpu')
+    queue.enqueue_execution('b', 'cpu')
+    second = queue.enqueue_execution('c', 'gpu')
+
+    claimed = queue.claim_execution('worker-1', ['gpu'], lease_seconds=30)
+    assert (claimed['id'], claimed['state']) == (first['id'], 'running')
+    assert queue.claim_execution('worker-2', ['gpu'], lease_seconds=30)['id'] == second['id']
+    assert queue.claim_execution('worker-3', ['gpu'], lease_seconds=30) is None
+    assert queue.claim_execution('worker-3', ['cpu', 'gpu'], lease_seconds=30)['job_id'] == 'b'
+
+
+def test_job_has_at_most_one_pending_run(queue):
+    assert queue.enqueue_execution('a', 'gpu')
+    assert queue.enqueue_execution('a', 'gpu') is None
+    assert queue.enqueue_execution('missing', 'gpu') is None
+
+
+def test_a_run_is_claimed_once(queue):
+    queue.enqueue_execution('a', 'gpu')
+
+    assert queue.claim_execution('worker-1', ['gpu'], lease_seconds=30)
+    assert queue.claim_execution('worker-2', ['gpu'], lease_seconds=30) is None
+
+
+def test_expired_lease_is_handed_to_another_worker(queue):
+    execution = queue.enqueue_execution('a', 'gpu')
+    queue.claim_execution('worker-1', ['gpu'], lease_seconds=-1)
+
+    assert queue.expire_leases(max_attempts=3) == 1
+    claimed = queue.claim_execution('worker-2', ['gpu'], lease_seconds=30)
+    assert claimed['id'] == execution['id']
+
+    # The worker that lost the lease can neither renew it nor finish the run
+    assert queue.renew_leases('worker-1', [execution['id']], lease_seconds=30) == []
+    queue.finish_execution(execution['id'], 'success', exit_code=0, worker_id='worker-1')
+    assert queue.get_execution(execution['id'])['state'] == 'running'
+
+    queue.finish_execution(execution['id'], 'failed', exit_code=1, worker_id='worker-2')
+    assert queue.get_execution(execution['id'])['state'] == 'failed'
+
+
+def test_live_lease_is_kept(queue):
+    execution = queue.enqueue_execution('a', 'gpu')
+    queue.claim_execution('worker-1', ['gpu'], lease_seconds=30)
+
+    assert queue.renew_leases('worker-1', [execution['id']], lease_seconds=30) == [execution['id']]
+    assert queue.expire_leases(max_attempts=3) == 0
+
+
+def test_run_is_interrupted_after_max_attempts(queue):
+    execution = queue.enqueue_execution('a', 'gpu')
+    for worker_id in ('worker-1', 'worker-2'):
+        assert queue.claim_execution(worker_id, ['gpu'], lease_seconds=-1)
+        queue.expire_leases(max_attempts=2)
+
+    assert queue.get_execution(execution['id'])['state'] == 'interrupted'
+    assert queue.claim_execution('worker-3', ['gpu'], lease_seconds=30) is None
+
+
+def test_worker_runs_claimed_jobs(queue):
+    queue.update_job('a', {'command': 'echo from the worker'})
+    execution = queue.enqueue_execution('a', 'gpu')
+    worker = Worker(queue, 'worker-1', ['gpu'], lease_seconds=30, poll_interval=0.05)
+    threading.Thread(target=worker.run, daemon=True).start()
+
+    deadline = time.monotonic() + 10
+    while queue.get_execution(execution['id'])['state'] in ('pending', 'running'):
+        assert time.monotonic() < deadline, "The worker didn't finish the run"
+        time.sleep(0.05)
+
+    finished = queue.get_execution(execution['id'])
+    assert (finished['state'], finished['exit_code']) == ('success', 0)
+    with open(finished['log_file']) as f:
+        assert f.read() == 'from the worker\n'
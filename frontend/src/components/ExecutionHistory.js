@@ -1,18 +1,23 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useCallback } from 'react';
 import { Link } from 'react-router-dom';
-import { getAllExecutions } from '../services/api';
+import { getExecutionsPage } from '../services/api';
+
+const PAGE_SIZE = 50;
 
 function ExecutionHistory({ onExecutionSelect }) {
   const [executions, setExecutions] = useState([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
   const [selectedExecution, setSelectedExecution] = useState(null);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   useEffect(() => {
     const fetchExecutions = async () => {
       try {
-        const data = await getAllExecutions();
-        setExecutions(data);
+        const data = await getExecutionsPage({ limit: PAGE_SIZE });
+        setExecutions(data.executions);
+        setNextCursor(data.nextCursor);
         setLoading(false);
       } catch (err) {
         console.error('Failed to fetch executions:', err);
@@ -24,6 +29,31 @@ function ExecutionHistory({ onExecutionSelect }) {
     fetchExecutions();
   }, []);
 
+  const loadMore = useCallback(async () => {
+    if (!nextCursor || loadingMore) {
+      return;
+    }
+
+    setLoadingMore(true);
+    try {
+      const data = await getExecutionsPage({ limit: PAGE_SIZE, cursor: nextCursor });
+      setExecutions((prevExecutions) => [...prevExecutions, ...data.executions]);
+      setNextCursor(data.nextCursor);
+    } catch (err) {
+      console.error('Failed to fetch more executions:', err);
+    } finally {
+      setLoadingMore(false);
+    }
+  }, [nextCursor, loadingMore]);
+
+  // Load the next page when the list is scrolled near the bottom
+  const handleScroll = (e) => {
+    const { scrollTop, scrollHeight, clientHeight } = e.currentTarget;
+    if (scrollHeight - scrollTop - clientHeight < 100) {
+      loadMore();
+    }
+  };
+
   const getStateColor = (state) => {
     switch (state) {
       case 'running':
@@ -38,6 +68,9 @@ function ExecutionHistory({ onExecutionSelect }) {
   };
 
   const formatDuration = (seconds) => {
+    if (seconds === null || seconds === undefined) {
+      return '';
+    }
     if (seconds < 60) {
       return `${seconds.toFixed(1)}s`;
     } else if (seconds < 3600) {
@@ -105,10 +138,13 @@ function ExecutionHistory({ onExecutionSelect }) {
       <div className="px-4 py-3 border-b border-gray-200 dark:border-gray-700">
         <h3 className="text-base font-medium text-gray-900 dark:text-white">Execution History</h3>
       </div>
-      <div className="divide-y divide-gray-200 dark:divide-gray-700 max-h-96 overflow-y-auto">
+      <div
+        className="divide-y divide-gray-200 dark:divide-gray-700 max-h-96 overflow-y-auto"
+        onScroll={handleScroll}
+      >
         {executions.map((execution) => (
           <div
-            key={`${execution.job_id}-${execution.timestamp}`}
+            key={execution.id}
             className={`px-4 py-3 hover:bg-gray-50 dark:hover:bg-gray-700 cursor-pointer ${
               selectedExecution &&
               selectedExecution.job_id === execution.job_id &&
@@ -151,6 +187,11 @@ function ExecutionHistory({ onExecutionSelect }) {
             </div>
           </div>
         ))}
+        {loadingMore && (
+          <div className="px-4 py-3 text-center text-xs text-gray-500 dark:text-gray-400">
+            Loading more...
+          </div>
+        )}
       </div>
     </div>
   );
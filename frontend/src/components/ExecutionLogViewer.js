@@ -1,23 +1,31 @@
 import React, { useState, useEffect } from 'react';
-import { getExecutionLog } from '../services/api';
+import { getExecutionLogRange } from '../services/api';
 import LogTerminal from './LogTerminal';
 
-function ExecutionLogViewer({ jobId, timestamp }) {
-  const [log, setLog] = useState(null);
+// Number of bytes fetched per log page
+const LOG_PAGE_SIZE = 65536;
+
+function ExecutionLogViewer({ executionId, timestamp }) {
+  const [log, setLog] = useState('');
+  const [loadedBytes, setLoadedBytes] = useState(0);
+  const [logSize, setLogSize] = useState(0);
   const [loading, setLoading] = useState(false);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [error, setError] = useState(null);
 
   useEffect(() => {
-    if (!jobId || !timestamp) {
-      setLog(null);
+    if (!executionId) {
+      setLog('');
       return;
     }
 
     const fetchLog = async () => {
       setLoading(true);
       try {
-        const data = await getExecutionLog(jobId, timestamp);
-        setLog(data);
+        const data = await getExecutionLogRange(executionId, 0, LOG_PAGE_SIZE);
+        setLog(data.text);
+        setLoadedBytes(Math.min(LOG_PAGE_SIZE, data.size));
+        setLogSize(data.size);
         setError(null);
       } catch (err) {
         console.error('Failed to fetch execution log:', err);
@@ -28,9 +36,23 @@ function ExecutionLogViewer({ jobId, timestamp }) {
     };
 
     fetchLog();
-  }, [jobId, timestamp]);
+  }, [executionId]);
+
+  const loadMore = async () => {
+    setLoadingMore(true);
+    try {
+      const data = await getExecutionLogRange(executionId, loadedBytes, LOG_PAGE_SIZE);
+      setLog((prevLog) => prevLog + data.text);
+      setLoadedBytes((prevBytes) => Math.min(prevBytes + LOG_PAGE_SIZE, data.size));
+      setLogSize(data.size);
+    } catch (err) {
+      console.error('Failed to fetch more of the execution log:', err);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
 
-  if (!jobId || !timestamp) {
+  if (!executionId) {
     return (
       <div className="bg-white dark:bg-gray-800 rounded-lg shadow p-6 text-center">
         <p className="text-gray-500 dark:text-gray-400">Select an execution to view its logs</p>
@@ -85,6 +107,20 @@ function ExecutionLogViewer({ jobId, timestamp }) {
         </div>
       </div>
       <LogTerminal logs={log ? [log] : []} />
+      {loadedBytes < logSize && (
+        <div className="mt-2 flex justify-between items-center text-xs text-gray-500 dark:text-gray-400">
+          <span>
+            Showing {Math.round(loadedBytes / 1024)} of {Math.round(logSize / 1024)} KB
+          </span>
+          <button
+            onClick={loadMore}
+            disabled={loadingMore}
+            className="text-cronbat-600 hover:text-cronbat-800 dark:text-cronbat-400 dark:hover:text-cronbat-300"
+          >
+            {loadingMore ? 'Loading...' : 'Load more'}
+          </button>
+        </div>
+      )}
     </div>
   );
 }
@@ -56,6 +56,8 @@ function JobCard({ job }) {
 
   const getStateColor = (state) => {
     switch (state) {
+      case 'queued':
+        return 'bg-yellow-100 text-yellow-800 dark:bg-yellow-900 dark:text-yellow-200';
       case 'running':
         return 'bg-blue-100 text-blue-800 dark:bg-blue-900 dark:text-blue-200';
       case 'success':
@@ -1,4 +1,4 @@
-import React, { createContext, useContext, useEffect, useState } from 'react';
+import React, { createContext, useCallback, useContext, useEffect, useRef, useState } from 'react';
 import { io } from 'socket.io-client';
 
 const SocketContext = createContext();
@@ -11,18 +11,27 @@ export function SocketProvider({ children }) {
   const [socket, setSocket] = useState(null);
   const [jobs, setJobs] = useState([]);
   const [isConnected, setIsConnected] = useState(false);
+  // Epoch and version of the last job list received from the server
+  const jobsVersion = useRef({ epoch: null, version: null });
 
   useEffect(() => {
-    // Create socket connection
+    // Create socket connection; on reconnect the server only sends the
+    // jobs changed since the version we already have
     const socketInstance = io(process.env.REACT_APP_SOCKET_URL || '', {
       path: '/socket.io',
       transports: ['websocket', 'polling'],
+      auth: (cb) => cb({
+        jobs_epoch: jobsVersion.current.epoch,
+        jobs_version: jobsVersion.current.version,
+      }),
     });
 
     // Set up event listeners
     socketInstance.on('connect', () => {
       console.log('Socket connected');
       setIsConnected(true);
+      // Rooms are lost on reconnect, so join the dashboard on every connect
+      socketInstance.emit('subscribe_dashboard');
     });
 
     socketInstance.on('disconnect', () => {
@@ -30,9 +39,22 @@ export function SocketProvider({ children }) {
       setIsConnected(false);
     });
 
-    socketInstance.on('jobs', (data) => {
-      console.log('Received jobs:', data);
-      setJobs(data);
+    socketInstance.on('jobs_snapshot', (data) => {
+      console.log('Received jobs:', data.jobs);
+      jobsVersion.current = { epoch: data.epoch, version: data.version };
+      setJobs(data.jobs);
+    });
+
+    socketInstance.on('jobs_delta', (data) => {
+      jobsVersion.current = { epoch: data.epoch, version: data.version };
+      const changed = new Map(data.changed.map((job) => [job.id, job]));
+      setJobs((prevJobs) => {
+        const known = new Set(prevJobs.map((job) => job.id));
+        const jobs = prevJobs
+          .filter((job) => !data.removed.includes(job.id))
+          .map((job) => changed.get(job.id) || job);
+        return [...jobs, ...data.changed.filter((job) => !known.has(job.id))];
+      });
     });
 
     socketInstance.on('job_added', (job) => {
@@ -60,15 +82,29 @@ export function SocketProvider({ children }) {
     };
   }, []);
 
+  // Stable callbacks, so pages don't resubscribe every time the job list changes
+  const subscribeToJob = useCallback((jobId, position = {}) => {
+    if (socket) {
+      socket.emit('subscribe_to_job', {
+        id: jobId,
+        execution_id: position.executionId,
+        since: position.seq,
+      });
+    }
+  }, [socket]);
+
+  const unsubscribeFromJob = useCallback((jobId) => {
+    if (socket) {
+      socket.emit('unsubscribe_from_job', { id: jobId });
+    }
+  }, [socket]);
+
   const value = {
     socket,
     jobs,
     isConnected,
-    subscribeToJob: (jobId) => {
-      if (socket) {
-        socket.emit('subscribe_to_job', { id: jobId });
-      }
-    },
+    subscribeToJob,
+    unsubscribeFromJob,
   };
 
   return (
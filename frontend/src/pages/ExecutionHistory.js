@@ -22,7 +22,7 @@ function ExecutionHistoryPage() {
         <div>
           {selectedExecution ? (
             <ExecutionLogViewer
-              jobId={selectedExecution.job_id}
+              executionId={selectedExecution.id}
               timestamp={selectedExecution.timestamp}
             />
           ) : (
@@ -1,13 +1,17 @@
 import React, { useEffect, useState, useRef } from 'react';
 import { useParams, useNavigate } from 'react-router-dom';
 import { useSocket } from '../contexts/SocketContext';
-import { getJob, getJobLogs, getJobExecutions, getExecutionLog, runJob, deleteJob, pauseJob, resumeJob, updateJob } from '../services/api';
+import { getJob, getJobLogs, getJobExecutions, getExecutionLogTail, getExecutionLogRange, runJob, deleteJob, pauseJob, resumeJob, updateJob } from '../services/api';
 import LogTerminal from '../components/LogTerminal';
 
+// Lines of a log shown at first, and bytes of earlier output loaded per click
+const LOG_TAIL_LINES = 200;
+const LOG_PAGE_SIZE = 65536;
+
 function JobDetails() {
   const { jobId } = useParams();
   const navigate = useNavigate();
-  const { socket, subscribeToJob } = useSocket();
+  const { socket, subscribeToJob, unsubscribeFromJob } = useSocket();
 
   const [job, setJob] = useState(null);
   const [executions, setExecutions] = useState([]);
@@ -19,6 +23,43 @@ function JobDetails() {
   const [isEditing, setIsEditing] = useState(false);
   const [editedJob, setEditedJob] = useState(null);
   const [isSaving, setIsSaving] = useState(false);
+  const [loadingEarlier, setLoadingEarlier] = useState(false);
+  // Run and sequence number of the last live log line received
+  const liveLogPosition = useRef({ executionId: null, seq: 0 });
+
+  // Fetch the last lines of an execution's log
+  const fetchLogTail = async (execution) => {
+    try {
+      const logData = await getExecutionLogTail(execution, LOG_TAIL_LINES);
+      setExecutionLogs(prev => ({
+        ...prev,
+        [execution.timestamp]: logData
+      }));
+    } catch (error) {
+      console.error(`Failed to fetch log for execution ${execution.timestamp}:`, error);
+    }
+  };
+
+  // Prepend the output before the part of a log shown so far
+  const loadEarlierOutput = async (logData) => {
+    setLoadingEarlier(true);
+    try {
+      const start = Math.max(0, logData.offset - LOG_PAGE_SIZE);
+      const data = await getExecutionLogRange(logData.id, start, logData.offset - start);
+      setExecutionLogs(prev => ({
+        ...prev,
+        [logData.timestamp]: {
+          ...prev[logData.timestamp],
+          output: data.text + prev[logData.timestamp].output,
+          offset: start
+        }
+      }));
+    } catch (error) {
+      console.error(`Failed to fetch earlier output of execution ${logData.timestamp}:`, error);
+    } finally {
+      setLoadingEarlier(false);
+    }
+  };
 
   // Fetch job details and execution history
   useEffect(() => {
@@ -39,22 +80,11 @@ function JobDetails() {
         setExecutions(executionsData);
         setLoading(false);
 
-        // Fetch logs for each execution
-        const logPromises = executionsData.map(async (execution) => {
-          try {
-            const logData = await getExecutionLog(jobId, execution.timestamp);
-            if (logData) {
-              setExecutionLogs(prev => ({
-                ...prev,
-                [execution.timestamp]: logData
-              }));
-            }
-          } catch (error) {
-            console.error(`Failed to fetch log for execution ${execution.timestamp}:`, error);
-          }
-        });
-
-        await Promise.all(logPromises);
+        // Fetch the end of the latest log; the others are fetched when
+        // selected
+        if (executionsData.length > 0) {
+          await fetchLogTail(executionsData[0]);
+        }
       } catch (err) {
         console.error('Failed to fetch job details:', err);
         setError('Failed to load job details. Please try again later.');
@@ -68,8 +98,11 @@ function JobDetails() {
   // Subscribe to job updates via socket
   useEffect(() => {
     if (socket && jobId) {
-      // Subscribe to this job
-      subscribeToJob(jobId);
+      // Subscribe to this job, again after a reconnect to catch up on
+      // output missed while disconnected
+      const subscribe = () => subscribeToJob(jobId, liveLogPosition.current);
+      subscribe();
+      socket.on('connect', subscribe);
 
       // Listen for job details updates
       socket.on('job_details', (data) => {
@@ -77,20 +110,58 @@ function JobDetails() {
       });
 
       // Listen for job state changes
-      socket.on('job_state_changed', (data) => {
+      const handleStateChanged = (data) => {
         if (data.id === jobId) {
           setJob((prevJob) => ({
             ...prevJob,
             state: data.state
           }));
         }
+      };
+      socket.on('job_state_changed', handleStateChanged);
+
+      // Listen for job logs, sent in batches of lines
+      socket.on('job_log', (data, ack) => {
+        // Acknowledge every frame so the server keeps sending
+        if (ack) {
+          ack();
+        }
+        if (data.id !== jobId) {
+          return;
+        }
+        const position = liveLogPosition.current;
+        const skipped = data.skipped > 0 ? [`... ${data.skipped} lines skipped ...\n`] : [];
+        if (data.execution_id !== position.executionId) {
+          // First lines of a new run
+          liveLogPosition.current = { executionId: data.execution_id, seq: data.last_seq };
+          setLiveLog([...skipped, ...data.lines]);
+        } else if (data.last_seq > position.seq) {
+          const newLines = data.lines.slice(Math.max(0, position.seq - data.first_seq + 1));
+          position.seq = data.last_seq;
+          setLiveLog((prevLogs) => [...prevLogs, ...skipped, ...newLines]);
+        }
       });
 
-      // Listen for job logs
-      socket.on('job_log', (data) => {
-        if (data.id === jobId) {
-          setLiveLog((prevLogs) => [...prevLogs, data.line]);
+      // Lines of the current run sent after subscribing, to catch up on
+      // output produced before this page was opened
+      socket.on('job_log_catchup', (data) => {
+        if (data.id !== jobId) {
+          return;
         }
+        const position = liveLogPosition.current;
+        const lines = data.skipped > 0
+          ? [`... ${data.skipped} lines skipped ...\n`, ...data.lines]
+          : data.lines;
+        if (data.execution_id !== position.executionId) {
+          setLiveLog(lines);
+        } else {
+          const newLines = data.lines.slice(Math.max(0, position.seq - data.first_seq + 1));
+          setLiveLog((prevLogs) => [...prevLogs, ...newLines]);
+        }
+        liveLogPosition.current = {
+          executionId: data.execution_id,
+          seq: Math.max(data.last_seq, data.execution_id === position.executionId ? position.seq : 0),
+        };
       });
 
       // Listen for job completion
@@ -100,19 +171,9 @@ function JobDetails() {
           getJobExecutions(jobId).then(newExecutions => {
             setExecutions(newExecutions);
 
-            // Fetch log for the new execution
+            // Fetch the end of the new execution's log
             if (newExecutions.length > 0) {
-              const latestExecution = newExecutions[0]; // Assuming sorted by timestamp desc
-              getExecutionLog(jobId, latestExecution.timestamp)
-                .then(logData => {
-                  if (logData) {
-                    setExecutionLogs(prev => ({
-                      ...prev,
-                      [latestExecution.timestamp]: logData
-                    }));
-                  }
-                })
-                .catch(console.error);
+              fetchLogTail(newExecutions[0]); // Assuming sorted by timestamp desc
             }
           }).catch(console.error);
 
@@ -121,15 +182,19 @@ function JobDetails() {
         }
       });
 
-      // Cleanup listeners on unmount
+      // Cleanup listeners on unmount; the job list keeps its own
+      // job_state_changed listener
       return () => {
+        unsubscribeFromJob(jobId);
+        socket.off('connect', subscribe);
         socket.off('job_details');
-        socket.off('job_state_changed');
+        socket.off('job_state_changed', handleStateChanged);
         socket.off('job_log');
+        socket.off('job_log_catchup');
         socket.off('job_completed');
       };
     }
-  }, [socket, jobId, subscribeToJob]);
+  }, [socket, jobId, subscribeToJob, unsubscribeFromJob]);
 
   const handleRunJob = async () => {
     try {
@@ -221,6 +286,8 @@ function JobDetails() {
 
   const getStateColor = (state) => {
     switch (state) {
+      case 'queued':
+        return 'bg-yellow-100 text-yellow-800 dark:bg-yellow-900 dark:text-yellow-200';
       case 'running':
         return 'bg-blue-100 text-blue-800 dark:bg-blue-900 dark:text-blue-200';
       case 'success':
@@ -232,6 +299,9 @@ function JobDetails() {
     }
   };
 
+  // Log of the most recent or selected execution
+  const shownLog = executions.length > 0 ? executionLogs[executions[0].timestamp] : null;
+
   return (
     <div>
       <div className="flex justify-between items-center mb-6">
@@ -303,14 +373,14 @@ function JobDetails() {
           )}
           <button
             onClick={handleRunJob}
-            disabled={job.state === 'running' || job.is_paused}
+            disabled={job.state === 'running' || job.state === 'queued' || job.is_paused}
             className={`px-4 py-2 rounded-md text-white font-medium ${
-              job.state === 'running' || job.is_paused
+              job.state === 'running' || job.state === 'queued' || job.is_paused
                 ? 'bg-gray-400 cursor-not-allowed'
                 : 'bg-cronbat-600 hover:bg-cronbat-700'
             }`}
           >
-            {job.state === 'running' ? 'Running...' : 'Run Now'}
+            {job.state === 'running' ? 'Running...' : job.state === 'queued' ? 'Queued...' : 'Run Now'}
           </button>
           <button
             onClick={handleDeleteJob}
@@ -548,11 +618,27 @@ function JobDetails() {
           <LogTerminal logs={[]} liveLog={liveLog} />
         ) : (
           // Show logs from the most recent execution
-          executions.length > 0 && executionLogs[executions[0].timestamp] ? (
-            <LogTerminal
-              logs={[executionLogs[executions[0].timestamp]]}
-              liveLog={[]}
-            />
+          shownLog ? (
+            <>
+              <LogTerminal
+                logs={[shownLog]}
+                liveLog={[]}
+              />
+              {shownLog.offset > 0 && (
+                <div className="mt-2 flex justify-between items-center text-xs text-gray-500 dark:text-gray-400">
+                  <span>
+                    Showing the last {Math.round((shownLog.size - shownLog.offset) / 1024)} of {Math.round(shownLog.size / 1024)} KB
+                  </span>
+                  <button
+                    onClick={() => loadEarlierOutput(shownLog)}
+                    disabled={loadingEarlier}
+                    className="text-cronbat-600 hover:text-cronbat-800 dark:text-cronbat-400 dark:hover:text-cronbat-300"
+                  >
+                    {loadingEarlier ? 'Loading...' : 'Load earlier output'}
+                  </button>
+                </div>
+              )}
+            </>
           ) : (
             <LogTerminal logs={[]} liveLog={[]} />
           )
@@ -569,17 +655,7 @@ function JobDetails() {
                     className="px-4 py-3 hover:bg-gray-50 dark:hover:bg-gray-700 cursor-pointer"
                     onClick={async () => {
                       if (!executionLogs[execution.timestamp]) {
-                        try {
-                          const logData = await getExecutionLog(jobId, execution.timestamp);
-                          if (logData) {
-                            setExecutionLogs(prev => ({
-                              ...prev,
-                              [execution.timestamp]: logData
-                            }));
-                          }
-                        } catch (error) {
-                          console.error(`Failed to fetch log for execution ${execution.timestamp}:`, error);
-                        }
+                        await fetchLogTail(execution);
                       }
 
                       // Update the displayed log
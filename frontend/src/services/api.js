@@ -119,12 +119,65 @@ export const getAllExecutions = async () => {
   }
 };
 
-export const getExecutionLog = async (jobId, timestamp) => {
+// Fetch one page of execution history. Pass the returned nextCursor back
+// as params.cursor to get the following page; it is null on the last page.
+export const getExecutionsPage = async (params = {}) => {
   try {
-    const response = await api.get(`/jobs/${jobId}/executions/${timestamp}/log`);
-    return response.data;
+    const url = params.jobId ? `/jobs/${params.jobId}/executions` : '/executions';
+    const { jobId, ...query } = params;
+    const response = await api.get(url, { params: query });
+    return {
+      executions: response.data,
+      nextCursor: response.headers['x-next-cursor'] || null,
+    };
+  } catch (error) {
+    console.error('Error fetching executions page:', error);
+    throw error;
+  }
+};
+
+// Fetch the last lines of an execution's log, along with its result. The
+// offset the text starts at and the total log size tell whether there is
+// earlier output to fetch with getExecutionLogRange.
+export const getExecutionLogTail = async (execution, lines = 200) => {
+  try {
+    const response = await api.get(`/executions/${execution.id}/log`, {
+      params: { tail: lines },
+      responseType: 'text',
+      transformResponse: [(data) => data],
+    });
+    return {
+      id: execution.id,
+      timestamp: execution.timestamp,
+      output: response.data,
+      offset: parseInt(response.headers['x-log-offset'], 10),
+      size: parseInt(response.headers['x-log-size'], 10),
+      exit_code: execution.exit_code,
+      duration: execution.duration,
+    };
+  } catch (error) {
+    console.error(`Error fetching log for execution ${execution.id}:`, error);
+    throw error;
+  }
+};
+
+// Fetch a byte range of an execution's log. Returns the text along with the
+// offset it starts at and the total log size, so callers can page through
+// large logs instead of downloading them in one piece.
+export const getExecutionLogRange = async (executionId, offset = 0, limit = 65536) => {
+  try {
+    const response = await api.get(`/executions/${executionId}/log`, {
+      params: { offset, limit },
+      responseType: 'text',
+      transformResponse: [(data) => data],
+    });
+    return {
+      text: response.data,
+      offset: parseInt(response.headers['x-log-offset'], 10),
+      size: parseInt(response.headers['x-log-size'], 10),
+    };
   } catch (error) {
-    console.error(`Error fetching execution log for job ${jobId}:`, error);
+    console.error(`Error fetching log for execution ${executionId}:`, error);
     throw error;
   }
 };